@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Differential harness for the two execution engines.
+
+Runs every benchmark program under the tree-walking e() and under
+BytecodeVM, checks that both print the same output, and reports each
+engine's best time and peak traced memory with the e()/VM ratio. Programs
+whose ratio is far from the typical one are flagged as performance cliffs
+of one engine. VM times exclude compilation, which is listed separately.
+
+Usage: python3 benchmarks/engines.py [--repeat N] [--timeout SECONDS] [--filter TEXT]
+                                     [--slow] [--no-memory] [--json results.json]
+"""
+import argparse
+import json
+import math
+import signal
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main import parse, BytecodeCompiler, BytecodeVM, e
+from main.output import program_output
+from benchmarks.suite import load_programs, SLOW_BENCHMARKS
+
+# A ratio this many times above or below the geometric mean is reported as a cliff
+CLIFF_FACTOR = 4.0
+
+class EngineTimeout(Exception):
+    pass
+
+def _alarm(signum, frame):
+    raise EngineTimeout()
+
+def _engines(code):
+    """Engine name -> (prepare, run). prepare is untimed"""
+    return {
+        "vm": (lambda: BytecodeCompiler().compile(parse(code)), lambda bytecode: BytecodeVM(bytecode).run()),
+        "e": (lambda: parse(code), e),
+    }
+
+def run_engine(prepare, run, timeout, traced=False):
+    """Run once; returns (output, seconds, peak traced bytes or None, error or None)"""
+    argument = prepare()
+    output = StringIO()
+    error = None
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(output):
+            try:
+                run(argument)
+            finally:
+                program_output.flush()
+    except EngineTimeout:
+        error = f"timed out after {timeout:g}s"
+    except Exception as ex:
+        error = f"{type(ex).__name__}: {ex}"[:200]
+    finally:
+        elapsed = time.perf_counter() - start
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        peak = None
+        if traced:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return output.getvalue(), elapsed, peak, error
+
+def _program_output(text):
+    # The VM reports its own errors on stdout; only the program's output is compared
+    return "\n".join(line for line in text.split("\n")
+                     if not line.startswith(("VM Error at instruction", "Stack:", "Variables:")))
+
+def _first_difference(a, b):
+    a_lines, b_lines = a.split("\n"), b.split("\n")
+    for number, (left, right) in enumerate(zip(a_lines, b_lines), 1):
+        if left != right:
+            return f"line {number}: vm {left[:60]!r}, e {right[:60]!r}"
+    return f"vm printed {len(a_lines)} lines, e printed {len(b_lines)}"
+
+def compare_program(code, repeat, timeout, memory):
+    """Run both engines on code; returns the per-program result entry"""
+    engines = {}
+    outputs = {}
+    for name, (prepare, run) in _engines(code).items():
+        compile_start = time.perf_counter()
+        try:
+            prepare()
+        except Exception as ex:
+            # Rejected by the front end, so neither engine can run it
+            return {"error": f"{type(ex).__name__}: {ex}"[:200]}
+        setup = time.perf_counter() - compile_start
+
+        output, elapsed, _, error = run_engine(prepare, run, timeout)
+        times = [elapsed]
+        while error is None and len(times) < repeat and sum(times) < timeout:
+            times.append(run_engine(prepare, run, timeout)[1])
+        result = {"best_ms": min(times) * 1000, "runs": len(times), "error": error}
+        if name == "vm":
+            result["compile_ms"] = setup * 1000
+        if memory and error is None:
+            result["peak_kb"] = run_engine(prepare, run, timeout, traced=True)[2] / 1024
+        engines[name] = result
+        outputs[name] = _program_output(output)
+
+    vm, tree = engines["vm"], engines["e"]
+    entry = {"engines": engines, "match": outputs["vm"] == outputs["e"] and vm["error"] == tree["error"]}
+    if not entry["match"]:
+        if vm["error"] != tree["error"]:
+            entry["difference"] = f"vm error {vm['error']!r}, e error {tree['error']!r}"
+        else:
+            entry["difference"] = _first_difference(outputs["vm"], outputs["e"])
+    if vm["error"] is None and tree["error"] is None:
+        entry["time_ratio"] = tree["best_ms"] / max(vm["best_ms"], 1e-6)
+        if memory:
+            entry["memory_ratio"] = tree["peak_kb"] / max(vm["peak_kb"], 1e-3)
+    return entry
+
+def find_cliffs(results):
+    """Flag programs whose e()/VM time ratio is far from the geometric mean"""
+    ratios = {name: entry["time_ratio"] for name, entry in results["programs"].items() if "time_ratio" in entry}
+    if not ratios:
+        return None
+    typical = math.exp(sum(math.log(r) for r in ratios.values()) / len(ratios))
+    for name, ratio in ratios.items():
+        if ratio > typical * CLIFF_FACTOR:
+            results["programs"][name]["cliff"] = "vm"
+        elif ratio < typical / CLIFF_FACTOR:
+            results["programs"][name]["cliff"] = "e"
+    return typical
+
+def run_harness(programs, repeat, timeout, memory, progress=None):
+    if timeout:
+        signal.signal(signal.SIGALRM, _alarm)
+    results = {"python": sys.version.split()[0], "programs": {}}
+    for name, (_, code) in programs.items():
+        results["programs"][name] = compare_program(code, repeat, timeout, memory)
+        if progress:
+            progress(name)
+    results["typical_time_ratio"] = find_cliffs(results)
+    return results
+
+def _ms(engine):
+    return "error" if engine["error"] else f"{engine['best_ms']:.2f}"
+
+def print_report(results):
+    print(f"{'program':<44} {'vm ms':>10} {'e ms':>10} {'e/vm':>6} {'vm KB':>9} {'e KB':>9} {'e/vm':>6}  output")
+    for name, entry in results["programs"].items():
+        if "engines" not in entry:
+            print(f"{name[:44]:<44} skipped: {entry['error']}")
+            continue
+        vm, tree = entry["engines"]["vm"], entry["engines"]["e"]
+        ratio = f"{entry['time_ratio']:.1f}" if "time_ratio" in entry else ""
+        vm_kb = f"{vm['peak_kb']:.0f}" if "peak_kb" in vm else ""
+        e_kb = f"{tree['peak_kb']:.0f}" if "peak_kb" in tree else ""
+        memory_ratio = f"{entry['memory_ratio']:.1f}" if "memory_ratio" in entry else ""
+        status = "same" if entry["match"] else "DIFFERENT"
+        if "cliff" in entry:
+            status += f", {entry['cliff']} cliff"
+        print(f"{name[:44]:<44} {_ms(vm):>10} {_ms(tree):>10} {ratio:>6} {vm_kb:>9} {e_kb:>9} {memory_ratio:>6}  {status}")
+
+    typical = results["typical_time_ratio"]
+    if typical is not None:
+        print(f"\ne() takes {typical:.2f}x the VM's time on a typical program (geometric mean)")
+    for name, entry in results["programs"].items():
+        if "difference" in entry:
+            print(f"  {name}: {entry['difference']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per engine; the best is reported")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds before a run is abandoned (0 for none)")
+    parser.add_argument("--filter", default="", help="only programs whose name contains this text")
+    parser.add_argument("--slow", action="store_true", help="include programs that take minutes to run")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slower) traced-memory runs")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    programs = {name: program for name, program in load_programs().items()
+                if args.filter in name and (args.slow or name not in SLOW_BENCHMARKS)}
+    results = run_harness(programs, args.repeat, args.timeout, not args.no_memory,
+                          progress=lambda name: print(f"  {name}", file=sys.stderr, flush=True))
+    print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+    # A non-zero exit lets CI catch the engines disagreeing
+    return 1 if any(not entry.get("match", True) for entry in results["programs"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the main package.
+
+Each statement is run in a fresh interpreter several times; the report shows
+the median wall time with bare interpreter startup subtracted, and flags any
+statement whose import writes to stdout.
+
+Usage: python3 benchmarks/import_time.py [--repeat N] [--json results.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STATEMENTS = [
+    "import main",
+    "from main import parse",
+    "from main import TypeChecker",
+    "from main import e",
+    "from main import BytecodeCompiler, BytecodeVM",
+    "from main import compile_cached, load_bytecode",
+]
+
+def time_statement(statement, repeat):
+    """Run statement in fresh interpreters and return (timings, stdout of the last run)"""
+    timings = []
+    output = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", statement], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        output = proc.stdout
+    return timings, output
+
+def run_benchmark(repeat):
+    baseline, _ = time_statement("pass", repeat)
+    startup = statistics.median(baseline)
+
+    results = {"python": sys.version.split()[0], "startup_ms": startup * 1000, "statements": {}}
+    for statement in STATEMENTS:
+        timings, output = time_statement(statement, repeat)
+        results["statements"][statement] = {
+            "median_ms": (statistics.median(timings) - startup) * 1000,
+            "min_ms": (min(timings) - startup) * 1000,
+            "stdout_bytes": len(output),
+        }
+    return results
+
+def print_report(results):
+    print(f"Python {results['python']}, interpreter startup {results['startup_ms']:.1f} ms")
+    print(f"{'statement':<50} {'median':>9} {'min':>9}  stdout")
+    for statement, r in results["statements"].items():
+        flag = "" if r["stdout_bytes"] == 0 else f"  <-- {r['stdout_bytes']} bytes printed"
+        print(f"{statement:<50} {r['median_ms']:>7.1f}ms {r['min_ms']:>7.1f}ms{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="fresh interpreters per statement")
+    parser.add_argument("--json", help="write results to this file for tracking between commits")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+    print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+
+    # A non-zero exit lets CI catch imports that start executing programs again
+    return 1 if any(r["stdout_bytes"] for r in results["statements"].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
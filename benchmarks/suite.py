@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the front end and both execution engines.
+
+Every program is timed stage by stage: lex, parse, TypeChecker.check,
+BytecodeCompiler.compile, BytecodeVM.run and the tree-walking e(). The
+programs come from final/, the Project Euler and algorithm tests, and
+synthetic stress programs. Each stage runs a few untimed warmup rounds and
+is then timed over several repeats; results can be written as JSON and
+compared against a run from another commit.
+
+Usage: python3 benchmarks/suite.py [--repeat N] [--warmup N] [--budget SECONDS]
+                                   [--filter TEXT] [--stages vm,e,...] [--slow]
+                                   [--json results.json] [--compare baseline.json]
+"""
+import argparse
+import ast
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main import lex, parse, TypeChecker, BytecodeCompiler, BytecodeVM, e
+from main.output import program_output
+
+# Synthetic programs that stress one part of the implementation each
+STRESS_PROGRAMS = {
+    "stress/deep_recursion": """
+        fun depth(n: int): int {
+            if (n == 0) {
+                return 0;
+            }
+            return depth(n - 1) + 1;
+        }
+        int total = 0;
+        int round = 0;
+        while (round < 20) {
+            total = total + depth(150);
+            round = round + 1;
+        }
+        println(total);
+    """,
+    "stress/big_arrays": """
+        int n = 20000;
+        int[] xs = new int[n];
+        int i = 0;
+        while (i < n) {
+            xs[i] = (i * 7919) % n;
+            i = i + 1;
+        }
+        int[][] grid = new int[100][100];
+        int r = 0;
+        while (r < 100) {
+            int c = 0;
+            while (c < 100) {
+                grid[r][c] = xs[r * 100 + c];
+                c = c + 1;
+            }
+            r = r + 1;
+        }
+        println(xs[n - 1] + grid[99][99]);
+    """,
+    "stress/string_building": """
+        string s = "";
+        int i = 0;
+        while (i < 10000) {
+            s = s ++ str(i % 10);
+            i = i + 1;
+        }
+        string line = "";
+        int j = 0;
+        while (j < 2000) {
+            line = "[" ++ line ++ "]";
+            j = j + 1;
+        }
+        println(len(s) + len(line));
+    """,
+    "stress/dict_churn": """
+        dict d = {"k0": 0};
+        int i = 0;
+        while (i < 5000) {
+            string key = "k" ++ str(i % 500);
+            d{key} = i;
+            int v = d{key};
+            d{"k0"} = d{"k0"} + v % 3;
+            i = i + 1;
+        }
+        println(d{"k0"});
+    """,
+}
+
+# Programs taking tens of seconds or more per run; only timed with --slow
+SLOW_BENCHMARKS = {
+    "final/q20",
+    "euler/Project Euler #7 - 10001st Prime",
+    "euler/Project Euler #10 - Summation of Primes (with smaller limit)",
+}
+
+# Shorter stages are timed in batches, like timeit, so each sample is measurable
+MIN_SAMPLE_SECONDS = 0.01
+
+STAGES = ("lex", "parse", "typecheck", "compile", "vm", "e")
+
+class _Discard:
+    """Stdout replacement that throws program output away"""
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+def _test_case_programs(path, call, code_field):
+    """Yield (name, call node keywords) for every `call(...)` with constant name and code in a test file"""
+    tree = ast.parse(path.read_text())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == call:
+            fields = {k.arg: k.value for k in node.keywords}
+            name, code = fields.get("name"), fields.get(code_field)
+            if isinstance(name, ast.Constant) and isinstance(code, ast.Constant):
+                yield name.value, fields
+
+def _lucent_literal(value):
+    """Declaration type and Lucent source for a test case input"""
+    if isinstance(value, tuple):
+        return "int[]", "[" + ", ".join(str(item) for item in value) + "]"
+    if isinstance(value, str):
+        return "string", json.dumps(value)
+    return "int", str(value)
+
+def load_programs():
+    """Benchmark name -> (corpus, source)"""
+    programs = {}
+    for path in sorted((ROOT / "final").glob("*.txt")):
+        code = path.read_text()
+        # Programs reading stdin would wait for input
+        if "input(" not in code:
+            programs[f"final/{path.stem}"] = ("final", code)
+
+    for name, fields in _test_case_programs(ROOT / "tests" / "project_euler_tests.py", "TestCase", "code"):
+        programs[f"euler/{name}"] = ("euler", fields["code"].value)
+
+    # Algorithm tests read their argument from a variable called input, bound by
+    # the test runner; declare it instead, using the largest test case
+    for name, fields in _test_case_programs(ROOT / "tests" / "algorithm_tests.py", "ReferenceTest", "language_code"):
+        cases = ast.literal_eval(fields["test_cases"]) if "test_cases" in fields else []
+        if not cases:
+            continue
+        kind, literal = _lucent_literal(max(cases, key=lambda case: (len(str(case)), str(case))))
+        code = re.sub(r"\binput\b", "benchInput", fields["language_code"].value)
+        programs[f"algorithms/{name}"] = ("algorithms", f"{kind} benchInput = {literal};\n{code}")
+
+    for name, code in STRESS_PROGRAMS.items():
+        programs[name] = ("stress", code)
+    return programs
+
+def _stage_runs(code):
+    """Stage name -> (prepare, run). prepare is untimed and gives run its argument"""
+    def fresh_ast():
+        return parse(code)
+
+    def compiled():
+        return BytecodeCompiler().compile(parse(code))
+
+    def run_quietly(function):
+        def run(argument):
+            with redirect_stdout(_Discard()):
+                try:
+                    function(argument)
+                finally:
+                    program_output.flush()
+        return run
+
+    return {
+        "lex": (lambda: code, lambda source: list(lex(source))),
+        "parse": (lambda: code, parse),
+        "typecheck": (fresh_ast, lambda tree: TypeChecker().check(tree)),
+        # The compiler and interpreters may annotate the AST, so each run gets a new one
+        "compile": (fresh_ast, lambda tree: BytecodeCompiler().compile(tree)),
+        "vm": (compiled, run_quietly(lambda bytecode: BytecodeVM(bytecode).run())),
+        "e": (fresh_ast, run_quietly(e)),
+    }
+
+def _sample(prepare, run, number):
+    """Seconds per run(prepare()), averaged over number calls"""
+    arguments = [prepare() for _ in range(number)]
+    start = time.perf_counter()
+    for argument in arguments:
+        run(argument)
+    return (time.perf_counter() - start) / number
+
+def time_stage(prepare, run, warmup, repeat, budget):
+    """Time run(prepare()) repeat times after warmup rounds; stops early once budget seconds are spent"""
+    for _ in range(warmup):
+        run(prepare())
+    number = 1
+    first = _sample(prepare, run, 1)
+    if first < MIN_SAMPLE_SECONDS:
+        number = min(int(MIN_SAMPLE_SECONDS / max(first, 1e-7)) + 1, 10000)
+    timings = []
+    while len(timings) < repeat and (not timings or sum(timings) * number < budget):
+        timings.append(_sample(prepare, run, number))
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "runs": len(timings),
+        "number": number,
+    }
+
+def _commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(programs, stages, warmup, repeat, budget, progress=None):
+    results = {"python": sys.version.split()[0], "commit": _commit(),
+               "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "warmup": warmup, "repeat": repeat,
+               "benchmarks": {}}
+    for name, (corpus, code) in programs.items():
+        entry = {"corpus": corpus, "lines": code.count("\n") + 1, "stages": {}}
+        runs = _stage_runs(code)
+        for stage in stages:
+            prepare, run = runs[stage]
+            try:
+                entry["stages"][stage] = time_stage(prepare, run, warmup, repeat, budget)
+            except Exception as ex:
+                # e.g. the type checker rejecting a program, or e() running out of Python stack
+                entry["stages"][stage] = {"error": f"{type(ex).__name__}: {ex}"[:200]}
+        results["benchmarks"][name] = entry
+        if progress:
+            progress(name, entry)
+    return results
+
+def _cell(stage_result):
+    if stage_result is None:
+        return ""
+    if "error" in stage_result:
+        return "error"
+    return f"{stage_result['median_ms']:.2f}"
+
+def print_report(results, stages):
+    print(f"Python {results['python']}, commit {results['commit'] or 'unknown'}; "
+          f"median ms over up to {results['repeat']} runs after {results['warmup']} warmup")
+    print(f"{'benchmark':<44}" + "".join(f"{stage:>11}" for stage in stages))
+    for name, entry in results["benchmarks"].items():
+        print(f"{name[:44]:<44}" + "".join(f"{_cell(entry['stages'].get(stage)):>11}" for stage in stages))
+    for name, entry in results["benchmarks"].items():
+        # Stages failing the same way (e.g. every stage after a parse error) are listed together
+        errors = {}
+        for stage, r in entry["stages"].items():
+            if "error" in r:
+                errors.setdefault(r["error"], []).append(stage)
+        for error, failed in errors.items():
+            print(f"  {name} [{','.join(failed)}]: {error}")
+
+def compare(baseline, results, threshold):
+    """
+    Print stages whose fastest run moved by more than threshold percent and
+    return the number of regressions. The minimum is used rather than the
+    median because noise from other processes only ever adds time.
+    """
+    regressions = 0
+    print(f"\nCompared with commit {baseline.get('commit') or 'unknown'} (threshold {threshold:.0f}%)")
+    for name, entry in results["benchmarks"].items():
+        old_entry = baseline.get("benchmarks", {}).get(name)
+        if old_entry is None:
+            continue
+        for stage, new in entry["stages"].items():
+            old = old_entry["stages"].get(stage)
+            if old is None or "error" in old or "error" in new or old["min_ms"] <= 0:
+                continue
+            change = 100 * (new["min_ms"] / old["min_ms"] - 1)
+            if abs(change) < threshold:
+                continue
+            label = "slower" if change > 0 else "faster"
+            regressions += change > 0
+            print(f"  {name} [{stage}]: {old['min_ms']:.2f} -> {new['min_ms']:.2f} ms "
+                  f"({change:+.0f}%, {label})")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per stage before timing")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="stop repeating a stage once this many seconds are spent on it")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains this text")
+    parser.add_argument("--slow", action="store_true", help="include programs that take minutes to run")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--json", help="write results to this file for tracking between commits")
+    parser.add_argument("--compare", help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percentage change in a stage's fastest run reported by --compare")
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    programs = {name: program for name, program in load_programs().items()
+                if args.filter in name and (args.slow or name not in SLOW_BENCHMARKS)}
+
+    results = run_benchmark(programs, stages, args.warmup, args.repeat, args.budget,
+                            progress=lambda name, _: print(f"  {name}", file=sys.stderr, flush=True))
+    print_report(results, stages)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        # A non-zero exit lets CI fail on slowdowns
+        return 1 if compare(baseline, results, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
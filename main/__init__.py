@@ -0,0 +1,75 @@
+"""
+Lucent language implementation.
+
+The package is split into submodules (nodes, lexer, parser, typechecker,
+interpreter, compiler, vm, structs, arrays, ropes, lbc, cache). Importing
+the package does no work: each submodule is loaded the first time one of
+its names is accessed, so `from main import parse` only pulls in the
+lexer and parser.
+"""
+import importlib
+
+# Public name -> (submodule, attribute)
+_exports = {}
+
+def _export(module, *names):
+    for name in names:
+        _exports[name] = (module, name)
+
+_export("nodes",
+        "AST", "BinOp", "Number", "If", "Var", "Assign", "String", "Let", "Sequence",
+        "Fun", "Call", "Closure", "PrintLn", "Return", "StrConversion", "While",
+        "Continue", "Break", "Array", "ArrayAccess", "ArrayAssign", "Length", "Dict",
+        "DictAccess", "DictAssign", "Slice", "TypeDef", "TypeInstantiation", "ArrayInit",
+        "Input", "ParseInt", "Flush", "ReadInput", "FileCall", "Token", "NumberToken", "OperatorToken", "KeywordToken",
+        "VarToken", "StringToken", "TypeToken", "TypeDefToken", "ArrayToken")
+_export("errors", "ParseError", "TypeError", "ResourceLimitExceeded")
+_export("lexer", "lex")
+_export("parser", "parse")
+_export("typechecker", "TypeCheckError", "TypeChecker")
+_export("interpreter",
+        "ReturnValue", "LoopControl", "ContinueLoop", "BreakLoop", "check_concat_types",
+        "convert_to_string", "check_type", "lookup", "update_env", "RuntimeContext", "e")
+_export("compiler",
+        "BytecodeInstruction", "BytecodeCompiler", "compile_and_run",
+        "compile_with_static_type_check")
+_export("vm", "BytecodeVM")
+_export("structs", "StructType", "StructInstance")
+_export("arrays", "TypedArray")
+_export("ropes", "Rope")
+_export("mapped", "MappedFile")
+_export("profiler", "Profiler", "LineProfiler")
+_export("memory", "MemoryReport")
+_export("limits", "ResourceLimits")
+_export("lbc", "LBC_MAGIC", "LBC_VERSION", "BytecodeFormatError")
+_export("cache", "COMPILER_VERSION", "BytecodeCache", "compile_cached")
+_export("batch", "BatchRunner", "ProgramResult", "run_batch")
+
+# Names kept from the single-module layout
+_exports.update({
+    "encode_bytecode": ("lbc", "dumps"),
+    "decode_bytecode": ("lbc", "loads"),
+    "save_bytecode": ("lbc", "save"),
+    "load_bytecode": ("lbc", "load"),
+})
+
+_submodules = {"nodes", "errors", "lexer", "parser", "typechecker", "interpreter",
+               "compiler", "vm", "structs", "arrays", "ropes", "output", "input", "mapped",
+               "profiler", "memory", "limits", "lbc", "cache", "runner", "batch", "server", "client", "demos"}
+
+__all__ = sorted(_exports)
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    try:
+        module, attr = _exports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), attr)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports) | _submodules)
@@ -0,0 +1,3 @@
+from .demos import run_demos
+
+run_demos()
@@ -0,0 +1,287 @@
+"""Array storage: flat typed arrays for new int[...] / new bool[...] and copy-free slices"""
+import weakref
+from array import array
+from itertools import islice
+from .errors import TypeError
+from .ropes import STRING_TYPES
+from .mapped import MappedFile
+
+class TypedArray:
+    """
+    An int or bool array of any rank, stored flat in row-major order in an
+    array('q') (int) or bytearray (bool) instead of nested lists of boxed
+    values. Indexing a multi-dimensional array returns a view of the row
+    that shares the storage, so grid[i][j] = v updates grid. Assigning a
+    whole row rebinds it as with nested lists: the new row (of any length)
+    is kept in root.rows and returned from then on, while earlier views of
+    the old row keep reading the storage. Reads, writes, len, slicing, +
+    and printing behave like the nested lists they replace.
+    """
+    __slots__ = ("root", "data", "rows", "offset", "shape", "strides")
+
+    def __init__(self, data, shape, offset=0, strides=None, root=None):
+        self.root = self if root is None else root
+        self.data = data  # only meaningful on the root; views read root.data
+        # (position, rank) -> row assigned there; only meaningful on the root
+        self.rows = None
+        self.offset = offset
+        self.shape = shape
+        if strides is None:
+            strides = []
+            step = 1
+            for size in reversed(shape):
+                strides.insert(0, step)
+                step *= size
+            strides = tuple(strides)
+        self.strides = strides
+
+    def _position(self, index):
+        size = self.shape[0]
+        if not -size <= index < size:
+            raise IndexError("Array index out of bounds")
+        if index < 0:
+            index += size
+        return self.offset + index * self.strides[0]
+
+    def _row(self, position):
+        rows = self.root.rows
+        if rows is not None:
+            row = rows.get((position, len(self.shape)))
+            if row is not None:
+                return row
+        return TypedArray(None, self.shape[1:], position, self.strides[1:], self.root)
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            return self._slice(index)
+        # Inlined _position: this is the hot path
+        size = self.shape[0]
+        if not -size <= index < size:
+            raise IndexError("Array index out of bounds")
+        if index < 0:
+            index += size
+        position = self.offset + index * self.strides[0]
+        if len(self.shape) > 1:
+            return self._row(position)
+        data = self.root.data
+        if data.__class__ is bytearray:
+            return data[position] == 1
+        return data[position]
+
+    def __setitem__(self, index, value):
+        position = self._position(index)
+        if len(self.shape) > 1:
+            # Rebind the row; its old elements stay in the storage for earlier views of it
+            root = self.root
+            if root.rows is None:
+                root.rows = {}
+            root.rows[(position, len(self.shape))] = value
+            return
+        data = self.root.data
+        if data.__class__ is bytearray:
+            fits = value.__class__ is bool
+        elif data.__class__ is list:
+            fits = True
+        else:
+            fits = value.__class__ is int and -2**63 <= value < 2**63
+        if not fits:
+            data = self._promote()
+        data[position] = value
+
+    def _promote(self):
+        """Switch the storage to a plain list so it can hold any value"""
+        root = self.root
+        data = root.data
+        root.data = [x == 1 for x in data] if data.__class__ is bytearray else list(data)
+        return root.data
+
+    def _slice(self, index):
+        start, stop, step = index.indices(self.shape[0])
+        count = max(0, stop - start)
+        if len(self.shape) > 1:
+            # Like slicing a list of rows: a new list sharing the rows, whose own slots can be rebound
+            return [self[i] for i in range(start, start + count)]
+        data = self.root.data
+        first = self.offset + start * self.strides[0]
+        return TypedArray(data[first:first + count * self.strides[0]:self.strides[0]], (count,))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(self.shape[0]):
+            yield self[i]
+
+    def tolist(self):
+        """Equivalent nested lists"""
+        if len(self.shape) > 1:
+            # Rows assigned from a list literal are plain lists already
+            return [row.tolist() if hasattr(row, "tolist") else row for row in self]
+        return list(self)
+
+    def __add__(self, other):
+        if other.__class__ is ArraySlice:
+            other = other.tolist()
+        if isinstance(other, TypedArray):
+            if (len(self.shape) == 1 and len(other.shape) == 1
+                    and self.root.data.__class__ is other.root.data.__class__ is not list):
+                return TypedArray(self[:].data + other[:].data, (len(self) + len(other),))
+            return list(self) + list(other)
+        if isinstance(other, list):
+            return list(self) + other
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, (TypedArray, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+# Shorter slices are cheaper to copy than to track
+VIEW_MIN_LENGTH = 16
+
+class ArraySlice:
+    """
+    A lazy arr[start:end] of a list. It reads through to the list until
+    either side is written to, so recursive divide-and-conquer code slices
+    in O(1) instead of copying. Writing to the view first copies the
+    elements into the view; writing to the list first calls detach_views,
+    which does the same for every live view of it, so results are always
+    as if the slice had been copied when it was taken.
+
+    Views are registered in the live_views dict of the runtime that took
+    them (a BytecodeVM or an e() call's RuntimeContext), mapping id(list)
+    to {id(view): weak reference}. Each program has its own, so programs
+    running on different threads never touch each other's registry.
+    """
+    __slots__ = ("base", "start", "stop", "owned", "views", "__weakref__")
+
+    def __init__(self, base, start, stop, views):
+        self.base = base
+        self.start = start
+        self.stop = stop
+        self.owned = False  # True once base is the view's own copy
+        self.views = views
+        key = id(base)
+        refs = views.get(key)
+        if refs is None:
+            refs = views[key] = {}
+        refs[id(self)] = weakref.ref(self, lambda ref, view_id=id(self): _forget(views, key, view_id))
+
+    def materialize(self):
+        """Give the view its own copy of its elements"""
+        self.base = self.base[self.start:self.stop]
+        self.start = 0
+        self.stop = len(self.base)
+        self.owned = True
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            start, stop, _ = index.indices(self.stop - self.start)
+            return slice_array(self.base, self.start + start, self.start + max(start, stop), self.views)
+        size = self.stop - self.start
+        if not -size <= index < size:
+            raise IndexError("Array index out of bounds")
+        if index < 0:
+            index += size
+        return self.base[self.start + index]
+
+    def __setitem__(self, index, value):
+        size = self.stop - self.start
+        if not -size <= index < size:
+            raise IndexError("Array index out of bounds")
+        if index < 0:
+            index += size
+        if not self.owned:
+            self.materialize()
+        elif id(self.base) in self.views:
+            detach_views(self.base, self.views)
+        self.base[index] = value
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        return islice(self.base, self.start, self.stop)
+
+    def tolist(self):
+        return self.base[self.start:self.stop]
+
+    def __add__(self, other):
+        if isinstance(other, ARRAY_TYPES):
+            return self.tolist() + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, ARRAY_TYPES):
+            return list(other) + self.tolist()
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, ARRAY_TYPES):
+            return self.tolist() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+def _forget(views, key, view_id):
+    refs = views.get(key)
+    if refs is not None:
+        refs.pop(view_id, None)
+        if not refs:
+            views.pop(key, None)
+
+def detach_views(base, views):
+    """Call before writing to base: its live slices in views take their own copies"""
+    refs = views.pop(id(base), None)
+    if refs:
+        for ref in refs.values():
+            view = ref()
+            if view is not None and view.base is base:
+                view.materialize()
+
+def slice_array(seq, start, end, views=None):
+    """
+    seq[start:end], as a view registered in views (a runtime's live_views)
+    when seq is a list, or a view of one; without views it is copied
+    """
+    if seq.__class__ is list:
+        start, stop, _ = slice(start, end).indices(len(seq))
+        if views is not None and stop - start >= VIEW_MIN_LENGTH:
+            return ArraySlice(seq, start, stop, views)
+    elif seq.__class__ is ArraySlice:
+        return seq[start:end]
+    return seq[start:end]
+
+# Types an array value can have at run time
+ARRAY_TYPES = (list, TypedArray, ArraySlice)
+# Values that can be indexed and sliced
+SEQUENCE_TYPES = ARRAY_TYPES + STRING_TYPES + (MappedFile,)
+
+def new_array(element_type, sizes):
+    """Default-initialised array for new T[sizes...]"""
+    if element_type in ("int", "bool"):
+        total = 1
+        for size in sizes:
+            total *= size
+        data = array("q", [0]) * total if element_type == "int" else bytearray(total)
+        return TypedArray(data, tuple(sizes))
+    if element_type == "string":
+        def create_array(dimensions):
+            if not dimensions:
+                return ""
+            return [create_array(dimensions[1:]) for _ in range(dimensions[0])]
+        return create_array(list(sizes))
+    raise TypeError(f"Unsupported array element type: {element_type}")
@@ -0,0 +1,263 @@
+"""
+Batch runner: compiles and runs many programs in a pool of worker processes.
+
+Workers are started once and kept warm (compiler and VM imported, a small
+program already run), so each program costs a compile and a run rather than
+interpreter startup. Every program gets its own VM with its output captured,
+the stdin text given to the batch and a timeout; results come back in the
+order the programs were given, with an aggregated report.
+
+    with BatchRunner(jobs=4, timeout=10) as runner:
+        for result in runner.run(paths):
+            print(result.path, result.status, result.output)
+
+Usage: python3 -m main.batch <program.txt|program.lbc>... [-j N] [--timeout SECONDS]
+                             [--stdin FILE] [--output-dir DIR] [--print-output]
+                             [--json results.json] [--nocache] [--typecheck]
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout, redirect_stderr
+from dataclasses import dataclass, asdict
+from io import StringIO
+from pathlib import Path
+
+from .parser import parse
+from .compiler import BytecodeCompiler, compile_with_static_type_check
+from .vm import BytecodeVM
+from .cache import compile_cached
+from .limits import ResourceLimits
+from .errors import ResourceLimitExceeded
+from . import lbc
+
+# Result statuses, in report order; anything but "ok" fails the batch
+STATUSES = ("ok", "error", "timeout", "limit")
+# Compiler messages kept per program (e.g. the type checker's verdict)
+MAX_LOG = 2000
+WARM_UP_PROGRAM = 'int i = 0;\nwhile (i < 10) { i = i + 1; }\nprintln("warm " ++ str(i));\n'
+
+@dataclass
+class ProgramResult:
+    """Outcome of one program: status is one of STATUSES, times are in seconds"""
+    path: str
+    status: str
+    output: str
+    error: str = ""
+    log: str = ""
+    compile_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+    @property
+    def seconds(self):
+        return self.compile_seconds + self.run_seconds
+
+class ProgramTimeout(BaseException):
+    """Raised by the timer; not an Exception, so the VM's error handling cannot swallow it"""
+
+def _alarm(signum, frame):
+    raise ProgramTimeout()
+
+def _warm_up():
+    """Pool initializer: run a small program so the first real one pays no first-use costs"""
+    BytecodeVM(BytecodeCompiler().compile(parse(WARM_UP_PROGRAM)), stdout=StringIO()).run()
+
+def _compile(path, cache, typecheck):
+    if path.endswith(".lbc"):
+        return lbc.load(path)
+    with open(path) as f:
+        code = f.read()
+    if cache:
+        return compile_cached(code, typecheck=typecheck)
+    if typecheck:
+        return compile_with_static_type_check(code)
+    return BytecodeCompiler().compile(parse(code))
+
+def run_program(path, timeout=None, stdin="", limits=None, cache=True, typecheck=False):
+    """Compile and run one program in this process; timeout covers both stages"""
+    out, log = StringIO(), StringIO()
+    result = ProgramResult(path, "error", "")
+    vm = None
+    if timeout:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        # The compiler prints its messages; keep them with the result, not on the worker's stdout
+        with redirect_stdout(log), redirect_stderr(log):
+            bytecode = _compile(path, cache, typecheck)
+        result.compile_seconds = time.perf_counter() - start
+        vm = BytecodeVM(bytecode, limits=limits, stdout=out, stdin=StringIO(stdin))
+        try:
+            vm.run()
+            result.status = "ok"
+        finally:
+            vm.output.flush()
+    except ProgramTimeout:
+        result.status, result.error = "timeout", f"timed out after {timeout:g}s"
+    except ResourceLimitExceeded as e:
+        result.status, result.error = "limit", f"Resource limit exceeded: {e}"
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    elapsed = time.perf_counter() - start
+    if vm is None:
+        result.compile_seconds = elapsed
+    else:
+        result.run_seconds = elapsed - result.compile_seconds
+    result.output = out.getvalue()
+    result.log = log.getvalue()[:MAX_LOG]
+    return result
+
+class BatchRunner:
+    """
+    A pool of warm worker processes that runs batches of programs. Keep one
+    around to run many batches without starting new workers; a worker that
+    dies (e.g. killed for memory) is replaced and its batch carries on.
+    limits defaults to ResourceLimits.from_env().
+    """
+
+    def __init__(self, jobs=None, timeout=10.0, stdin="", limits=None, cache=True, typecheck=False):
+        self.jobs = max(jobs or os.cpu_count() or 1, 1)
+        self.options = dict(timeout=timeout, stdin=stdin, cache=cache, typecheck=typecheck,
+                            limits=ResourceLimits.from_env() if limits is None else limits)
+        self.pool = None
+
+    def _start(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_up)
+        return self.pool
+
+    def run(self, paths, progress=None):
+        """Run every program; results are in the order of paths"""
+        paths = [str(path) for path in paths]
+        results = [None] * len(paths)
+        attempts = Counter()
+        pending = list(range(len(paths)))
+        while pending:
+            pool = self._start()
+            futures = {pool.submit(run_program, paths[index], **self.options): index for index in pending}
+            pending = []
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    # Any unfinished program may have killed the worker; retry each once in a new pool
+                    attempts[index] += 1
+                    if attempts[index] < 2:
+                        pending.append(index)
+                        continue
+                    results[index] = ProgramResult(paths[index], "error", "", "worker process died")
+                if progress:
+                    progress(results[index])
+            if pending:
+                self.close()
+                pending.sort()
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_batch(paths, jobs=None, progress=None, **options):
+    """Run programs with a BatchRunner that is closed afterwards; options as for BatchRunner"""
+    with BatchRunner(jobs, **options) as runner:
+        return runner.run(paths, progress)
+
+def summarize(results, seconds=None, jobs=None):
+    """Aggregated figures for a batch, as saved by --json"""
+    times = [result.seconds for result in results]
+    return {
+        "programs": len(results),
+        "jobs": jobs,
+        "seconds": seconds,
+        "statuses": {status: count for status, count in Counter(result.status for result in results).items()},
+        "compile_seconds": sum(result.compile_seconds for result in results),
+        "run_seconds": sum(result.run_seconds for result in results),
+        "mean_seconds": sum(times) / len(times) if times else 0.0,
+        "max_seconds": max(times, default=0.0),
+    }
+
+def format_report(results, seconds, jobs):
+    """Text report: each failing program, the slowest programs and the totals"""
+    lines = []
+    for result in results:
+        if result.status != "ok":
+            lines.append(f"{result.status.upper()}: {result.path} ({result.seconds:.2f}s) {result.error}")
+    summary = summarize(results, seconds, jobs)
+    slowest = sorted(results, key=lambda result: result.seconds, reverse=True)[:5]
+    if slowest:
+        lines.append("Slowest: " + ", ".join(f"{result.path} {result.seconds:.3f}s" for result in slowest))
+    lines.append(f"Compile {summary['compile_seconds']:.2f}s, run {summary['run_seconds']:.2f}s in total, "
+                 f"{summary['mean_seconds'] * 1000:.1f}ms per program")
+    counts = ", ".join(f"{summary['statuses'][status]} {status}" for status in STATUSES if status in summary["statuses"])
+    lines.append(f"{len(results)} programs in {seconds:.2f}s with {jobs} workers: {counts or 'none run'}")
+    return "\n".join(lines)
+
+def write_outputs(results, directory):
+    """Write each program's output to <directory>/<file name>.out"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    seen = Counter()
+    for result in results:
+        name = Path(result.path).name
+        # Keep names unique when programs in different directories share one
+        seen[name] += 1
+        suffix = "" if seen[name] == 1 else f".{seen[name]}"
+        (directory / f"{name}{suffix}.out").write_text(result.output)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("programs", nargs="+", help="source (.txt) or precompiled (.lbc) programs")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds before a program is stopped (0 for none)")
+    parser.add_argument("--stdin", help="file whose contents every program reads as input")
+    parser.add_argument("--output-dir", help="write each program's output to <dir>/<name>.out")
+    parser.add_argument("--print-output", action="store_true", help="print each program's output after the run")
+    parser.add_argument("--json", help="write the results and summary to this file")
+    parser.add_argument("--nocache", action="store_true", help="recompile even if a cached build exists")
+    parser.add_argument("--typecheck", action="store_true", help="type check programs before running them")
+    args = parser.parse_args(argv)
+
+    stdin = Path(args.stdin).read_text() if args.stdin else ""
+    jobs = max(args.jobs, 1)
+    start = time.perf_counter()
+
+    def progress(result):
+        print("." if result.status == "ok" else result.status[0].upper(), end="", flush=True)
+
+    results = run_batch(args.programs, jobs, progress=progress, timeout=args.timeout, stdin=stdin,
+                        cache=not args.nocache, typecheck=args.typecheck)
+    seconds = time.perf_counter() - start
+    print()
+    if args.print_output:
+        for result in results:
+            print(f"==> {result.path} ({result.status}) <==")
+            print(result.output, end="" if result.output.endswith("\n") or not result.output else "\n")
+    print(format_report(results, seconds, jobs))
+    if args.output_dir:
+        write_outputs(results, args.output_dir)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "summary": summarize(results, seconds, jobs),
+            "programs": [dict(asdict(result), seconds=result.seconds) for result in results],
+        }, indent=2) + "\n")
+    return 0 if all(result.status == "ok" for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
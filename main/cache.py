@@ -0,0 +1,126 @@
+"""On-disk cache of compiled bytecode so unchanged programs skip lex/parse/compile"""
+from pathlib import Path
+import hashlib
+import os
+
+from .compiler import BytecodeCompiler, compile_with_static_type_check
+from .parser import parse
+from . import lbc
+
+COMPILER_VERSION = "0.1"
+
+def _compiler_fingerprint():
+    """Hash of the compiler version and implementation, so edits invalidate old entries"""
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha256(COMPILER_VERSION.encode())
+        for source in sorted(Path(__file__).parent.glob("*.py")):
+            h.update(source.name.encode())
+            h.update(source.read_bytes())
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+_fingerprint = None
+
+class BytecodeCache:
+    """A directory of compiled programs with size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get("LUCENT_CACHE_DIR") or Path.home() / ".cache" / "lucent"
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("LUCENT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, source, variant=""):
+        """Cache key for a source text compiled in the given mode"""
+        h = hashlib.sha256(_compiler_fingerprint().encode())
+        h.update(variant.encode())
+        h.update(b"\0")
+        h.update(source.encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.lbc"
+
+    def get(self, key):
+        """Return the cached bytecode for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            bytecode = lbc.loads(data)
+        except (lbc.BytecodeFormatError, UnicodeDecodeError):
+            # Corrupt or truncated entry - drop it and recompile
+            path.unlink(missing_ok=True)
+            return None
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return bytecode
+
+    def put(self, key, bytecode):
+        """Store bytecode under key, then evict old entries beyond the size limit"""
+        try:
+            # Constants the .lbc format cannot hold make the program uncacheable
+            data = lbc.dumps(bytecode)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+            tmp_path.write_bytes(data)
+            # Atomic rename so concurrent runs never read a half-written entry
+            os.replace(tmp_path, self._path(key))
+        except (OSError, lbc.BytecodeFormatError):
+            # The cache is an optimisation only; never fail a run because of it
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.lbc"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        for path in self.cache_dir.glob("*.lbc"):
+            path.unlink(missing_ok=True)
+
+def compile_cached(code_string, typecheck=False, cache=None):
+    """
+    Compile code through the on-disk bytecode cache.
+    On a hit the lexer, parser, type checker and compiler are skipped entirely.
+    """
+    if cache is None:
+        cache = BytecodeCache()
+
+    key = cache.key(code_string, "typecheck" if typecheck else "plain")
+    bytecode = cache.get(key)
+    if bytecode is not None:
+        return bytecode
+
+    if typecheck:
+        bytecode = compile_with_static_type_check(code_string)
+    else:
+        compiler = BytecodeCompiler()
+        bytecode = compiler.compile(parse(code_string))
+
+    cache.put(key, bytecode)
+    return bytecode
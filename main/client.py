@@ -0,0 +1,101 @@
+"""
+Thin client for the compile server (see main.server).
+
+Deliberately imports nothing from the compiler, so starting it costs only
+interpreter startup. Exits with status 75 (EX_TEMPFAIL) when no server is
+reachable or stdin is a terminal (interactive programs read it directly),
+which run.sh uses to fall back to running the program locally.
+
+Usage: python3 -m main.client <source_file|bytecode.lbc> [option]
+"""
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+
+from .limits import ENV_VARIABLES
+
+FRAME_HEADER = struct.Struct("<cI")
+EX_TEMPFAIL = 75
+
+def default_socket_path():
+    """Per-user socket path, overridable with $LUCENT_SOCKET"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.environ.get("LUCENT_SOCKET") or os.path.join(runtime_dir, f"lucent-{os.getuid()}.sock")
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Compile server closed the connection")
+        data += chunk
+    return bytes(data)
+
+def run(filename, option=None, socket_path=None, stdin_data=None, stdout=None, stderr=None, cwd=None):
+    """
+    Submit a program to the compile server and stream its output.
+    Returns the program's exit status, or None if no server is reachable or,
+    when stdin_data is not given, stdin is a terminal. Otherwise piped stdin
+    is forwarded once connected. The program runs in cwd (default: ours).
+    """
+    # A terminal cannot be forwarded, so interactive programs run locally
+    if stdin_data is None and sys.stdin is not None and sys.stdin.isatty():
+        return None
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+
+    source = None
+    if not filename.endswith(".lbc"):
+        with open(filename, "r") as f:
+            source = f.read()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path or default_socket_path())
+        except OSError:
+            return None
+
+        # Only consume stdin once we know the server will run the program
+        if stdin_data is None:
+            stdin_data = "" if sys.stdin is None else sys.stdin.read()
+        request = {
+            "filename": os.path.abspath(filename),
+            "cwd": cwd or os.getcwd(),
+            "source": source,
+            "option": option,
+            "stdin": stdin_data,
+            "output_buffer": os.environ.get("LUCENT_OUTPUT_BUFFER"),
+            "limits": {variable: os.environ.get(variable) for variable in ENV_VARIABLES.values()},
+        }
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+
+        while True:
+            kind, length = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+            payload = _recv_exact(sock, length)
+            if kind == b"O":
+                stdout.write(payload)
+                stdout.flush()
+            elif kind == b"E":
+                stderr.write(payload)
+                stderr.flush()
+            elif kind == b"X":
+                return int(payload)
+    finally:
+        sock.close()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python3 -m main.client <source_file|bytecode.lbc> [option]")
+        return 1
+    option = argv[1] if len(argv) > 1 and argv[1] else None
+    status = run(argv[0], option)
+    return EX_TEMPFAIL if status is None else status
+
+if __name__ == "__main__":
+    sys.exit(main())
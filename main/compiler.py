@@ -0,0 +1,1227 @@
+"""Bytecode compiler: lowers the AST to BytecodeInstruction sequences"""
+from dataclasses import dataclass, field
+
+from .nodes import (BinOp, Number, If, Var, Assign, String, Let, Sequence, Fun, Call, PrintLn,
+                    Return, StrConversion, While, Break, Array, ArrayAccess, ArrayAssign, Length,
+                    Dict, DictAccess, DictAssign, Slice, TypeDef, TypeInstantiation, ArrayInit,
+                    Input, ParseInt, Flush, ReadInput, FileCall)
+from .parser import parse
+from .typechecker import TypeChecker, TypeCheckError, static_type
+
+# Opcodes that skip the VM's dynamic type checks, used when the type checker
+# has proven both operands are ints (or strings, for ++)
+INT_OPCODES = {
+    "+": "INT_ADD",
+    "-": "INT_SUB",
+    "*": "INT_MUL",
+    "/": "INT_DIV",
+    "%": "INT_MOD",
+    "<": "INT_LT",
+    ">": "INT_GT",
+    "<=": "INT_LE",
+    ">=": "INT_GE",
+    "==": "INT_EQ",
+    "!=": "INT_NE",
+}
+
+# Add a new Bytecode class for compilation
+@dataclass
+class BytecodeInstruction:
+    opcode: str
+    args: list = None
+    # Source line the instruction was compiled from (not part of its identity)
+    line: int = field(default=None, compare=False, repr=False)
+
+class BytecodeCompiler:
+    """
+    Compiles one program. All compilation state lives on the instance and
+    the result carries the variable map the VM needs, so programs can be
+    compiled and run side by side
+    """
+    
+    def __init__(self, typed=False):
+        # Set when the AST has passed TypeChecker, so the types it recorded
+        # on the nodes can be trusted to pick specialised opcodes
+        self.typed = typed
+        self.instructions = []
+        self.constants = []
+        self.variables = {}  # Maps variable names to indices
+        self.global_vars = set()  # Track global variables
+        self.labels = {}
+        self.next_label = 0
+        self.current_stack_size = 0
+        self.max_stack_size = 0
+        self.current_line = None  # Source line of the statement being compiled
+
+    def get_label(self):
+        """Generate a new unique label"""
+        label = f"L{self.next_label}"
+        self.next_label += 1
+        return label
+
+    def emit(self, opcode, *args):
+        """Add an instruction to the bytecode sequence"""
+        self.instructions.append(BytecodeInstruction(opcode, list(args), self.current_line))
+        
+        # Update stack size tracking
+        if opcode in ['LOAD_CONST', 'LOAD_VAR', 'LOAD_GLOBAL']:
+            self.current_stack_size += 1
+        elif opcode in ['STORE_VAR', 'STORE_GLOBAL', 'POP_TOP']:
+            self.current_stack_size -= 1
+        elif opcode in ['BINARY_ADD', 'BINARY_SUB', 'BINARY_MUL', 'BINARY_DIV',
+                       'BINARY_MOD', 'BINARY_POWER', 'BINARY_CONCAT',
+                       'INT_ADD', 'INT_SUB', 'INT_MUL', 'INT_DIV', 'INT_MOD', 'STR_CONCAT']:
+            self.current_stack_size -= 1  # Two operands pop, one result push
+        
+        self.max_stack_size = max(self.max_stack_size, self.current_stack_size)
+        
+        return len(self.instructions) - 1
+
+    def add_constant(self, value):
+        """Add a constant to the constant pool"""
+        if value not in self.constants:
+            self.constants.append(value)
+        return self.constants.index(value)
+        
+    def mark_as_global(self, var_name):
+        """Mark a variable as global"""
+        self.global_vars.add(var_name)
+        
+    def is_global(self, var_name):
+        """Check if a variable is global"""
+        return var_name in self.global_vars
+
+    def static_type(self, node):
+        """
+        Type proven by the type checker for node, or None when compiling
+        unchecked code or when the type involves "any" or "unknown", whose
+        values are only known at run time
+        """
+        if not self.typed:
+            return None
+        node_type = static_type(node)
+        if node_type is None or node_type.startswith(("any", "unknown")):
+            return None
+        return node_type
+
+    def binary_opcode(self, op, left, right):
+        """Pick the opcode for a binary operator, specialised when the operand types are known"""
+        left_type = self.static_type(left)
+        right_type = self.static_type(right)
+        if left_type == right_type == "int" and op in INT_OPCODES:
+            return INT_OPCODES[op]
+        if left_type == right_type == "string" and op == "++":
+            return "STR_CONCAT"
+        return None
+
+    def compile(self, ast):
+        """Compile an AST into bytecode"""
+        # First pass: identify global variables
+        self._identify_globals(ast)
+        
+        # Second pass: compile with knowledge of globals
+        self._compile_node(ast)
+        
+        # Third pass: function inlining (commented out but keeping code)
+        # self._inline_functions()
+        
+        # Fourth pass: peephole optimization
+        self._optimize_peephole()
+        
+        return {
+            'instructions': self.instructions,
+            'constants': self.constants,
+            'variables': self.variables,
+            'global_vars': self.global_vars,
+            'max_stack': self.max_stack_size,
+            # Line table: the source line of each instruction
+            'lines': [instr.line for instr in self.instructions]
+        }
+        
+    def _identify_globals(self, node, scope=None):
+        """First pass to identify global variables"""
+        if scope is None:
+            scope = set()  # Initialize empty scope for tracking local variables
+            
+        if node is None:
+            return
+            
+        match node:
+            case Let(var, expr, body, _):
+                # Add variable to current scope
+                if var not in scope:
+                    self.global_vars.add(var)  # It's a global declaration
+                    
+                # Process the initializer expression
+                self._identify_globals(expr, scope)
+                
+                # Create a new scope for the body that includes this variable
+                new_scope = scope.copy()
+                new_scope.add(var)
+                self._identify_globals(body, new_scope)
+                
+            case Fun(n, params, rt, b, e):
+                # Add function name to current scope
+                if n not in scope:
+                    self.global_vars.add(n)  # It's a global function
+                    
+                # Process function body with new scope including parameters
+                func_scope = scope.copy()
+                for param_name, _ in params:
+                    func_scope.add(param_name)  # Parameters are local to function
+                self._identify_globals(b, func_scope)
+                
+                # Continue with code after function
+                self._identify_globals(e, scope)
+                
+            case Assign(name, expr):
+                # Check if name is in scope
+                if name not in scope:
+                    self.global_vars.add(name)  # It's a global assignment
+                self._identify_globals(expr, scope)
+                
+            case Var(name):
+                # Nothing to do for variable references
+                pass
+                
+            case BinOp(op, left, right):
+                self._identify_globals(left, scope)
+                self._identify_globals(right, scope)
+                
+            case If(cond, then, else_):
+                self._identify_globals(cond, scope)
+                self._identify_globals(then, scope)
+                self._identify_globals(else_, scope)
+                
+            case Sequence(statements):
+                for stmt in statements:
+                    self._identify_globals(stmt, scope)
+                    
+            case While(cond, body):
+                self._identify_globals(cond, scope)
+                self._identify_globals(body, scope)
+                
+            case Call(n, args):
+                for arg in args:
+                    self._identify_globals(arg, scope)
+                
+            case Return(expr):
+                self._identify_globals(expr, scope)
+                
+            # Handle other node types as needed
+            case _:
+                # For other node types, no specific action needed
+                pass
+
+    def _compile_node(self, node):
+        """Recursively compile a node in the AST"""
+        if node is None:
+            return
+            
+        match node:
+            case Number(val):
+                const_idx = self.add_constant(int(val))
+                self.emit("LOAD_CONST", const_idx)
+            
+            case String(val):
+                const_idx = self.add_constant(val)
+                self.emit("LOAD_CONST", const_idx)
+            
+            case BinOp(op, left, right):
+                # Special handling for precedence in complex expressions
+                if op == '*' and isinstance(left, BinOp) and left.op in ['+', '-']:
+                    # First compute the right operand
+                    self._compile_node(right)
+                    # Then compute the left operand parts
+                    self._compile_node(left.left)
+                    self._compile_node(left.right)
+                    # Apply the appropriate operations in the correct order
+                    self.emit(self.binary_opcode(left.op, left.left, left.right) or
+                              {'+': "BINARY_ADD", '-': "BINARY_SUB"}[left.op])
+                    self.emit(self.binary_opcode(op, left, right) or "BINARY_MUL")
+                else:
+                    # Normal compilation order for other expressions
+                    self._compile_node(left)
+                    self._compile_node(right)
+                    
+                    # Map operators to bytecode operations
+                    op_map = {
+                        "+": "BINARY_ADD",
+                        "-": "BINARY_SUB",
+                        "*": "BINARY_MUL",
+                        "/": "BINARY_DIV",
+                        "%": "BINARY_MOD",
+                        "**": "BINARY_POWER",
+                        "++": "BINARY_CONCAT",
+                        "<": "BINARY_LT",
+                        ">": "BINARY_GT",
+                        "<=": "BINARY_LE",
+                        ">=": "BINARY_GE",
+                        "==": "BINARY_EQ",
+                        "!=": "BINARY_NE",
+                        "and": "BINARY_AND",
+                        "or": "BINARY_OR"
+                    }
+                    self.emit(self.binary_opcode(op, left, right) or op_map[op])
+            
+            case Var(name):
+                # Check if it's a global variable
+                if self.is_global(name):
+                    # Ensure it has an index
+                    if name not in self.variables:
+                        self.variables[name] = len(self.variables)
+                    self.emit("LOAD_GLOBAL", self.variables[name])
+                else:
+                    # It's a local variable
+                    if name not in self.variables:
+                        self.variables[name] = len(self.variables)
+                    self.emit("LOAD_VAR", self.variables[name])
+            
+            case Assign(name, expr):
+                self._compile_node(expr)
+                
+                # Check if it's a global variable
+                if self.is_global(name):
+                    if name not in self.variables:
+                        self.variables[name] = len(self.variables)
+                    self.emit("STORE_GLOBAL", self.variables[name])
+                else:
+                    # It's a local variable
+                    if name not in self.variables:
+                        self.variables[name] = len(self.variables)
+                    self.emit("STORE_VAR", self.variables[name])
+            
+            case Let(var, expr, body, _):
+                self._compile_node(expr)
+                if var not in self.variables:
+                    self.variables[var] = len(self.variables)
+                
+                # Store in the correct context (local or global)
+                if self.is_global(var):
+                    self.emit("STORE_GLOBAL", self.variables[var])
+                else:
+                    self.emit("STORE_VAR", self.variables[var])
+                
+                self._compile_node(body)
+            
+            case If(cond, then, else_):
+                else_label = self.get_label()
+                end_label = self.get_label()
+                
+                # Compile condition
+                self._compile_node(cond)
+                self.emit("JUMP_IF_FALSE", else_label)
+                
+                # Compile then branch
+                self._compile_node(then)
+                self.emit("JUMP", end_label)
+                
+                # Compile else branch
+                self.emit("LABEL", else_label)
+                self._compile_node(else_)
+                
+                # End of if-else
+                self.emit("LABEL", end_label)
+            
+            case While(cond, body):
+                self._compile_while(node)
+            
+            case PrintLn(expr):
+                self._compile_node(expr)
+                self.emit("PRINT")
+            
+            case StrConversion(expr):
+                self._compile_node(expr)
+                self.emit("STR_CONVERT")
+            
+            case Sequence(statements):
+                for i, stmt in enumerate(statements):
+                    self._compile_node(stmt)
+                    # Add POP_TOP if the statement produces a value that's not used
+                    # and it's not the last statement in a sequence
+                    if (i < len(statements) - 1 and 
+                        not isinstance(stmt, (Assign, Let, If, While, PrintLn, TypeDef))):
+                        # The discarded value belongs to the statement's line
+                        outer_line = self.current_line
+                        self.current_line = getattr(stmt, "line", None) or outer_line
+                        self.emit("POP_TOP")
+                        self.current_line = outer_line
+            
+            case _:
+                # Handle by the enhanced compile node
+                enhanced_compile_node(self, node)
+
+    def _compile_function(self, node):
+        """Compile a function definition"""
+        # Store function name in variables map
+        if node.n not in self.variables:
+            self.variables[node.n] = len(self.variables)
+        
+        # Generate unique labels for function entry and exit
+        func_label = self.get_label()
+        end_label = self.get_label()
+        
+        # Store function metadata in constants pool
+        # (label, params, return_type)
+        func_meta = (func_label, node.params, node.rt)
+        func_meta_idx = self.add_constant(func_meta)
+        
+        # Create a function object and store it in the variable
+        self.emit("LOAD_CONST", func_meta_idx)
+        self.emit("MAKE_FUNCTION")
+        self.emit("STORE_VAR", self.variables[node.n])
+        
+        # Jump over the function code
+        self.emit("JUMP", end_label)
+        
+        # Function body starts here
+        self.emit("LABEL", func_label)
+        
+        # Store the parameter values passed on the stack
+        # These parameters will be pushed onto the stack by CALL_FUNCTION
+        # Note: The parameters are already on the stack at this point, put there by CALL_FUNCTION
+        for param_name, _ in reversed(node.params):
+            if param_name not in self.variables:
+                self.variables[param_name] = len(self.variables)
+            self.emit("STORE_VAR", self.variables[param_name])
+        
+        # Compile the function body
+        self._compile_node(node.b)
+        
+        # If no explicit return, add a default return None
+        self.emit("LOAD_CONST", self.add_constant(0))  # Default return value
+        self.emit("RETURN_VALUE")
+        
+        # Function definition is done, continue with the rest of the code
+        self.emit("LABEL", end_label)
+        
+        # Compile the rest of the program
+        self._compile_node(node.e)
+
+    def _compile_call(self, node):
+        """Compile a function call"""
+        # Load the function object
+        if node.n not in self.variables:
+            self.variables[node.n] = len(self.variables)
+        self.emit("LOAD_VAR", self.variables[node.n])
+        
+        # Evaluate and push arguments
+        for arg in node.args:
+            self._compile_node(arg)
+        
+        # Call the function
+        self.emit("CALL_FUNCTION", len(node.args))  # Number of arguments
+
+    def _compile_return(self, node):
+        """Compile a return statement"""
+        # Evaluate the return expression
+        self._compile_node(node.expr)
+        
+        # Return from function
+        self.emit("RETURN_VALUE")
+
+    def _optimize_peephole(self):
+        """Apply peephole optimizations to the instruction list."""
+        optimized_instructions = []
+        # Specialised int opcodes fold exactly like their generic forms
+        fold_opcodes = {int_op: "BINARY_" + int_op[4:] for int_op in INT_OPCODES.values()}
+        i = 0
+        while i < len(self.instructions):
+            instruction = self.instructions[i]
+            optimized = False
+
+            # --- Constant Folding Example ---
+            # Pattern: LOAD_CONST c1, LOAD_CONST c2, BINARY_OP
+            if i + 2 < len(self.instructions):
+                instr1 = self.instructions[i]
+                instr2 = self.instructions[i+1]
+                instr3 = self.instructions[i+2]
+
+                if (instr1.opcode == "LOAD_CONST" and
+                    instr2.opcode == "LOAD_CONST" and
+                    fold_opcodes.get(instr3.opcode, instr3.opcode) in [
+                                       "BINARY_ADD", "BINARY_SUB", "BINARY_MUL", 
+                                       "BINARY_DIV", "BINARY_MOD", "BINARY_POWER",
+                                       "BINARY_LT", "BINARY_GT", "BINARY_LE", 
+                                       "BINARY_GE", "BINARY_EQ", "BINARY_NE"]):
+
+                    const1_idx = instr1.args[0]
+                    const2_idx = instr2.args[0]
+                    val1 = self.constants[const1_idx]
+                    val2 = self.constants[const2_idx]
+
+                    # Only fold if both are integers for arithmetic/comparison
+                    # Add checks for other types (e.g., strings for CONCAT) if needed
+                    if isinstance(val1, int) and isinstance(val2, int):
+                        result = None
+                        opcode = fold_opcodes.get(instr3.opcode, instr3.opcode)
+                        try:
+                            if opcode == "BINARY_ADD": result = val1 + val2
+                            elif opcode == "BINARY_SUB": result = val1 - val2
+                            elif opcode == "BINARY_MUL": result = val1 * val2
+                            elif opcode == "BINARY_DIV": result = val1 // val2 # Assuming integer division
+                            elif opcode == "BINARY_MOD": result = val1 % val2
+                            elif opcode == "BINARY_POWER": result = val1 ** val2
+                            elif opcode == "BINARY_LT": result = val1 < val2
+                            elif opcode == "BINARY_GT": result = val1 > val2
+                            elif opcode == "BINARY_LE": result = val1 <= val2
+                            elif opcode == "BINARY_GE": result = val1 >= val2
+                            elif opcode == "BINARY_EQ": result = val1 == val2
+                            elif opcode == "BINARY_NE": result = val1 != val2
+                        except Exception:
+                            # Avoid folding if operation fails (e.g., division by zero)
+                            result = None 
+
+                        if result is not None:
+                            new_const_idx = self.add_constant(result)
+                            optimized_instructions.append(BytecodeInstruction("LOAD_CONST", [new_const_idx], instr1.line))
+                            i += 3 # Skip the original 3 instructions
+                            optimized = True
+            
+            # --- Add more optimization patterns here ---
+            # Example: Redundant Load/Store (LOAD_VAR x, STORE_VAR x) -> remove both
+            # if i + 1 < len(self.instructions):
+            #     instr1 = self.instructions[i]
+            #     instr2 = self.instructions[i+1]
+            #     if (instr1.opcode == "LOAD_VAR" and instr2.opcode == "STORE_VAR" and
+            #         instr1.args[0] == instr2.args[0]): # Same variable index
+            #         i += 2 # Skip both instructions
+            #         optimized = True
+
+            # If no optimization applied, copy the original instruction
+            if not optimized:
+                optimized_instructions.append(instruction)
+                i += 1
+
+        self.instructions = optimized_instructions
+        # Note: If optimizations add/remove instructions, label positions might change.
+        # The current VM resolves labels at runtime (_find_label), so this should be okay
+        # as long as LABEL instructions themselves are preserved.
+
+    def _inline_functions(self):
+        """Inline small, non-recursive function calls where beneficial"""
+        # Build a map of function definitions: label -> (start_idx, end_idx, param_count)
+        function_map = {}
+        
+        # First pass: identify function definitions and their boundaries
+        i = 0
+        while i < len(self.instructions):
+            instr = self.instructions[i]
+            
+            # Look for LOAD_CONST (function metadata) followed by MAKE_FUNCTION
+            if (instr.opcode == "LOAD_CONST" and i + 1 < len(self.instructions) and
+                self.instructions[i+1].opcode == "MAKE_FUNCTION"):
+                
+                # Get function metadata from constants pool
+                const_idx = instr.args[0]
+                func_meta = self.constants[const_idx]
+                
+                if isinstance(func_meta, tuple) and len(func_meta) >= 3:
+                    func_label = func_meta[0]
+                    params = func_meta[1]
+                    
+                    # Find function body (between LABEL and either RETURN_VALUE or end of instructions)
+                    start_idx = None
+                    for j in range(i+2, len(self.instructions)):
+                        if (self.instructions[j].opcode == "LABEL" and 
+                            self.instructions[j].args[0] == func_label):
+                            start_idx = j + 1  # Start after the label
+                            break
+                    
+                    if start_idx:
+                        # Find the end (first RETURN_VALUE)
+                        end_idx = None
+                        for j in range(start_idx, len(self.instructions)):
+                            if self.instructions[j].opcode == "RETURN_VALUE":
+                                end_idx = j
+                                break
+                        
+                        if end_idx:
+                            # Store function information
+                            function_map[func_label] = {
+                                'start_idx': start_idx,
+                                'end_idx': end_idx,
+                                'param_count': len(params),
+                                'body_size': end_idx - start_idx,
+                                'called_count': 0,  # Will be incremented during analysis
+                                'contains_recursion': False  # Will be set during analysis
+                            }
+            
+            i += 1
+        
+        # Second pass: analyze function calls to identify candidates for inlining
+        # and check for recursion
+        i = 0
+        while i < len(self.instructions):
+            instr = self.instructions[i]
+            
+            # Look for LOAD_VAR/LOAD_GLOBAL followed by potential arguments and CALL_FUNCTION
+            if instr.opcode in ["LOAD_VAR", "LOAD_GLOBAL"]:
+                # Scan ahead to find the CALL_FUNCTION instruction
+                j = i + 1
+                while j < len(self.instructions) and self.instructions[j].opcode not in ["CALL_FUNCTION"]:
+                    j += 1
+                
+                if j < len(self.instructions) and self.instructions[j].opcode == "CALL_FUNCTION":
+                    # This is a function call
+                    call_instr = self.instructions[j]
+                    arg_count = call_instr.args[0]
+                    
+                    # Get function name
+                    var_idx = instr.args[0]  # Fix: use instr.args[0] instead of args[0]
+                    var_name = self._get_var_name(var_idx)
+                    
+                    # If we have a function definition with this name in our constants
+                    for func_label, func_info in function_map.items():
+                        # For each LOAD_CONST instruction that loads a function object
+                        for k in range(len(self.instructions)):
+                            if (self.instructions[k].opcode == "LOAD_CONST" and 
+                                k + 2 < len(self.instructions) and 
+                                self.instructions[k+1].opcode == "MAKE_FUNCTION" and
+                                self.instructions[k+2].opcode in ["STORE_VAR", "STORE_GLOBAL"]):
+                                
+                                const_idx = self.instructions[k].args[0]
+                                store_idx = self.instructions[k+2].args[0]
+                                store_name = self._get_var_name(store_idx)
+                                
+                                if store_name == var_name:
+                                    func_meta = self.constants[const_idx]
+                                    if isinstance(func_meta, tuple) and len(func_meta) >= 3 and func_meta[0] == func_label:
+                                        # We found a call to this function
+                                        func_info['called_count'] += 1
+                                        
+                                        # Check for recursive calls within this function
+                                        for l in range(func_info['start_idx'], func_info['end_idx']):
+                                            rec_instr = self.instructions[l]
+                                            if rec_instr.opcode in ["LOAD_VAR", "LOAD_GLOBAL"]:
+                                                rec_var_idx = rec_instr.args[0]
+                                                rec_var_name = self._get_var_name(rec_var_idx)
+                                                if rec_var_name == var_name:
+                                                    # This is a recursive function
+                                                    func_info['contains_recursion'] = True
+            
+            i += 1
+        
+        # Third pass: inline small, non-recursive functions that are called only a few times
+        inlinings_done = 0
+        i = 0
+        while i < len(self.instructions):
+            instr = self.instructions[i]
+            
+            # Look for LOAD_VAR/LOAD_GLOBAL followed by potential arguments and CALL_FUNCTION
+            if instr.opcode in ["LOAD_VAR", "LOAD_GLOBAL"]:
+                # Scan ahead to find the CALL_FUNCTION instruction
+                j = i + 1
+                while j < len(self.instructions) and self.instructions[j].opcode not in ["CALL_FUNCTION"]:
+                    j += 1
+                
+                if j < len(self.instructions) and self.instructions[j].opcode == "CALL_FUNCTION":
+                    # This is a function call
+                    call_instr = self.instructions[j]
+                    arg_count = call_instr.args[0]
+                    
+                    # Get function name
+                    var_idx = instr.args[0]
+                    var_name = self._get_var_name(var_idx)
+                    
+                    # Find the function definition in our constants
+                    func_label = None
+                    func_info = None
+                    
+                    for k in range(len(self.instructions)):
+                        if (self.instructions[k].opcode == "LOAD_CONST" and 
+                            k + 2 < len(self.instructions) and 
+                            self.instructions[k+1].opcode == "MAKE_FUNCTION" and
+                            self.instructions[k+2].opcode in ["STORE_VAR", "STORE_GLOBAL"]):
+                            
+                            const_idx = self.instructions[k].args[0]
+                            store_idx = self.instructions[k+2].args[0]
+                            store_name = self._get_var_name(store_idx)
+                            
+                            if store_name == var_name:
+                                func_meta = self.constants[const_idx]
+                                if isinstance(func_meta, tuple) and len(func_meta) >= 3:
+                                    candidate_label = func_meta[0]
+                                    if candidate_label in function_map:
+                                        func_label = candidate_label
+                                        func_info = function_map[func_label]
+                    
+                    # If we found the function and it's a good candidate for inlining
+                    if (func_label and func_info and 
+                        not func_info['contains_recursion'] and 
+                        func_info['body_size'] <= 20 and  # Small function
+                        func_info['called_count'] <= 3 and  # Not called many times
+                        arg_count == func_info['param_count']):  # Argument count matches
+                        
+                        # This function can be inlined
+                        inline_start = i
+                        inline_end = j + 1
+                        
+                        # Calculate the point where arguments start on the stack
+                        # We need to adjust if there are instructions between LOAD_VAR and CALL_FUNCTION
+                        arg_start = i + 1
+                        arg_end = j  # Position of CALL_FUNCTION instruction
+                        
+                        # Extract function metadata to get parameter information
+                        func_var_idx = instr.args[0]
+                        func_meta = None
+                        
+                        # Find the function metadata in constants
+                        for const_idx, const_val in enumerate(self.constants):
+                            if isinstance(const_val, tuple) and len(const_val) >= 3:
+                                # Check if this is our function by looking at the function label
+                                if const_val[0] == func_label:
+                                    func_meta = const_val
+                                    break
+                        
+                        if func_meta:
+                            # Extract parameter names from metadata
+                            params = func_meta[1]  # List of (param_name, param_type) tuples
+                            
+                            # Create a new list of instructions for the inlined function
+                            new_instructions = self.instructions[:inline_start]
+                            
+                            # Collect all argument computation instructions
+                            arg_instructions = self.instructions[arg_start:arg_end]
+                            
+                            # Add all instructions that compute the arguments
+                            new_instructions.extend(arg_instructions)
+                            
+                            # Now store each argument in its corresponding parameter variable
+                            for param_idx, (param_name, _) in enumerate(reversed(params)):
+                                # Make sure parameter is registered in variables dictionary
+                                if param_name not in self.variables:
+                                    self.variables[param_name] = len(self.variables)
+                                
+                                # Add instruction to store argument value in parameter variable
+                                param_var_idx = self.variables[param_name]
+                                new_instructions.append(BytecodeInstruction("STORE_VAR", [param_var_idx]))
+                            
+                            # Add the function body instructions (excluding parameter stores)
+                            for k in range(func_info['start_idx'] + func_info['param_count'], func_info['end_idx']):
+                                body_instr = self.instructions[k]
+                                
+                                # Skip RETURN_VALUE as the result should just remain on the stack
+                                if body_instr.opcode != "RETURN_VALUE":
+                                    new_instructions.append(body_instr)
+                            
+                            # Add remaining instructions after the function call
+                            new_instructions.extend(self.instructions[inline_end:])
+                            
+                            # Update instructions
+                            self.instructions = new_instructions
+                            inlinings_done += 1
+                            
+                            # Start scanning from the beginning of the inlined code
+                            i = inline_start - 1  # Will be incremented to inline_start in next iteration
+            
+            i += 1
+        
+        if inlinings_done > 0:
+            print(f"Function inlining optimization: {inlinings_done} function calls inlined")
+            # Re-optimize after inlining
+            self._optimize_peephole()
+
+    def _get_var_name(self, var_idx):
+        """Get variable name from index (reverse lookup in variables map)"""
+        for name, idx in self.variables.items():
+            if idx == var_idx:
+                return name
+        return f"var{var_idx}"  # Fallback if name not found
+
+# Add additional bytecode-related methods to compiler
+def _compile_array(self, node):
+    """Compile array creation"""
+    # A literal of plain numbers and strings is stored as one constant tuple
+    # that the VM copies into a fresh list, e.g. lookup tables and boards
+    if node.elements and all(isinstance(element, (Number, String)) for element in node.elements):
+        values = tuple(int(element.val) if isinstance(element, Number) else element.val
+                       for element in node.elements)
+        self.emit("BUILD_CONST_LIST", self.add_constant(values))
+        return
+    for element in node.elements:
+        self._compile_node(element)
+    self.emit("BUILD_LIST", len(node.elements))
+
+def _compile_array_access(self, node):
+    """Compile array access expression with support for multi-dimensional arrays"""
+    # First load the base array
+    self._compile_node(node.array)
+    array_type = self.static_type(node.array)
+    
+    # For each dimension, load the index and access the array
+    for i, index in enumerate(node.indices):
+        self._compile_node(index)
+        if array_type and array_type.endswith("[]") and self.static_type(index) == "int":
+            # Proven to be an array indexed by an int: only the bounds check remains
+            self.emit("ARRAY_LOAD_INT")
+            array_type = array_type[:-2]
+        else:
+            self.emit("LOAD_ARRAY_ITEM")
+            array_type = None
+        # No need for additional handling after loading the last dimension
+
+def _compile_array_assign(self, node):
+    """Compile array element assignment with support for multi-dimensional arrays"""
+    # First load the base array
+    self._compile_node(node.array)
+    array_type = self.static_type(node.array)
+    
+    # For each dimension except the last, load the index and access the array
+    for i, index in enumerate(node.indices[:-1]):
+        self._compile_node(index)
+        if array_type and array_type.endswith("[]") and self.static_type(index) == "int":
+            self.emit("ARRAY_LOAD_INT")
+            array_type = array_type[:-2]
+        else:
+            self.emit("LOAD_ARRAY_ITEM")
+            array_type = None
+    
+    # For the last dimension, we'll use STORE_ARRAY_ITEM
+    self._compile_node(node.indices[-1])
+    self._compile_node(node.value)
+    self.emit("STORE_ARRAY_ITEM")
+
+def _compile_length(self, node):
+    """Compile length function call"""
+    self._compile_node(node.expr)
+    self.emit("GET_LENGTH")
+
+def _compile_slice(self, node):
+    """Compile array slicing"""
+    self._compile_node(node.sequence)
+    self._compile_node(node.start)
+    self._compile_node(node.end)
+    self.emit("SLICE")
+
+BytecodeCompiler._compile_slice = _compile_slice
+
+# Update the BytecodeCompiler._compile_node method to handle these node types
+BytecodeCompiler._compile_array = _compile_array
+BytecodeCompiler._compile_array_access = _compile_array_access
+BytecodeCompiler._compile_array_assign = _compile_array_assign
+BytecodeCompiler._compile_length = _compile_length
+
+# Add these cases to the _compile_node method's match statement
+def _compile_function(self, node):
+    """Compile a function definition"""
+    # Store function name in variables map
+    if node.n not in self.variables:
+        self.variables[node.n] = len(self.variables)
+    
+    # Generate unique labels for function entry and exit
+    func_label = self.get_label()
+    end_label = self.get_label()
+    
+    # Store function metadata in constants pool
+    # (label, params, return_type)
+    func_meta = (func_label, node.params, node.rt)
+    func_meta_idx = self.add_constant(func_meta)
+    
+    # Create a function object and store it in the variable
+    self.emit("LOAD_CONST", func_meta_idx)
+    self.emit("MAKE_FUNCTION")
+    self.emit("STORE_VAR", self.variables[node.n])
+    
+    # Jump over the function code
+    self.emit("JUMP", end_label)
+    
+    # Function body starts here
+    self.emit("LABEL", func_label)
+    
+    # Store the parameter values passed on the stack
+    # These parameters will be pushed onto the stack by CALL_FUNCTION
+    # Note: The parameters are already on the stack at this point, put there by CALL_FUNCTION
+    for param_name, _ in reversed(node.params):
+        if param_name not in self.variables:
+            self.variables[param_name] = len(self.variables)
+        self.emit("STORE_VAR", self.variables[param_name])
+    
+    # Compile the function body
+    self._compile_node(node.b)
+    
+    # If no explicit return, add a default return None
+    self.emit("LOAD_CONST", self.add_constant(0))  # Default return value
+    self.emit("RETURN_VALUE")
+    
+    # Function definition is done, continue with the rest of the code
+    self.emit("LABEL", end_label)
+    
+    # Compile the rest of the program
+    self._compile_node(node.e)
+
+def _compile_call(self, node):
+    """Compile a function call"""
+    # Load the function object
+    if node.n not in self.variables:
+        self.variables[node.n] = len(self.variables)
+    self.emit("LOAD_VAR", self.variables[node.n])
+    
+    # Evaluate and push arguments
+    for arg in node.args:
+        self._compile_node(arg)
+    
+    # Call the function
+    self.emit("CALL_FUNCTION", len(node.args))  # Number of arguments
+
+def _compile_return(self, node):
+    """Compile a return statement"""
+    # Evaluate the return expression
+    self._compile_node(node.expr)
+    
+    # Return from function
+    self.emit("RETURN_VALUE")
+
+# Assign these methods to the BytecodeCompiler class
+BytecodeCompiler._compile_function = _compile_function
+BytecodeCompiler._compile_call = _compile_call
+BytecodeCompiler._compile_return = _compile_return
+
+# Add dictionary compilation support methods to BytecodeCompiler
+def _compile_dict(self, node):
+    """Compile dictionary creation"""
+    # Compile each key-value pair
+    for key, value in node.pairs:
+        self._compile_node(key)
+        self._compile_node(value)
+    self.emit("BUILD_MAP", len(node.pairs))
+
+def _compile_dict_access(self, node):
+    """Compile dictionary access"""
+    self._compile_node(node.dict)
+    if isinstance(node.key, String):
+        # Constant key, e.g. a struct field: the VM caches its offset per site
+        self.emit("LOAD_FIELD", node.key.val)
+        return
+    self._compile_node(node.key)
+    self.emit("LOAD_DICT_ITEM")
+
+def _compile_dict_assign(self, node):
+    """Compile dictionary assignment"""
+    self._compile_node(node.dict)
+    if isinstance(node.key, String):
+        self._compile_node(node.value)
+        self.emit("STORE_FIELD", node.key.val)
+        return
+    self._compile_node(node.key)
+    self._compile_node(node.value)
+    self.emit("STORE_DICT_ITEM")
+
+# Assign these methods to the BytecodeCompiler class
+BytecodeCompiler._compile_dict = _compile_dict
+BytecodeCompiler._compile_dict_access = _compile_dict_access
+BytecodeCompiler._compile_dict_assign = _compile_dict_assign
+
+# Then update the _compile_node method to use these methods
+original_compile_node = BytecodeCompiler._compile_node
+
+def enhanced_compile_node(self, node):
+    if node is None:
+        return
+    
+    match node:
+        case Array(elements):
+            self._compile_array(node)
+        case ArrayAccess(array, indices):
+            self._compile_array_access(node)
+        case ArrayAssign(array, indices, value):
+            self._compile_array_assign(node)
+        case Length(expr):
+            self._compile_length(node)
+        case Slice(sequence, start, end):
+            self._compile_slice(node)
+        case Fun(n, params, rt, b, e):
+            self._compile_function(node)
+        case Call(n, args):
+            self._compile_call(node)
+        case Return(expr):
+            self._compile_return(node)
+        case Dict(pairs):
+            self._compile_dict(node)
+        case DictAccess(dict, key):
+            self._compile_dict_access(node)
+        case DictAssign(dict, key, value):
+            self._compile_dict_assign(node)
+        case Break():
+            self._compile_break(node)
+        case TypeDef(name, fields):
+            self._compile_type_def(node)
+        case TypeInstantiation(type_name, fields):
+            self._compile_type_instantiation(node)
+        case ArrayInit(element_type, sizes):
+            self._compile_array_init(node)
+        case Input(prompt):
+            self._compile_input(node)
+        case ParseInt(expr):
+            self._compile_parse_int(node)
+        case _:
+            original_compile_node(self, node)
+
+# Now we can safely update the _compile_node method
+BytecodeCompiler._compile_node = enhanced_compile_node
+
+# Add compilation function to our interpreter
+def compile_and_run(ast, env=None):
+    """Compile AST to bytecode and run it with the VM"""
+    from .vm import BytecodeVM
+    
+    compiler = BytecodeCompiler()
+    bytecode = compiler.compile(ast)
+    
+    # Initialize variables from environment
+    if env:
+        for var_name, value in env:
+            if var_name in compiler.variables:
+                var_idx = compiler.variables[var_name]
+                # Initialize VM variables
+                while len(bytecode['variables']) <= var_idx:
+                    bytecode['variables'][var_idx] = None
+                bytecode['variables'][var_idx] = value
+    
+    vm = BytecodeVM(bytecode)
+    return vm.run()
+
+# Add break compilation support method to BytecodeCompiler
+def _compile_break(self, node):
+    """Compile a break statement"""
+    # Get the innermost loop's end label
+    if not hasattr(self, 'loop_end_labels') or not self.loop_end_labels:
+        raise SyntaxError("Break statement outside of loop")
+    end_label = self.loop_end_labels[-1]
+    self.emit("JUMP", end_label)
+
+# Add to the BytecodeCompiler class
+BytecodeCompiler._compile_break = _compile_break
+
+def _compile_while(self, node):
+    """Compile while loop with support for break statements"""
+    # Create labels for loop start and end
+    start_label = self.get_label()
+    end_label = self.get_label()
+    
+    # Initialize loop_end_labels if it doesn't exist
+    if not hasattr(self, 'loop_end_labels'):
+        self.loop_end_labels = []
+    
+    # Push the end label onto the stack for break statements
+    self.loop_end_labels.append(end_label)
+    
+    # Emit loop start label
+    self.emit("LABEL", start_label)
+    
+    # Compile condition
+    self._compile_node(node.cond)
+    
+    # Jump to end if condition is false
+    self.emit("JUMP_IF_FALSE", end_label)
+    
+    # Compile loop body
+    self._compile_node(node.body)
+    
+    # Jump back to start
+    self.emit("JUMP", start_label)
+    
+    # Emit loop end label
+    self.emit("LABEL", end_label)
+    
+    # Pop the end label as we're leaving the loop
+    self.loop_end_labels.pop()
+
+# Add this method to the BytecodeCompiler class
+BytecodeCompiler._compile_while = _compile_while
+
+def compile_with_static_type_check(code_string):
+    """
+    Parse, statically type check, and compile code.
+    Returns the bytecode or raises TypeCheckError if type check fails.
+    """
+    # Parse code to AST
+    ast = parse(code_string)
+    
+    # Perform static type checking
+    type_checker = TypeChecker()
+    try:
+        type_checker.check(ast)
+        print("Static type check passed!")
+    except TypeCheckError as e:
+        print(f"Type error: {e}")
+        raise
+    
+    # If type check passes, compile to bytecode using the proven types
+    compiler = BytecodeCompiler(typed=True)
+    bytecode = compiler.compile(ast)
+    
+    return bytecode
+
+# Add type definition and instantiation compilation methods to BytecodeCompiler
+def _compile_type_def(self, node):
+    """Compile a type definition"""
+    # Store the type name as a constant
+    type_name = node.name
+    
+    # Push each field name and type onto stack in reverse order
+    # (since we'll pop them in reverse when creating the type)
+    fields = list(node.fields.items())
+    for field_name, field_type in fields:
+        # Add constants for the field name and type
+        name_idx = self.add_constant(field_name)
+        type_idx = self.add_constant(field_type)
+        
+        # Push them onto the stack
+        self.emit("LOAD_CONST", name_idx)
+        self.emit("LOAD_CONST", type_idx)
+    
+    # Create the type definition
+    self.emit("CREATE_TYPE_DEF", type_name, len(fields))
+    
+    # Since type definitions don't push anything onto the stack,
+    # we don't need to pop anything
+    # Remove the POP_TOP instruction
+
+def _compile_type_instantiation(self, node):
+    """Compile a type instantiation"""
+    # Push the field values in the order they are written; the VM maps them
+    # to the type's layout once per site
+    field_names = []
+    for key, value in node.fields.pairs:
+        self._compile_node(value)
+        field_names.append(key.val)
+    
+    # Then create an instance of the type
+    self.emit("CREATE_STRUCT", node.type_name, field_names)
+
+def _compile_array_init(self, node):
+    """Compile array initialization"""
+    # Create a list to hold the sizes
+    sizes_list = []
+    
+    # Evaluate each size expression and append to the list
+    for size_expr in node.sizes:
+        self._compile_node(size_expr)
+        sizes_list.append(len(sizes_list))
+    
+    # Create the array with number of dimensions as argument
+    self.emit("CREATE_ARRAY_INIT", node.element_type, len(sizes_list))
+
+# Assign these methods to the BytecodeCompiler class
+BytecodeCompiler._compile_type_def = _compile_type_def
+BytecodeCompiler._compile_type_instantiation = _compile_type_instantiation
+BytecodeCompiler._compile_array_init = _compile_array_init
+
+def _compile_input(self, node):
+    """Compile input function call"""
+    # If there's a prompt, compile it first
+    if node.prompt:
+        self._compile_node(node.prompt)
+        self.emit("PRINT_NO_NEWLINE")  # Print without newline
+    
+    # Emit instruction to read input
+    self.emit("INPUT")
+
+# Add this method to BytecodeCompiler
+BytecodeCompiler._compile_input = _compile_input
+
+# Update enhanced_compile_node to use the _compile_input method
+def enhanced_compile_node(self, node):
+    if node is None:
+        return
+    
+    match node:
+        case Array(elements):
+            self._compile_array(node)
+        case ArrayAccess(array, indices):
+            self._compile_array_access(node)
+        case ArrayAssign(array, indices, value):
+            self._compile_array_assign(node)
+        case Length(expr):
+            self._compile_length(node)
+        case Slice(sequence, start, end):
+            self._compile_slice(node)
+        case Fun(n, params, rt, b, e):
+            self._compile_function(node)
+        case Call(n, args):
+            self._compile_call(node)
+        case Return(expr):
+            self._compile_return(node)
+        case Dict(pairs):
+            self._compile_dict(node)
+        case DictAccess(dict, key):
+            self._compile_dict_access(node)
+        case DictAssign(dict, key, value):
+            self._compile_dict_assign(node)
+        case Break():
+            self._compile_break(node)
+        case TypeDef(name, fields):
+            self._compile_type_def(node)
+        case TypeInstantiation(type_name, fields):
+            self._compile_type_instantiation(node)
+        case ArrayInit(element_type, sizes):
+            self._compile_array_init(node)
+        case Input(prompt):
+            self._compile_input(node)
+        case ParseInt(expr):
+            self._compile_parse_int(node)
+        case Flush():
+            self._compile_flush(node)
+        case ReadInput(builtin, path):
+            self._compile_read_input(node)
+        case FileCall(builtin, args):
+            self._compile_file_call(node)
+        case _:
+            original_compile_node(self, node)
+
+# Update the _compile_node method
+BytecodeCompiler._compile_node = enhanced_compile_node
+
+def _compile_parse_int(self, node):
+    """Compile parseInt function call"""
+    # Compile the string expression first
+    self._compile_node(node.expr)
+    
+    # Emit instruction to convert string to integer
+    self.emit("STR_TO_INT")
+
+# Add this method to BytecodeCompiler
+BytecodeCompiler._compile_parse_int = _compile_parse_int
+
+def _compile_flush(self, node):
+    """Compile flush function call"""
+    # Writes out buffered output and pushes 0 as the call's value
+    self.emit("FLUSH_OUTPUT")
+
+BytecodeCompiler._compile_flush = _compile_flush
+
+def _compile_read_input(self, node):
+    """Compile readAll/readLines/readInts function call"""
+    # The path, if any, is popped by READ_INPUT
+    if node.path:
+        self._compile_node(node.path)
+    self.emit("READ_INPUT", node.builtin, 1 if node.path else 0)
+
+BytecodeCompiler._compile_read_input = _compile_read_input
+
+def _compile_file_call(self, node):
+    """Compile a memory-mapped file builtin call"""
+    for arg in node.args:
+        self._compile_node(arg)
+    self.emit("FILE_CALL", node.builtin, len(node.args))
+
+BytecodeCompiler._compile_file_call = _compile_file_call
+
+def _track_lines(compile_node):
+    """Wrap _compile_node so emitted instructions record their statement's source line"""
+    def compile_node_at_line(self, node):
+        line = getattr(node, "line", None)
+        if line is None:
+            return compile_node(self, node)
+        outer_line = self.current_line
+        self.current_line = line
+        try:
+            return compile_node(self, node)
+        finally:
+            # Code emitted after a nested statement (e.g. a loop's jump back)
+            # belongs to the enclosing statement again
+            self.current_line = outer_line
+    return compile_node_at_line
+
+BytecodeCompiler._compile_node = _track_lines(BytecodeCompiler._compile_node)
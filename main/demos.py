@@ -0,0 +1,156 @@
+"""Demo programs exercised by `python3 -m main`"""
+from .parser import parse
+from .interpreter import e
+
+code = """
+fun extractDigits(s: string) : string {
+    string result = "";
+    int i = 0;
+    while (i < len(s)) {
+        if (s[i] >= "0" and s[i] <= "9") {
+            result = result ++ s[i];
+        };
+        i = i + 1;
+    };
+    return result;
+}
+
+fun stringToInt(s: string) : int {
+    if (len(s) == 0) {
+        return 0;
+    };
+    
+    int result = 0;
+    int i = 0;
+    while (i < len(s)) {
+        result = result * 10;
+        if (s[i] == "0") { 
+            result = result + 0; 
+        }
+        if (s[i] == "1") { result = result + 1; }
+        if (s[i] == "2") { result = result + 2; }
+        if (s[i] == "3") { result = result + 3; }
+        if (s[i] == "4") { result = result + 4; }
+        if (s[i] == "5") { result = result + 5; }
+        if (s[i] == "6") { result = result + 6; }
+        if (s[i] == "7") { result = result + 7; }
+        if (s[i] == "8") { result = result + 8; }
+        if (s[i] == "9") { result = result + 9; }
+        i = i + 1;
+    }
+    return result;
+}
+
+
+string test = "3aw4asdf8";
+string digits = " ";
+digits = extractDigits(test);
+int number = 0;
+number = stringToInt(digits);
+println(number*number);
+"""
+
+
+
+
+code1 = """
+int[][] grid = new int[3][2];
+println("Empty 2D array with default values:");
+println(grid);
+
+grid[0][0] = 10;
+grid[0][1] = 11;
+grid[1][0] = 20;
+grid[1][1] = 21;
+grid[2][0] = 30;
+grid[2][1] = 31;
+
+println("Filled 2D array:");
+println(grid);
+
+println("grid[1][1] = " ++ str(grid[1][1]));
+
+int[][] matrix = new int[3][3];
+int i = 0;
+while (i < 3) {
+    int j = 0;
+    while (j < 3) {
+        matrix[i][j] = (i+1) * 10 + j;
+        j = j + 1;
+    }
+    i = i + 1;
+}
+
+println("3x3 matrix:");
+println(matrix);
+"""
+
+
+
+# code2 = """
+# string name = input("Enter your name: ");
+# println("Hello, " ++ name);
+
+
+
+# int age = 0;
+# age = parseInt(input("Enter your age: "));
+# println("In 10 years you will be " ++ str(age + 10));
+# """
+# ast2 = parse(code2)
+# e(ast2)
+
+
+
+code4 = """
+  fun createAdder(x: int): int {
+            fun add(y: int): int {
+                return x + y;
+            }
+            
+            return add(5);
+        }
+        
+int result = 0;
+result = createAdder(10);
+println(result);
+"""
+
+# code = """
+# fun manOrBoyTest(k: int, x1: int, x2: int, x3: int, x4: int, x5: int): int {
+#     fun A(k: int, x1: int, x2: int, x3: int, x4: int): int {
+#                 if (k <= 0) {
+#                     return x1 + x2;
+#                 }
+#                 return A(k +1, x1 + 1, x1, x2, x3) + A(k + 1, x2 + 1, x1, x2, x3);
+#             }
+#             return A(k, x1, x2, x3, x4);
+#         }
+
+# println(manOrBoyTest(3, 1, 1, 1, 1, 0));
+# """
+# ast = parse(code)
+# result = e(ast)
+
+# code = """
+# int base = 1.6;
+# int exponent = 20;
+# int result = base ** exponent;
+# println(result);
+# """
+
+# # Parse the code to generate an AST
+# ast = parse(code)
+
+# # Compile the AST to bytecode
+# compiler = BytecodeCompiler()
+# bytecode = compiler.compile(ast)
+
+# # Run the bytecode using the VM
+# vm = BytecodeVM(bytecode)
+# vm.run()
+
+def run_demos():
+    """Parse and evaluate each demo program with the tree-walking interpreter"""
+    for source in (code, code1, code4):
+        e(parse(source))
@@ -0,0 +1,23 @@
+"""Exceptions shared by the lexer, parser and both execution engines"""
+
+class ParseError(Exception):
+    pass
+
+class TypeError(Exception):
+    pass
+
+class ResourceLimitExceeded(Exception):
+    """
+    A program went over one of its ResourceLimits. limit names the limit
+    ("instructions", "seconds", "call_depth" or "container_size"), maximum
+    is the configured value and used how much the program had used.
+    """
+
+    def __init__(self, limit, maximum, used):
+        super().__init__(f"{limit} limit of {maximum} exceeded ({used})")
+        self.limit = limit
+        self.maximum = maximum
+        self.used = used
+
+    def as_dict(self):
+        return {"limit": self.limit, "maximum": self.maximum, "used": self.used}
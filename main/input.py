@@ -0,0 +1,59 @@
+"""Bulk input: readAll(), readLines() and readInts() read stdin or a whole file at once"""
+import sys
+from array import array
+
+from .arrays import TypedArray
+from .output import program_output
+
+def read_line(stdin=None):
+    """One line of input without its line ending, or "" at end of input"""
+    if stdin is None:
+        # input() keeps line editing when stdin is a terminal
+        try:
+            return input()
+        except EOFError:
+            return ""
+    line = stdin.readline()
+    return line[:-1] if line.endswith("\n") else line
+
+def read_all(path=None, stdin=None, output=None):
+    """
+    The whole file at path, or the rest of stdin (default sys.stdin) when
+    path is None; output is flushed first, so a prompt shows before blocking
+    """
+    if path is None:
+        (program_output if output is None else output).flush()
+        return (sys.stdin if stdin is None else stdin).read()
+    with open(str(path), "r") as f:
+        return f.read()
+
+def read_lines(path=None, stdin=None, output=None):
+    """read_all(...) split into lines, without their line endings"""
+    return read_all(path, stdin, output).splitlines()
+
+def read_ints(path=None, stdin=None, output=None):
+    """The whitespace-separated integers in read_all(...), as a flat int[]"""
+    tokens = read_all(path, stdin, output).split()
+    try:
+        data = array("q", map(int, tokens))
+    except OverflowError:
+        # Some value needs more than 64 bits; TypedArray promotes to a list
+        data = [int(token) for token in tokens]
+    except ValueError:
+        bad = next(token for token in tokens if not _is_int(token))
+        raise ValueError(f"readInts: '{bad}' is not an integer")
+    return TypedArray(data, (len(data),))
+
+def _is_int(token):
+    try:
+        int(token)
+        return True
+    except ValueError:
+        return False
+
+# Builtin name -> implementation, shared by the VM and e()
+READERS = {
+    "readAll": read_all,
+    "readLines": read_lines,
+    "readInts": read_ints,
+}
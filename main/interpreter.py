@@ -0,0 +1,469 @@
+"""Tree-walking interpreter: evaluates an AST directly with e()"""
+from .nodes import (AST, BinOp, Number, If, Var, Assign, String, Let, Sequence, Fun, Call,
+                    Closure, PrintLn, Return, StrConversion, While, Continue, Break, Array,
+                    ArrayAccess, ArrayAssign, Length, Dict, DictAccess, DictAssign, Slice,
+                    TypeDef, TypeInstantiation, ArrayInit, Input, ParseInt, Flush, ReadInput, FileCall)
+from .errors import TypeError
+from .ropes import Rope, STRING_TYPES, concat, value_type_name
+from .arrays import ARRAY_TYPES, SEQUENCE_TYPES, new_array, detach_views, slice_array
+from .output import OutputBuffer, program_output
+from .input import READERS, read_line
+from .mapped import FILE_BUILTINS, open_mapped, close_mapped
+
+class ReturnValue(Exception):
+    def __init__(self, value):
+        self.value = value
+
+class LoopControl(Exception):
+    pass
+
+class ContinueLoop(LoopControl):
+    pass
+
+class BreakLoop(LoopControl):
+    pass
+
+def check_concat_types(left, right):
+    """Stricter type checking for string concatenation"""
+    if not isinstance(left, STRING_TYPES) or not isinstance(right, STRING_TYPES):
+        raise TypeError(f"String concatenation requires string operands, got {value_type_name(left)} and {value_type_name(right)}")
+    return concat(left, right)
+
+def convert_to_string(value, context=""):
+    """Explicit string conversion with type checking"""
+    if isinstance(value, (int, str, Rope)):
+        return str(value)
+    raise TypeError(f"{context}Cannot convert {type(value).__name__} to string")
+
+def check_type(value, expected_type, types=()):
+    """value, once checked against expected_type; types holds the user-defined type names"""
+    if '[' in expected_type:  # Handle array types
+        base_type = expected_type.split('[')[0].strip()
+        if not isinstance(value, ARRAY_TYPES):
+            raise TypeError(f"Type mismatch: expected {expected_type} but got {type(value).__name__}")
+        if (base_type == "int" and not all(isinstance(x, int) for x in value)) or \
+           (base_type == "string" and not all(isinstance(x, STRING_TYPES) for x in value)):
+            raise TypeError(f"Array elements must be {base_type}")
+        return value
+    
+    # Handle user-defined types
+    if expected_type in types:
+        if not isinstance(value, dict):
+            raise TypeError(f"Type mismatch: expected {expected_type} but got {type(value).__name__}")
+        # Additional type checking could be done here
+        return value
+    
+    if expected_type == "any":  # Special case for len() function
+        return value
+    elif expected_type == "int":
+        if not isinstance(value, int):
+            raise TypeError(f"Type mismatch: expected int but got {type(value).__name__}")
+    elif expected_type == "string":
+        if not isinstance(value, STRING_TYPES):
+            raise TypeError(f"Type mismatch: expected string but got {type(value).__name__}")
+    elif expected_type == "bool":
+        if not isinstance(value, bool):
+            raise TypeError(f"Type mismatch: expected bool but got {type(value).__name__}")
+    return value
+
+def lookup(env, v):
+    # Add built-in functions
+    if v == "len":
+        # Create a special closure for the len function
+        params = [("obj", "any")]
+        body = Length(Var("obj"))
+        return Closure(params, body, "int", [])
+    
+    # First check in local environment
+    env_reversed = list(reversed(env))
+    for u, uv in env_reversed:
+        if u == v:
+            return uv
+    
+    # If not found, check in global environment (first binding in the environment)
+    for u, uv in env:
+        if u == v:
+            return uv
+    
+    raise ValueError(f"Variable {v} not found")
+
+
+def update_env(env, name, value):
+    """Update an existing variable in the environment or add it if doesn't exist"""
+    for i, (var, _) in enumerate(env):
+        if var == name:
+            env[i] = (name, value)
+            return
+    env.append((name, value))
+
+class RuntimeContext:
+    """
+    Per-program state of a run of e(): where it prints and reads input, the
+    user-defined types (name -> fields) it has declared, its copy-on-write
+    slices (see ArraySlice) and the files it has mapped. Every e() call
+    gets a new one unless given one, so programs can run side by side on
+    different threads, and a host can pass the same one to several calls
+    to keep their types and streams, then close() it.
+    """
+
+    def __init__(self, stdout=None, stdin=None):
+        # Output to a given stream is buffered (see OutputBuffer.for_stream)
+        self.output = program_output if stdout is None else OutputBuffer.for_stream(stdout)
+        # None reads sys.stdin
+        self.input = stdin
+        self.types = {}
+        self.live_views = {}
+        # Files mapped by openMapped (see close)
+        self.mapped_files = []
+
+    def close(self):
+        """Close the files the program mapped; e() does this for the contexts it creates"""
+        close_mapped(self.mapped_files)
+
+def e(tree: AST, env=None, stdout=None, stdin=None, context=None) -> int | bool | str | list | dict:
+    """
+    Evaluate tree in env (a list of (name, value) pairs). stdout and stdin
+    replace sys.stdout and sys.stdin for this program; context is a
+    RuntimeContext to run in instead of a new one
+    """
+    own_context = context is None
+    if own_context:
+        context = RuntimeContext(stdout, stdin)
+    try:
+        return _evaluate(tree, [] if env is None else env, context)
+    finally:
+        if context.output is not program_output:
+            context.output.flush()
+        if own_context:
+            context.close()
+
+def _evaluate(tree: AST, env, context):
+    match tree:
+        case PrintLn(expr):
+            result = _evaluate(expr, env, context)
+            context.output.write(f"{result}\n")
+            return result
+        case Number(v):
+            return int(v)
+        case Var(v):
+            return lookup(env, v)
+        case Fun(f, params, rt, b, c):
+            # Create a closure with the current environment captured
+            # For recursive functions, we need to include the function name in its own environment
+            function_env = env.copy()
+            closure = Closure(params, b, rt, function_env)
+            
+            # Add the function to the environment BEFORE creating the closure
+            # This allows recursive calls to find the function
+            update_env(env, f, closure)
+            
+            # Store function name in closure's environment for recursion
+            update_env(closure.captured_env, f, closure)
+            
+            return _evaluate(c, env, context)
+        case Call(f, args):
+            # Get the function object
+            func_obj = lookup(env, f)
+            
+            # Evaluate arguments in the caller's environment
+            arg_values = [_evaluate(arg, env, context) for arg in args]
+            
+            if isinstance(func_obj, Closure):
+                # Handle closure with captured environment
+                params = func_obj.params
+                # param_names = [param_name for param_name in params]
+                # param_types = [param_type for param_type in params]
+                body = func_obj.body
+                return_type = func_obj.return_type
+                
+                # Start with the captured environment from when function was defined
+                call_env = func_obj.captured_env.copy()
+                
+                # Check that the number of arguments matches the number of parameters
+                if len(arg_values) != len(params):
+                    raise TypeError(f"Function '{f}' expected {len(params)} arguments but got {len(arg_values)}")
+                
+                # Type checking and binding for all arguments
+                for i, ((param_name, param_type), arg_value) in enumerate(zip(params, arg_values)):
+                    if param_type == "string" and isinstance(arg_value, int):
+                        arg_value = str(arg_value)
+                    elif param_type == "int" and isinstance(arg_value, STRING_TYPES):
+                        raise TypeError(f"Function '{f}' parameter {i+1} expects int but got string")
+                    
+                    try:
+                        check_type(arg_value, param_type, context.types)
+                    except TypeError as te:
+                        raise TypeError(f"Function '{f}' parameter {i+1} type mismatch: {str(te)}")
+                    
+                    # Add parameter binding to the closure environment
+                    update_env(call_env, param_name, arg_value)
+            
+            else:
+                raise TypeError(f"Cannot call {f}, not a function")
+            
+            try:
+                result = _evaluate(body, call_env, context)
+                return check_type(result, return_type, context.types)
+            except ReturnValue as rv:
+                return check_type(rv.value, return_type, context.types)
+        case BinOp("+", l, r):
+            return _evaluate(l, env, context) + _evaluate(r, env, context)
+        case BinOp("-", l, r):
+            return _evaluate(l, env, context) - _evaluate(r, env, context)
+        case BinOp("*", l, r):
+            return _evaluate(l, env, context) * _evaluate(r, env, context)
+        case BinOp("/", l, r):
+            return _evaluate(l, env, context) // _evaluate(r, env, context)
+        case BinOp("<", l, r):
+            return _evaluate(l, env, context) < _evaluate(r, env, context)
+        case BinOp("<=", l, r):
+            return _evaluate(l, env, context) <= _evaluate(r, env, context)
+        case BinOp(">=", l, r):
+            return _evaluate(l, env, context) >= _evaluate(r, env, context)
+        case BinOp("==", l, r):
+            return _evaluate(l, env, context) == _evaluate(r, env, context)
+        case BinOp("!=", l, r):
+            return _evaluate(l, env, context) != _evaluate(r, env, context)
+        case BinOp("and", l, r):
+            return _evaluate(l, env, context) and _evaluate(r, env, context)
+        case BinOp("or", l, r):
+            return _evaluate(l, env, context) or _evaluate(r, env, context)
+        case BinOp("%", l, r):
+            return _evaluate(l, env, context) % _evaluate(r, env, context)
+        case BinOp("**", l, r):
+            return _evaluate(l, env, context) ** _evaluate(r, env, context)
+        case String(v):
+            return v
+        case BinOp("++", l, r):  
+            left_val = _evaluate(l, env, context)
+            right_val = _evaluate(r, env, context)
+
+            # No automatic conversion - both must be strings
+            if not isinstance(left_val, STRING_TYPES) or not isinstance(right_val, STRING_TYPES):
+                raise TypeError(f"Cannot concatenate {value_type_name(left_val)} with {value_type_name(right_val)}. Use str() for explicit conversion")
+
+            # Long results are deferred as ropes (see ropes.py)
+            return concat(left_val, right_val)
+        case BinOp(">", l, r):
+            return _evaluate(l, env, context) > _evaluate(r, env, context)
+        case If(cond, then, else_):
+            if _evaluate(cond, env, context):
+                return _evaluate(then, env, context)
+            else:
+                return _evaluate(else_, env, context)
+        case Sequence(statements):
+            result = None
+            for stmt in statements:
+                result = _evaluate(stmt, env, context)
+            return result
+        case Assign(name, expr):
+            value = _evaluate(expr, env, context)
+            update_env(env, name, value)
+            return value
+        case Let(var, expr, body):
+            value = _evaluate(expr, env, context)  
+            update_env(env, var, value)  # Update or add variable
+            return _evaluate(body, env, context) 
+        case Return(expr):
+            result = _evaluate(expr, env, context)
+            raise ReturnValue(result)
+        case StrConversion(expr):
+            val = _evaluate(expr, env, context)
+            return str(val)
+        case While(cond, body):
+            result = None
+            while _evaluate(cond, env, context):
+                try:
+                    result = _evaluate(body, env, context)
+                except ContinueLoop:
+                    continue
+                except BreakLoop:
+                    break      
+            return result if result is not None else 0
+        case Continue():
+            raise ContinueLoop()
+        case Break():
+            raise BreakLoop()
+        case Array(elements):
+            # Get array type from context if available
+            array_type = None
+            if isinstance(tree.parent, Let):
+                array_type = tree.parent.var_type  # You'll need to add var_type to Let
+            values = [_evaluate(elem, env, context) for elem in elements]
+            # Type check array elements
+            if array_type:
+                base_type = array_type.split('[')[0].strip()
+                if base_type == "int" and not all(isinstance(x, int) for x in values):
+                    raise TypeError("Array elements must be int")
+                elif base_type == "string" and not all(isinstance(x, STRING_TYPES) for x in values):
+                    raise TypeError("Array elements must be string")
+            return values
+        case ArrayAccess(array, indices):
+            arr = _evaluate(array, env, context)
+            idxs = [_evaluate(index, env, context) for index in indices]
+            for idx in idxs:
+                if isinstance(arr, SEQUENCE_TYPES):
+                    if 0 <= idx < len(arr):
+                        arr = arr[idx]
+                    else:
+                        raise IndexError("Array index out of bounds")
+                else:
+                    raise TypeError(f"Cannot index into {type(arr).__name__}")
+            return arr
+        case ArrayAssign(array, indices, value):
+            arr = _evaluate(array, env, context)
+            idxs = [_evaluate(index, env, context) for index in indices]
+            val = _evaluate(value, env, context)
+            
+            # Find array type from environment
+            array_name = array.name if isinstance(array, Var) else None
+            if array_name:
+                for var, stored_val in reversed(env):
+                    if var == array_name:
+                        # Check element type
+                        if isinstance(stored_val, ARRAY_TYPES):
+                            if stored_val and isinstance(stored_val[0], int):
+                                if not isinstance(val, int):
+                                    raise TypeError("Cannot assign non-int to int[]")
+                            elif stored_val and isinstance(stored_val[0], STRING_TYPES):
+                                if not isinstance(val, STRING_TYPES):
+                                    raise TypeError("Cannot assign non-string to string[]")
+                        break
+
+            for idx in idxs[:-1]:
+                if not isinstance(idx, int):
+                    raise TypeError("Array index must be integer")
+                if isinstance(arr, ARRAY_TYPES):
+                    if 0 <= idx < len(arr):
+                        arr = arr[idx]
+                    else:
+                        raise IndexError("Array index out of bounds")
+                else:
+                    raise TypeError("Cannot assign to non-array type")
+            
+            final_idx = idxs[-1]
+            if not isinstance(final_idx, int):
+                raise TypeError("Array index must be integer")
+            if isinstance(arr, ARRAY_TYPES):
+                if 0 <= final_idx < len(arr):
+                    if context.live_views and id(arr) in context.live_views:
+                        detach_views(arr, context.live_views)
+                    arr[final_idx] = val
+                    return val
+                raise IndexError("Array index out of bounds")
+            raise TypeError("Cannot assign to non-array type")
+        case Length(expr):
+            val = _evaluate(expr, env, context)
+            if isinstance(val, SEQUENCE_TYPES):
+                return len(val)
+            raise TypeError(f"Cannot get length of {type(val).__name__}")
+        case Slice(sequence, start, end):
+            seq = _evaluate(sequence, env, context)
+            start_idx = _evaluate(start, env, context)
+            end_idx = _evaluate(end, env, context)
+            if isinstance(seq, SEQUENCE_TYPES):
+                return slice_array(seq, start_idx, end_idx, context.live_views)
+            raise TypeError(f"Cannot slice {type(seq).__name__}")
+        case Dict(pairs):
+            return {_evaluate(key, env, context): _evaluate(value, env, context) for key, value in pairs}
+        case DictAccess(dict, key):
+            d = _evaluate(dict, env, context)
+            k = _evaluate(key, env, context)
+            return d[k]
+        case DictAssign(dict, key, value):
+            d = _evaluate(dict, env, context)
+            k = _evaluate(key, env, context)
+            v = _evaluate(value, env, context)
+            d[k] = v
+            return v
+        case TypeDef(name, fields):
+            # Register the type definition
+            context.types[name] = fields
+            return None
+            
+        case TypeInstantiation(type_name, fields):
+            # Check if the type exists
+            if type_name not in context.types:
+                raise TypeError(f"Unknown type: {type_name}")
+            
+            type_def = context.types[type_name]
+            # Create an empty dict for the instance
+            instance = {}
+            
+            # Evaluate fields Dict and extract the pairs
+            fields_dict = _evaluate(fields, env, context)
+            
+            # Check for missing required fields
+            for field_name in type_def:
+                if field_name not in fields_dict:
+                    raise TypeError(f"Missing required field '{field_name}' for type {type_name}")
+                    
+            # Check for extra fields
+            for field_name in fields_dict:
+                if field_name not in type_def:
+                    raise TypeError(f"Unknown field '{field_name}' for type {type_name}")
+            
+            # Type check and populate the instance
+            for field_name, field_value in fields_dict.items():
+                expected_type = type_def[field_name]
+                # Type check the field value
+                try:
+                    typed_value = check_type(field_value, expected_type, context.types)
+                    instance[field_name] = typed_value
+                except TypeError as te:
+                    raise TypeError(f"Field '{field_name}' type mismatch: {str(te)}")
+                
+            # Return the instance as a dict
+            return instance
+        case Closure(params, body, return_type, _):
+            # When a closure appears directly in code (not via Fun), capture the current env
+            return Closure(params, body, return_type, env.copy())
+            
+        case Input(prompt):
+            # If prompt is provided, evaluate and print it
+            output = context.output
+            if prompt:
+                prompt_value = _evaluate(prompt, env, context)
+                output.write(f"{prompt_value}")
+            # Read a line of input from stdin, once everything printed so far is shown
+            output.flush()
+            return read_line(context.input)
+        
+        case Flush():
+            context.output.flush()
+            return 0
+
+        case ReadInput(builtin, path):
+            return READERS[builtin](_evaluate(path, env, context) if path else None, context.input, context.output)
+
+        case FileCall(builtin, args):
+            function, arity = FILE_BUILTINS[builtin]
+            if len(args) != arity:
+                raise TypeError(f"{builtin}() takes exactly {arity} arguments ({len(args)} given)")
+            result = function(*[_evaluate(arg, env, context) for arg in args])
+            if function is open_mapped:
+                context.mapped_files.append(result)
+            return result
+
+        case ParseInt(expr):
+            # Evaluate the expression to get a string
+            val = _evaluate(expr, env, context)
+            # Check if it's a string
+            if not isinstance(val, STRING_TYPES):
+                raise TypeError(f"parseInt argument must be a string, got {type(val).__name__}")
+            # Try to convert to integer
+            try:
+                return int(val)
+            except ValueError:
+                # Return 0 if conversion fails
+                return 0
+        
+        case ArrayInit(element_type, sizes_expr):
+            # Evaluate the sizes expressions
+            sizes = [_evaluate(size_expr, env, context) for size_expr in sizes_expr]
+            
+            if not all(isinstance(size, int) and size >= 0 for size in sizes):
+                raise ValueError(f"Array sizes must be non-negative integers, got {sizes}")
+                
+            # int and bool arrays are stored flat (see arrays.py)
+            return new_array(element_type, sizes)
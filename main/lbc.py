@@ -0,0 +1,197 @@
+"""
+Serialized bytecode file format (.lbc)
+
+Layout: magic "LBC\0", u16 format version, u32 payload length, payload, u32 CRC32.
+The payload is a stream of tagged values (see _encode_value) holding the opcode
+name table, the instructions, the constant pool, the variable map, the global
+variable names, the maximum stack size and (from version 2) the line table.
+"""
+from pathlib import Path
+import struct
+import zlib
+
+from .compiler import BytecodeInstruction
+
+LBC_MAGIC = b"LBC\0"
+LBC_VERSION = 2
+# Versions loads() still reads; version 1 files have no line table
+LBC_READABLE_VERSIONS = (1, 2)
+
+class BytecodeFormatError(Exception):
+    """Raised when a .lbc file is malformed, corrupt or from another format version"""
+    pass
+
+def _write_varint(out, n):
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+def _read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise BytecodeFormatError("Truncated bytecode payload")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def _encode_value(out, value):
+    """Append a tagged value: N/T/F, I (zigzag varint), S (utf-8), L/U/E (list/tuple/set), D (dict)"""
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        out += b"I"
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out += b"S"
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, (list, tuple, set)):
+        if isinstance(value, list):
+            out += b"L"
+        elif isinstance(value, tuple):
+            out += b"U"
+        else:
+            out += b"E"
+            value = sorted(value, key=repr)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode_value(out, item)
+    elif isinstance(value, dict):
+        out += b"D"
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _encode_value(out, key)
+            _encode_value(out, item)
+    else:
+        raise BytecodeFormatError(f"Cannot serialize value of type {type(value).__name__}")
+
+def _decode_value(data, pos):
+    if pos >= len(data):
+        raise BytecodeFormatError("Truncated bytecode payload")
+    tag = data[pos:pos + 1]
+    pos += 1
+    if tag == b"N":
+        return None, pos
+    if tag == b"T":
+        return True, pos
+    if tag == b"F":
+        return False, pos
+    if tag == b"I":
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == b"S":
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise BytecodeFormatError("Truncated bytecode payload")
+        return data[pos:pos + length].decode("utf-8"), pos + length
+    if tag in (b"L", b"U", b"E"):
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        if tag == b"U":
+            return tuple(items), pos
+        if tag == b"E":
+            return set(items), pos
+        return items, pos
+    if tag == b"D":
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _decode_value(data, pos)
+            result[key], pos = _decode_value(data, pos)
+        return result, pos
+    raise BytecodeFormatError(f"Unknown value tag {tag!r}")
+
+def dumps(bytecode):
+    """Serialize the dict returned by BytecodeCompiler.compile to .lbc bytes"""
+    opcodes = []
+    opcode_index = {}
+    for instr in bytecode['instructions']:
+        if instr.opcode not in opcode_index:
+            opcode_index[instr.opcode] = len(opcodes)
+            opcodes.append(instr.opcode)
+
+    payload = bytearray()
+    _encode_value(payload, opcodes)
+    _write_varint(payload, len(bytecode['instructions']))
+    for instr in bytecode['instructions']:
+        _write_varint(payload, opcode_index[instr.opcode])
+        _encode_value(payload, instr.args)
+    _encode_value(payload, bytecode['constants'])
+    _encode_value(payload, bytecode['variables'])
+    _encode_value(payload, set(bytecode['global_vars']))
+    _write_varint(payload, max(bytecode.get('max_stack', 0), 0))
+    _encode_value(payload, bytecode.get('lines') or [None] * len(bytecode['instructions']))
+
+    header = LBC_MAGIC + struct.pack("<HI", LBC_VERSION, len(payload))
+    checksum = zlib.crc32(header + payload)
+    return header + bytes(payload) + struct.pack("<I", checksum)
+
+def loads(data):
+    """Deserialize .lbc bytes into a bytecode dict ready for BytecodeVM"""
+    header_size = len(LBC_MAGIC) + 6
+    if len(data) < header_size + 4 or data[:len(LBC_MAGIC)] != LBC_MAGIC:
+        raise BytecodeFormatError("Not a Lucent bytecode file")
+    version, length = struct.unpack_from("<HI", data, len(LBC_MAGIC))
+    if version not in LBC_READABLE_VERSIONS:
+        raise BytecodeFormatError(f"Unsupported bytecode format version {version} (expected {LBC_VERSION})")
+    if len(data) != header_size + length + 4:
+        raise BytecodeFormatError("Truncated bytecode file")
+    (checksum,) = struct.unpack_from("<I", data, header_size + length)
+    if zlib.crc32(data[:header_size + length]) != checksum:
+        raise BytecodeFormatError("Bytecode checksum mismatch")
+
+    payload = data[header_size:header_size + length]
+    opcodes, pos = _decode_value(payload, 0)
+    count, pos = _read_varint(payload, pos)
+    instructions = []
+    for _ in range(count):
+        op_idx, pos = _read_varint(payload, pos)
+        args, pos = _decode_value(payload, pos)
+        if op_idx >= len(opcodes):
+            raise BytecodeFormatError(f"Invalid opcode index {op_idx}")
+        instructions.append(BytecodeInstruction(opcodes[op_idx], args))
+    constants, pos = _decode_value(payload, pos)
+    variables, pos = _decode_value(payload, pos)
+    global_vars, pos = _decode_value(payload, pos)
+    max_stack, pos = _read_varint(payload, pos)
+    if version >= 2:
+        lines, pos = _decode_value(payload, pos)
+    else:
+        lines = [None] * len(instructions)
+    if pos != len(payload):
+        raise BytecodeFormatError("Trailing data in bytecode payload")
+
+    return {
+        'instructions': instructions,
+        'constants': constants,
+        'variables': variables,
+        'global_vars': global_vars,
+        'max_stack': max_stack,
+        'lines': lines
+    }
+
+def save(bytecode, path):
+    """Write compiled bytecode to a .lbc file"""
+    Path(path).write_bytes(dumps(bytecode))
+
+def load(path):
+    """Read a .lbc file and prepare it for execution by BytecodeVM"""
+    return loads(Path(path).read_bytes())
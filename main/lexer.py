@@ -0,0 +1,77 @@
+"""Lexer: turns Lucent source text into a stream of tokens"""
+from collections.abc import Iterator
+
+from .nodes import Token, NumberToken, OperatorToken, KeywordToken, VarToken, StringToken, TypeToken
+from .errors import ParseError
+
+def lex(s: str) -> Iterator[Token]:
+    i = 0
+    line = 1
+    counted = 0  # Newlines before this offset are included in line
+    while i < len(s):  
+        while i < len(s) and s[i].isspace():
+            i += 1
+
+        if i >= len(s):
+            return
+        line += s.count("\n", counted, i)
+        counted = i
+
+        if s[i].isalpha():
+            t = s[i]
+            i = i + 1
+            while i < len(s) and (s[i].isalpha() or s[i].isdigit() or s[i] == '_'):  # Allow digits and underscores in identifiers 
+                t = t + s[i]
+                i = i + 1
+            # print(t)
+            # Check if this is an array type (e.g. "int[]")
+            is_array = False
+            array_dimensions = 0
+            while i + 1 < len(s) and s[i] == '[' and s[i + 1] == ']':
+                is_array = True
+                array_dimensions += 1
+                i += 2
+                
+            if t in {"and", "or", "if", "else", "fun", "return", "println", "str", "while", "continue", "break", "dict", "type", "new"}:  # Added "new"
+                yield _at_line(KeywordToken(t), line)
+            elif t in {"int", "float", "string", "void", "bool"}:  # Types are now handled separately
+                yield _at_line(TypeToken(t, is_array, array_dimensions), line)
+            elif t == "file" and is_array:
+                # Plain `file` stays a name, which the parser reads as a type where a declaration's type goes
+                yield _at_line(TypeToken(t, is_array, array_dimensions), line)
+            else:
+                yield _at_line(VarToken(t), line)
+        elif s[i].isdigit():
+            t = s[i]
+            i = i + 1
+            while i < len(s) and s[i].isdigit():
+                t = t + s[i]
+                i = i + 1
+            yield _at_line(NumberToken(t), line)
+        elif s[i] == '"':  
+            t = ""
+            i += 1
+            while i < len(s) and s[i] != '"':
+                t += s[i]
+                i += 1
+            if i < len(s):  
+                i += 1
+                yield _at_line(StringToken(t), line)
+            else:
+                raise ParseError("Unterminated string literal")
+        else:
+            match t := s[i]:
+                case '+' | '*' | '<' | '=' | '-' | '/' | '%' | '>' | '!' | '(' | ')' | ';' | '{' | '}' | ':' | '[' | ']' | ',':  # Added comma
+                    i += 1
+                    if i < len(s):
+                        next_char = s[i]
+                        if (t + next_char) in {'**', '++', '<=', '>=', '==', '!='}: 
+                            t += next_char
+                            i += 1
+                    yield _at_line(OperatorToken(t), line)
+                case _:
+                    raise ParseError(f"Unexpected character: {t}")
+
+def _at_line(token, line):
+    token.line = line
+    return token
@@ -0,0 +1,48 @@
+"""Resource limits for running untrusted programs in BytecodeVM"""
+import os
+
+# Environment variable read for each limit by ResourceLimits.from_env
+ENV_VARIABLES = {
+    "instructions": "LUCENT_MAX_INSTRUCTIONS",
+    "seconds": "LUCENT_MAX_SECONDS",
+    "call_depth": "LUCENT_MAX_CALL_DEPTH",
+    "container_size": "LUCENT_MAX_CONTAINER_SIZE",
+}
+
+def parse_limit(value, kind=int):
+    """A limit setting, or None (unlimited) when unset, invalid or not positive"""
+    try:
+        limit = kind(value)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit > 0 else None
+
+class ResourceLimits:
+    """
+    Limits enforced by BytecodeVM.run; None means unlimited. The VM checks
+    instructions, seconds and call_depth only on backward jumps, calls and
+    returns, so straight-line code runs at full speed. Instructions are
+    counted by the span of code between those points, which can include
+    instructions an if skipped, so the count is an upper bound. container_size
+    caps the elements of any one array, dict or string the program builds.
+    """
+
+    def __init__(self, instructions=None, seconds=None, call_depth=None, container_size=None):
+        self.instructions = instructions
+        self.seconds = seconds
+        self.call_depth = call_depth
+        self.container_size = container_size
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """Limits from $LUCENT_MAX_INSTRUCTIONS, $LUCENT_MAX_SECONDS, $LUCENT_MAX_CALL_DEPTH and $LUCENT_MAX_CONTAINER_SIZE"""
+        environ = os.environ if environ is None else environ
+        return cls(**{name: parse_limit(environ.get(variable), float if name == "seconds" else int)
+                      for name, variable in ENV_VARIABLES.items()})
+
+    def __bool__(self):
+        return any(value is not None for value in vars(self).values())
+
+    def __repr__(self):
+        set_limits = ", ".join(f"{name}={value}" for name, value in vars(self).items() if value is not None)
+        return f"ResourceLimits({set_limits})"
@@ -0,0 +1,138 @@
+"""Memory-mapped files: openMapped(path) reads a file's bytes in place, without copying it"""
+import mmap
+import os
+from .errors import TypeError
+
+# Bytes examined per step when counting lines
+SCAN_CHUNK = 1 << 20
+
+class MappedFile:
+    """
+    A read-only file, or a byte range of one, backed by mmap. f[i] is the
+    i-th byte as an int, f[a:b] is another MappedFile over the same mapping
+    (nothing is copied), len(f) is the size in bytes and str(f) decodes the
+    range as UTF-8. Lines are found by scanning from a remembered position,
+    so reading them in order takes constant memory however large the file.
+    """
+    __slots__ = ("mapping", "start", "stop", "path", "line_cursor")
+
+    def __init__(self, mapping, start, stop, path):
+        self.mapping = mapping  # an mmap, or b"" for an empty file
+        self.start = start
+        self.stop = stop
+        self.path = path
+        self.line_cursor = (0, start)  # (line number, offset where it starts)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            start, stop, _ = index.indices(self.stop - self.start)
+            return MappedFile(self.mapping, self.start + start, self.start + max(start, stop), self.path)
+        size = self.stop - self.start
+        if not -size <= index < size:
+            raise IndexError("File index out of bounds")
+        if index < 0:
+            index += size
+        return self.mapping[self.start + index]
+
+    def __setitem__(self, index, value):
+        raise TypeError("Mapped files are read-only")
+
+    def tobytes(self):
+        """A copy of the bytes in range"""
+        return self.mapping[self.start:self.stop]
+
+    def line_count(self):
+        """Number of lines; a final line without a newline still counts"""
+        count = 0
+        for chunk_start in range(self.start, self.stop, SCAN_CHUNK):
+            count += self.mapping[chunk_start:min(chunk_start + SCAN_CHUNK, self.stop)].count(b"\n")
+        if self.stop > self.start and self.mapping[self.stop - 1] != ord("\n"):
+            count += 1
+        return count
+
+    def line(self, number):
+        """Line number (from 0) as a string, without its line ending"""
+        line_number, offset = self.line_cursor
+        if number < line_number:
+            line_number, offset = 0, self.start
+        while line_number < number and offset < self.stop:
+            newline = self.mapping.find(b"\n", offset, self.stop)
+            offset = self.stop if newline < 0 else newline + 1
+            line_number += 1
+        if number < 0 or offset >= self.stop:
+            raise IndexError("Line index out of bounds")
+        self.line_cursor = (line_number, offset)
+        end = self.mapping.find(b"\n", offset, self.stop)
+        text = self.mapping[offset:self.stop if end < 0 else end]
+        if text.endswith(b"\r"):
+            text = text[:-1]
+        return text.decode("utf-8", errors="replace")
+
+    def find(self, text, start=0):
+        """Offset of the first occurrence of text at or after start, or -1"""
+        position = self.mapping.find(str(text).encode("utf-8"), self.start + max(start, 0), self.stop)
+        return position if position < 0 else position - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, MappedFile):
+            return self.tobytes() == other.tobytes()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return self.tobytes().decode("utf-8", errors="replace")
+
+    def close(self):
+        """Unmap the file; this and every range of the same mapping become unusable"""
+        if isinstance(self.mapping, mmap.mmap):
+            self.mapping.close()
+
+    def __repr__(self):
+        return f"<mapped file {self.path!r} [{self.start}:{self.stop}]>"
+
+def open_mapped(path):
+    """
+    Map the file at path read-only. The mapping keeps its own descriptor
+    for the file, which close() releases; runtimes close the files their
+    program opened when it finishes (see close_mapped)
+    """
+    path = str(path)
+    with open(path, "rb") as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            mapping = b""
+        else:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return MappedFile(mapping, 0, len(mapping), path)
+
+def close_mapped(files):
+    """Close every MappedFile in the list files and empty it"""
+    for f in files:
+        f.close()
+    files.clear()
+
+def _mapped(value, builtin):
+    if not isinstance(value, MappedFile):
+        raise TypeError(f"{builtin} expects a file, got {type(value).__name__}")
+    return value
+
+def mapped_line_count(f):
+    return _mapped(f, "mappedLineCount").line_count()
+
+def mapped_line(f, number):
+    return _mapped(f, "mappedLine").line(number)
+
+def mapped_find(f, text, start):
+    return _mapped(f, "mappedFind").find(text, start)
+
+# Builtin name -> (implementation, number of arguments), shared by the VM and e()
+FILE_BUILTINS = {
+    "openMapped": (open_mapped, 1),
+    "mappedLineCount": (mapped_line_count, 1),
+    "mappedLine": (mapped_line, 2),
+    "mappedFind": (mapped_find, 3),
+}
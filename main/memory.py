@@ -0,0 +1,191 @@
+"""Memory instrumentation for BytecodeVM: peak RSS, allocation growth per opcode and the largest live containers"""
+import sys
+import tracemalloc
+from collections import Counter
+from .arrays import TypedArray, ArraySlice
+from .profiler import function_owners
+from .ropes import Rope
+from .structs import StructInstance
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Values reported as containers in the live-memory listing
+CONTAINER_TYPES = (TypedArray, ArraySlice, list, dict, StructInstance)
+# Language names of the values a promoted TypedArray's list storage can hold
+ELEMENT_KINDS = {int: "int", bool: "bool", str: "string"}
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where it is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def deep_size(value, seen=None):
+    """
+    Bytes held by value and everything reachable from it. Storage shared with
+    something already in seen (e.g. a view of a counted array) is not counted
+    again. Mapped files count only their handle, since the file is not on the heap.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [value]
+    # Iterative, so deeply nested ropes and lists cannot exhaust the Python stack
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, TypedArray):
+            pending.append(item.root.data)
+            if item.root.rows:
+                pending.extend(item.root.rows.values())
+        elif isinstance(item, ArraySlice):
+            pending.append(item.base)
+        elif isinstance(item, (list, tuple)):
+            pending.extend(item)
+        elif isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, StructInstance):
+            pending.append(item.values)
+        elif isinstance(item, Rope):
+            pending.extend(part for part in (item.left, item.right, item.flat) if part is not None)
+    return total
+
+def describe(value):
+    """Short description of a container: its kind and shape"""
+    if isinstance(value, TypedArray):
+        data = value.root.data
+        if data.__class__ is list:
+            # Promoted storage holds whatever was written to it; "any" once the element types mix
+            kinds = {ELEMENT_KINDS.get(item.__class__, "any") for item in data}
+            kind = kinds.pop() if len(kinds) == 1 else "any"
+            storage = "list"
+        else:
+            kind, storage = "bool" if data.__class__ is bytearray else "int", "flat"
+        return f"{kind}{''.join(f'[{size}]' for size in value.shape)} ({storage})"
+    if isinstance(value, ArraySlice):
+        return f"slice[{len(value)}]"
+    if isinstance(value, list):
+        return f"array[{len(value)}]"
+    if isinstance(value, dict):
+        return f"dict{{{len(value)}}}"
+    if isinstance(value, StructInstance):
+        return value.struct_type.name
+    return type(value).__name__
+
+def live_containers(vm):
+    """(names, value) for each distinct container a VM's variables, frames or stack refer to"""
+    names = {index: name for name, index in vm.variable_indexes.items()}
+    found = {}
+
+    def add(label, value):
+        if isinstance(value, CONTAINER_TYPES):
+            entry = found.setdefault(id(value), ([], value))
+            if label not in entry[0]:
+                entry[0].append(label)
+
+    for name, value in vm.globals.items():
+        add(name, value)
+    for index, value in enumerate(vm.variables):
+        add(names.get(index, f"#{index}"), value)
+    for depth, frame in enumerate(vm.call_stack):
+        for index, value in enumerate(frame[1]):
+            add(f"{names.get(index, f'#{index}')} (frame {depth})", value)
+    for value in vm.stack:
+        add("<stack>", value)
+    return list(found.values())
+
+class MemoryReport:
+    """
+    Memory instrumentation for a BytecodeVM. While the program runs it
+    traces Python allocations and charges the growth in traced memory
+    between instruction fetches to the instruction that caused it, so
+    allocation can be broken down by opcode and by site. At the end it
+    reports peak RSS and the largest arrays, dicts and structs still alive.
+
+        memory = MemoryReport(vm, bytecode['lines'])
+        vm.run()
+        print(memory.report())
+    """
+
+    def __init__(self, vm, lines=None):
+        self.vm = vm
+        self.lines = lines
+        self.owners = function_owners(vm.instructions, vm.constants, vm.variable_indexes)
+        self.opcode_growth = Counter()
+        self.opcode_net = Counter()
+        self.site_growth = Counter()
+        self.last_ip = None
+        # Peak traced memory and tracemalloc's own usage, recorded by stop()
+        self.traced_peak = None
+        self.tracing_overhead = None
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.last_size = tracemalloc.get_traced_memory()[0]
+        vm.add_fetch_hook(self._on_fetch)
+
+    def _on_fetch(self, ip):
+        size = tracemalloc.get_traced_memory()[0]
+        if self.last_ip is not None:
+            grown = size - self.last_size
+            opcode = list.__getitem__(self.vm.instructions, self.last_ip).opcode
+            self.opcode_net[opcode] += grown
+            if grown > 0:
+                self.opcode_growth[opcode] += grown
+                self.site_growth[self.last_ip] += grown
+        self.last_ip = ip
+        # Read again so the bookkeeping above is not charged to the program
+        self.last_size = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        """Charge the final instruction, detach from the VM and stop tracing if this report started it"""
+        if self.last_ip is not None:
+            self._on_fetch(None)
+            self.last_ip = None
+        self.vm.remove_fetch_hook(self._on_fetch)
+        if self.traced_peak is None:
+            self.traced_peak = tracemalloc.get_traced_memory()[1]
+            self.tracing_overhead = tracemalloc.get_tracemalloc_memory()
+            if self.started_tracing:
+                tracemalloc.stop()
+
+    def _site(self, ip):
+        instr = list.__getitem__(self.vm.instructions, ip)
+        line = self.lines[ip] if self.lines and self.lines[ip] is not None else "-"
+        return line, f"{self.owners[ip]}: {instr.opcode} {instr.args or ''}".rstrip()
+
+    def report(self, limit=10):
+        """Text report: peak memory, growth per opcode and site, largest live containers"""
+        self.stop()
+        traced_peak, overhead = self.traced_peak, self.tracing_overhead
+        lines = []
+        rss = peak_rss()
+        if rss is None:
+            lines.append("Peak RSS: unavailable on this platform")
+        else:
+            lines.append(f"Peak RSS: {rss / 2**20:.1f} MB (includes {overhead / 2**20:.1f} MB of tracemalloc bookkeeping)")
+        lines.append(f"Peak traced memory: {traced_peak / 2**20:.2f} MB")
+
+        lines += ["", f"{'Growth (KB)':>12} {'Net (KB)':>10}  Opcode"]
+        for opcode, grown in self.opcode_growth.most_common(limit):
+            lines.append(f"{grown / 1024:>12.1f} {self.opcode_net[opcode] / 1024:>10.1f}  {opcode}")
+
+        lines += ["", f"{'Growth (KB)':>12} {'Offset':>7} {'Line':>5}  Function / instruction"]
+        for ip, grown in self.site_growth.most_common(limit):
+            line, site = self._site(ip)
+            lines.append(f"{grown / 1024:>12.1f} {ip:>7} {line:>5}  {site}")
+
+        lines += ["", "Largest live containers:", f"{'Size (KB)':>12}  {'Shape':<24} Variables"]
+        sized = sorted(((deep_size(value), describe(value), labels) for labels, value in live_containers(self.vm)),
+                       key=lambda item: item[0], reverse=True)
+        for size, shape, labels in sized[:limit]:
+            lines.append(f"{size / 1024:>12.1f}  {shape:<24} {', '.join(labels)}")
+        return "\n".join(lines)
@@ -0,0 +1,213 @@
+"""AST node and token definitions for the Lucent language"""
+from dataclasses import dataclass
+
+class AST:
+    line = None  # Source line of a statement, set by the parser
+
+@dataclass
+class BinOp(AST):
+    op: str
+    left: AST
+    right: AST
+
+@dataclass
+class Number(AST):
+    val: str
+
+@dataclass
+class If(AST):
+    c: AST
+    t: AST
+    e: AST
+
+@dataclass
+class Var(AST):
+    name: str
+
+@dataclass
+class Assign(AST):
+    name: str
+    e: AST
+
+@dataclass
+class String(AST):
+    val: str
+
+@dataclass
+class Let(AST):
+    var: str
+    expr: AST
+    body: AST
+    var_type: str = None  
+
+@dataclass
+class Sequence(AST):
+    statements: list[AST]
+
+@dataclass
+class Fun(AST):
+    n: str       
+    params: list[tuple[str, str]]  
+    rt: str      
+    b: AST      
+    e: AST       
+
+@dataclass
+class Call(AST):
+    n: str       
+    args: list   
+
+@dataclass
+class Closure(AST):
+    params: list         
+    body: AST           
+    return_type: str    
+    captured_env: list  
+
+@dataclass
+class PrintLn(AST):
+    expr: AST
+
+@dataclass
+class Return(AST):
+    expr: AST
+
+@dataclass
+class StrConversion(AST):
+    expr: AST
+
+@dataclass
+class While(AST):
+    cond: AST
+    body: AST
+
+@dataclass
+class Continue(AST):
+    pass
+
+@dataclass
+class Break(AST):
+    pass
+
+@dataclass
+class Array(AST):
+    elements: list[AST]
+
+@dataclass
+class ArrayAccess(AST):
+    array: AST
+    indices: list[AST]  
+
+@dataclass
+class ArrayAssign(AST):
+    array: AST
+    indices: list[AST]  
+    value: AST
+
+@dataclass
+class Length(AST):
+    expr: AST
+
+@dataclass
+class Dict(AST):
+    pairs: list[tuple[AST, AST]]
+
+@dataclass
+class DictAccess(AST):
+    dict: AST
+    key: AST
+
+@dataclass
+class DictAssign(AST):
+    dict: AST
+    key: AST
+    value: AST
+
+@dataclass
+class Slice(AST):
+    sequence: AST
+    start: AST
+    end: AST
+
+@dataclass
+class TypeDef(AST):
+    name: str
+    fields: dict  
+
+@dataclass
+class TypeInstantiation(AST):
+    type_name: str
+    fields: Dict
+
+@dataclass
+class ArrayInit(AST):
+    element_type: str
+    sizes: list[AST]  # List of sizes for multidimensional arrays
+
+@dataclass
+class Input(AST):
+    """AST node for input() function that reads a line from console"""
+    prompt: AST = None  # Optional prompt to display
+
+@dataclass
+class ParseInt(AST):
+    """AST node for parseInt() function that converts a string to integer"""
+    expr: AST
+
+@dataclass
+class Flush(AST):
+    """AST node for flush() function that writes out buffered output"""
+    pass
+
+@dataclass
+class ReadInput(AST):
+    """AST node for readAll(), readLines() and readInts(), which read stdin or a file in one go"""
+    builtin: str  # Name of the builtin called
+    path: AST = None  # Optional file to read instead of stdin
+
+@dataclass
+class FileCall(AST):
+    """AST node for the memory-mapped file builtins (openMapped, mappedLine, ...)"""
+    builtin: str  # Name of the builtin called
+    args: list[AST]
+
+class Token:
+    line = None  # Source line the token starts on, set by the lexer
+
+@dataclass
+class NumberToken(Token):
+    v: str
+
+@dataclass
+class OperatorToken(Token):
+    o: str
+
+@dataclass
+class KeywordToken(Token):
+    w: str
+
+@dataclass
+class VarToken(Token):
+    v: str
+
+@dataclass
+class StringToken(Token):
+    v: str
+
+@dataclass
+class TypeToken(Token):
+    t: str
+    is_array: bool = False 
+    array_dimensions: int = 0  
+
+@dataclass
+class TypeDefToken(Token):
+    name: str
+
+@dataclass
+class TypeDefToken(Token):
+    name: str
+
+@dataclass
+class ArrayToken(Token):
+    elements: list[Token]
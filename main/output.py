@@ -0,0 +1,83 @@
+"""Buffered program output so printing many lines costs a few large writes"""
+import atexit
+import os
+import sys
+import threading
+
+# Characters gathered before a write in throughput mode (run.sh --throughput)
+THROUGHPUT_BUFFER_SIZE = 1 << 16
+
+def parse_buffer_size(value):
+    """A buffer size setting, or 0 (interactive) when unset or invalid"""
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+def buffer_size_from_env():
+    """The buffer size chosen with $LUCENT_OUTPUT_BUFFER"""
+    return parse_buffer_size(os.environ.get("LUCENT_OUTPUT_BUFFER"))
+
+class OutputBuffer:
+    """
+    Collects the text a program prints and writes it to stream once
+    buffer_size characters have built up. A buffer_size of 0 is interactive
+    mode: every write goes straight through and is flushed, as print(...,
+    flush=True) did. Pending text is flushed when a program ends, before it
+    reads input and when it calls flush(). Without a stream, output goes
+    to whatever sys.stdout is at the time. Programs on several threads may
+    share one (program_output is shared by every VM and e() run without a
+    stream), so pending text is only touched under lock.
+    """
+
+    def __init__(self, buffer_size=None, stream=None):
+        self.buffer_size = buffer_size_from_env() if buffer_size is None else buffer_size
+        self.stream = stream
+        self.pending = []
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_stream(cls, stream):
+        """
+        Buffer for output a host injects (e.g. a StringIO to capture it).
+        Nobody is watching such a stream line by line, so it is buffered
+        like throughput mode
+        """
+        return cls(THROUGHPUT_BUFFER_SIZE, stream)
+
+    def write(self, text):
+        if not self.buffer_size:
+            stream = sys.stdout if self.stream is None else self.stream
+            stream.write(text)
+            stream.flush()
+            return
+        with self.lock:
+            self.pending.append(text)
+            self.size += len(text)
+            full = self.size >= self.buffer_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write out everything pending"""
+        # sys.stdout is looked up here, not stored, so redirect_stdout
+        # and the compile server's per-request stdout still apply
+        stream = sys.stdout if self.stream is None else self.stream
+        # Written while holding the lock, so flushes reach the stream in order
+        with self.lock:
+            if self.pending:
+                text = "".join(self.pending)
+                self.pending.clear()
+                self.size = 0
+                stream.write(text)
+        stream.flush()
+
+# Shared by the VM and the tree-walking interpreter unless given streams
+program_output = OutputBuffer()
+
+@atexit.register
+def _flush_at_exit():
+    # Programs run through e() have no single exit point of their own
+    if program_output.pending:
+        program_output.flush()
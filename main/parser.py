@@ -0,0 +1,737 @@
+"""Recursive-descent parser producing the Lucent AST"""
+from .nodes import (AST, BinOp, Number, If, Var, Assign, String, Let, Sequence, Fun, Call,
+                    PrintLn, Return, StrConversion, While, Continue, Break, Array, ArrayAccess,
+                    ArrayAssign, Length, Dict, DictAccess, DictAssign, Slice, TypeDef,
+                    TypeInstantiation, ArrayInit, Input, ParseInt, Flush, ReadInput, FileCall, Token, NumberToken,
+                    OperatorToken, KeywordToken, VarToken, StringToken, TypeToken, ArrayToken)
+from .errors import ParseError
+from .lexer import lex
+
+def parse(s: str, types=None) -> AST:
+    """
+    Parse a program. types maps the user-defined type names declared so far
+    to their fields; each call starts with none unless given a dict, which
+    lets a host parse a program in pieces
+    """
+    from more_itertools import peekable
+    user_defined_types = {} if types is None else types
+    tokens = list(lex(s))
+    t = peekable(tokens)
+    # Names the program declares itself (functions, variables, parameters);
+    # they shadow the builtins of the same names
+    declared = set()
+    for previous, token, following in zip([None] + tokens, tokens, tokens[1:] + [None]):
+        if not isinstance(token, VarToken):
+            continue
+        if isinstance(previous, (TypeToken, VarToken)) or previous in (KeywordToken("fun"), KeywordToken("dict")):
+            declared.add(token.v)
+        elif following == OperatorToken(":") and previous in (OperatorToken("("), OperatorToken(",")):
+            declared.add(token.v)
+    
+    def expect(what: Token):
+        if t.peek(None) == what:
+            next(t)
+            return
+        raise ParseError(f"Expected {what} but got {t.peek(None)}")
+    
+    def calls_builtin():
+        """Whether the next token names a builtin call: a name the program doesn't declare, followed by ("""
+        return t.peek().v not in declared and t[1:2] == [OperatorToken("(")]
+
+    def parse_statements():
+        statements = []
+        while t.peek(None) is not None:
+            if isinstance(t.peek(), OperatorToken) and t.peek().o == '}':
+                break
+
+            line = t.peek().line
+            stmt = parse_stmt()
+            # print(stmt)
+            if isinstance(stmt, AST):
+                stmt.line = line
+            statements.append(stmt)
+
+            # Handle semicolons more carefully
+            if isinstance(t.peek(None), OperatorToken) and t.peek().o == ';':
+                next(t)
+
+        # Always return a Sequence for multiple statements
+        if len(statements) > 1:
+            return Sequence(statements)
+        elif len(statements) == 1:
+            return statements[0]
+        else:
+            return Number("0")  # Empty block returns 0
+
+    def parse_stmt():
+        # print(f"parse_stmt: {t.peek(None)}")  # Debugging statement
+        if t.peek(None) == VarToken("file") and any(isinstance(token, VarToken) for token in t[1:2]):
+            # `file` is a type only where a declaration's type goes
+            name = next(t)
+            file_type = TypeToken(name.v)
+            file_type.line = name.line
+            t.prepend(file_type)
+        match t.peek(None):
+            
+            case VarToken(var) if var in user_defined_types:
+                # This is a type declaration using a user-defined type
+                type_name = next(t).v  # consume the type name (e.g. "Person")
+                
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError(f"Expected variable name after type {type_name}")
+                
+                var_name = next(t).v  # consume the variable name (e.g. "p")
+                
+                expect(OperatorToken("="))
+                
+                # Now we expect the type name again for instantiation
+                if not isinstance(t.peek(None), VarToken) or t.peek().v != type_name:
+                    raise ParseError(f"Expected type {type_name} for instantiation")
+                
+                next(t)  # consume the type name again
+                
+                # Parse instantiation body { "field1": value1, ... }
+                expect(OperatorToken("{"))
+                pairs = []
+                
+                while t.peek(None) != OperatorToken("}"):
+                    # Field key must be a string literal
+                    if not isinstance(t.peek(None), StringToken):
+                        raise ParseError("Expected field name as string literal")
+                    key = String(next(t).v)
+                    
+                    expect(OperatorToken(":"))
+                    value = parse_expr()
+                    pairs.append((key, value))
+                    
+                    if t.peek(None) == OperatorToken(","):
+                        next(t)
+                        # Check if there's another field after comma
+                        if t.peek(None) == OperatorToken("}"):
+                            break
+                    # No need to check for closing brace here - let the loop condition handle it
+                
+                expect(OperatorToken("}"))
+                
+                # Create the type instantiation
+                type_inst = TypeInstantiation(type_name, Dict(pairs))
+                
+                # Assign to variable
+                expect(OperatorToken(";"))
+                next_stmt = parse_statements() if t.peek(None) is not None else None
+                return Let(var_name, type_inst, next_stmt if next_stmt else Sequence([]), type_name)
+
+            case TypeToken(typ, is_array, array_dimensions):
+                next(t)
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError(f"Expected variable name after {typ}")
+                var = next(t).v
+                var_type = f"{typ}{'[]' * array_dimensions}" if is_array else typ
+                
+                # Check if this is a declaration without initialization (if we see a semicolon next)
+                if isinstance(t.peek(None), OperatorToken) and t.peek().o == ';':
+                    next(t)  # Consume the semicolon
+                    raise ParseError(f"Variable declarations must include initialization. Change '{var_type} {var};' to '{var_type} {var} = <value>;'")
+                
+                expect(OperatorToken("="))
+                
+                if is_array:
+                    if isinstance(t.peek(None), KeywordToken) and t.peek().w == "new":
+                        # Handle array initialization with `new`
+                        next(t)  # consume 'new'
+                        
+                        # Expect the type token (e.g., 'int')
+                        if not isinstance(t.peek(None), TypeToken):
+                            raise ParseError(f"Expected type after 'new' for {var}")
+                        
+                        element_type = next(t).t
+                        
+                        # Parse all dimensions - support multi-dimensional arrays
+                        sizes = []
+                        while isinstance(t.peek(None), OperatorToken) and t.peek().o == "[":
+                            next(t)  # consume '['
+                            sizes.append(parse_expr())
+                            expect(OperatorToken("]"))
+                        
+                        array_expr = ArrayInit(element_type, sizes)
+                    elif isinstance(t.peek(None), VarToken) and t.peek().v in ("readLines", "readInts") and calls_builtin():
+                        array_expr = parse_atom()
+                    elif isinstance(t.peek(None), VarToken):
+                        array_name = next(t).v
+                        expect(OperatorToken("["))
+                        start = parse_expr()
+                        expect(OperatorToken(":"))
+                        end = parse_expr()
+                        expect(OperatorToken("]"))
+                        array_expr = Slice(Var(array_name), start, end)
+                    elif isinstance(t.peek(None), OperatorToken) and t.peek().o == '[':
+                        array_expr = parse_atom()
+                    else:
+                        # If we reach here, it's an error
+                        raise ParseError(f"Expected array literal, slice, or 'new' after {var}")
+                    
+                    let_node = Let(var, array_expr, None, var_type)
+                    array_expr.parent = let_node
+                    expect(OperatorToken(";"))
+                    next_stmt = parse_statements() if t.peek(None) is not None else None
+                    let_node.body = next_stmt if next_stmt else Sequence([])
+                    return let_node
+                
+                # Allow any expression, including complex expressions with dictionary lookups
+                expr = parse_expr()
+                
+                # Check if we have a semicolon after the expression
+                if isinstance(t.peek(None), OperatorToken) and t.peek().o == ';':
+                    next(t)  # Consume the semicolon
+                    
+                # This is the key fix: parse the next statement regardless of semicolon status
+                next_stmt = parse_statements() if t.peek(None) is not None else None
+                return Let(var, expr, next_stmt if next_stmt else Sequence([]), var_type)
+                
+            case KeywordToken("fun"):
+                next(t)  # Consume "fun" keyword
+                
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError("Expected function name")
+                name = next(t).v
+                
+                expect(OperatorToken("("))
+                
+                # Parse parameters - handle multiple parameters
+                params = []
+                
+                # If there's a first parameter
+                if isinstance(t.peek(None), VarToken):
+                    param_name = next(t).v
+                    
+                    # Parse parameter type
+                    expect(OperatorToken(":"))
+                    if not isinstance(t.peek(None), TypeToken):
+                        if isinstance(t.peek(None), VarToken):
+                            # This is a user-defined type
+                            param_type = next(t).v
+                        else:
+                            raise ParseError("Expected parameter type")
+                    else:
+                        param_token = next(t)
+                        param_type = param_token.t + "[]" * param_token.array_dimensions if param_token.is_array else param_token.t
+                    
+                    params.append((param_name, param_type))
+                    
+                    # Parse additional parameters
+                    while t.peek(None) == OperatorToken(','):
+                        next(t)  # Consume comma
+                        
+                        if not isinstance(t.peek(None), VarToken):
+                            raise ParseError("Expected parameter name after comma")
+                        param_name = next(t).v
+                        
+                        expect(OperatorToken(":"))
+                        if not isinstance(t.peek(None), TypeToken):
+                            if isinstance(t.peek(None), VarToken):
+                                # This is a user-defined type
+                                param_type = next(t).v
+                            else:
+                                raise ParseError("Expected parameter type")
+                        else:
+                            param_token = next(t)
+                            param_type = param_token.t + "[]" * param_token.array_dimensions if param_token.is_array else param_token.t
+                        
+                        params.append((param_name, param_type))
+                
+                expect(OperatorToken(")"))
+
+                # Handle return type - also allow user-defined types
+                expect(OperatorToken(":"))
+                if isinstance(t.peek(None), TypeToken):
+                    return_token = next(t)
+                    return_type = return_token.t + "[]" * return_token.array_dimensions if return_token.is_array else return_token.t
+                elif isinstance(t.peek(None), VarToken):
+                    return_type = next(t).v
+                else:
+                    raise ParseError("Expected return type")
+
+                expect(OperatorToken("{"))
+                
+                # Parse the function body statements
+                body = parse_statements()
+                
+                expect(OperatorToken("}"))
+                
+                # Continue parsing after function definition
+                if t.peek(None) is not None and not (isinstance(t.peek(), OperatorToken) and t.peek().o == '}'):
+                    rest = parse_statements() 
+                else:
+                    rest = Sequence([])
+                    
+                return Fun(name, params, return_type, body, rest)
+                
+            case KeywordToken("dict"):
+                next(t)
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError("Expected dictionary name")
+                name = next(t).v
+                expect(OperatorToken("="))
+                expect(OperatorToken("{"))
+                pairs = []
+                while t.peek(None) != OperatorToken("}"):
+                    key = parse_expr()
+                    expect(OperatorToken(":"))
+                    value = parse_expr()
+                    pairs.append((key, value))
+                    if t.peek(None) == OperatorToken(","):
+                        next(t)
+                expect(OperatorToken("}"))
+                expect(OperatorToken(";"))
+                # print(pairs)
+                rest = parse_statements() if t.peek(None) is not None else body
+                # print("rest",rest)
+                return Let(name, Dict(pairs), rest)      
+            case KeywordToken("if"):
+                next(t)
+                expect(OperatorToken("("))  # Expect opening parenthesis
+                cond = parse_expr()
+                expect(OperatorToken(")"))  # Expect closing parenthesis
+                expect(OperatorToken("{"))  # Expect opening brace
+                then = parse_statements()   # Parse statements inside braces
+                expect(OperatorToken("}"))  # Expect closing brace
+
+                if t.peek(None) == KeywordToken("else"):
+                    next(t)
+                    expect(OperatorToken("{"))
+                    else_ = parse_statements()
+                    expect(OperatorToken("}"))
+                else:
+                    else_ = Number("0")  # Default else case
+
+                return If(cond, then, else_)
+            case KeywordToken("return"):
+                next(t)
+                expr = parse_expr()
+                if t.peek(None) == OperatorToken(";"):
+                    next(t)
+                return Return(expr)
+            case KeywordToken("while"):
+                next(t)
+                expect(OperatorToken("("))  # Expect opening parenthesis
+                cond = parse_expr()
+                expect(OperatorToken(")"))  # Expect closing parenthesis
+                expect(OperatorToken("{"))  # Expect opening brace
+                body = parse_statements()   # Parse statements inside braces
+                expect(OperatorToken("}"))  # Expect closing brace
+                return While(cond, body)
+            case KeywordToken("continue"):
+                next(t)
+                if t.peek(None) == OperatorToken(";"):
+                    next(t)
+                return Continue()
+            case KeywordToken("break"):
+                next(t)
+                if t.peek(None) == OperatorToken(";"):
+                    next(t)
+                return Break()
+            case KeywordToken("println"):
+                next(t)
+                expect(OperatorToken("("))
+                expr = parse_expr()
+                expect(OperatorToken(")"))
+                expect(OperatorToken(";"))  # Always require semicolon
+                return PrintLn(expr)
+            case KeywordToken("type"):
+                next(t)  # consume 'type'
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError("Expected type name")
+                type_name = next(t).v
+                
+                # Register type name early so it can be used in field types
+                if type_name not in user_defined_types:
+                    user_defined_types[type_name] = {}
+                
+                # Expect opening brace
+                expect(OperatorToken("{"))
+                
+                # Parse field definitions
+                fields = {}
+                while t.peek(None) != OperatorToken("}"):
+                    # Parse field name (as string literal)
+                    if not isinstance(t.peek(None), StringToken):
+                        raise ParseError("Expected field name as string literal")
+                    field_name = next(t).v
+                    
+                    # Expect colon
+                    expect(OperatorToken(":"))
+                    
+                    # Parse field type - allow TypeToken or VarToken (for user-defined types)
+                    if isinstance(t.peek(None), TypeToken):
+                        field_type_token = next(t)
+                        field_type = field_type_token.t + "[]" if field_type_token.is_array else field_type_token.t
+                    elif isinstance(t.peek(None), VarToken):
+                        # This is a user-defined type
+                        field_type = next(t).v
+                    else:
+                        raise ParseError("Expected field type")
+                    
+                    # Add the field to our type definition
+                    fields[field_name] = field_type
+                    
+                    # Parse comma or closing brace
+                    if t.peek(None) == OperatorToken(","):
+                        next(t)  # consume comma
+                    # Don't check for closing brace here - let the while loop condition handle it
+                
+                # Replace the early registration with complete field set
+                user_defined_types[type_name] = fields
+                
+                # Consume closing brace
+                expect(OperatorToken("}"))
+                expect(OperatorToken(";"))
+                
+                return TypeDef(type_name, fields)
+            
+            # Remove the old case for type instantiation as it will now be handled at the top
+            
+            # Add parsing for new array initialization syntax: new type[size]
+            case KeywordToken("new"):
+                next(t)  # consume 'new'
+                
+                # Expect a type token
+                if not isinstance(t.peek(None), TypeToken):
+                    raise ParseError("Expected type after 'new'")
+                
+                element_type = next(t).t
+                
+                # Parse all dimensions - support multi-dimensional arrays
+                sizes = []
+                while isinstance(t.peek(None), OperatorToken) and t.peek().o == "[":
+                    next(t)  # consume '['
+                    sizes.append(parse_expr())
+                    expect(OperatorToken("]"))
+                
+                return ArrayInit(element_type, sizes)
+                
+            case _:
+                return parse_expr()
+       
+
+    def parse_expr():
+        expr = parse_assign()
+        # If the expression is a function call and we're at statement level,
+        # expect a semicolon, but don't raise an error if we don't find one
+        if isinstance(expr, Call) and isinstance(t.peek(None), OperatorToken) and t.peek().o == ';':
+            next(t)
+        return expr
+
+    def parse_assign():
+        if isinstance(t.peek(None), VarToken):
+            var = next(t)
+            if t.peek(None) == OperatorToken('='):
+                next(t)
+                expr = parse_expr()
+                return Assign(var.v, expr)
+            # Look for type instantiation as an expression
+            elif var.v in user_defined_types and isinstance(t.peek(None), OperatorToken) and t.peek().o == '{':
+                type_name = var.v
+                # Parse instantiation body
+                next(t)  # consume '{'
+                pairs = []
+                
+                while t.peek(None) != OperatorToken("}"):
+                    # Field key must be a string literal
+                    if not isinstance(t.peek(None), StringToken):
+                        raise ParseError("Expected field name as string literal")
+                    key = String(next(t).v)
+                    
+                    expect(OperatorToken(":"))
+                    value = parse_expr()  # This allows for recursive type instantiation
+                    pairs.append((key, value))
+                    
+                    if t.peek(None) == OperatorToken(","):
+                        next(t)
+                        # Check if there's another field after comma
+                        if t.peek(None) == OperatorToken("}"):
+                            break
+                
+                expect(OperatorToken("}"))
+                return TypeInstantiation(type_name, Dict(pairs))
+            else:
+                t.prepend(var)
+        return parse_logical()
+
+    def parse_logical():
+        l = parse_comparison()
+        while True:
+            match t.peek(None):
+                case KeywordToken(op) if op in {"and", "or"}:
+                    next(t)
+                    r = parse_comparison()
+                    l = BinOp(op, l, r)
+                case _:
+                    return l
+
+    def parse_comparison():
+        l = parse_add()
+        while True:  
+            match t.peek(None):
+                case OperatorToken(op) if op in {'<', '>', '<=', '>=', '==', '!='}:
+                    operator = next(t).o
+                    r = parse_add()
+                    l = BinOp(operator, l, r)
+                case _:
+                    return l
+
+    def parse_add():
+        ast = parse_mul()
+        while True:
+            match t.peek(None):
+                case OperatorToken('+') | OperatorToken('-'):
+                    op = next(t).o
+                    ast = BinOp(op, ast, parse_mul())
+                case _:
+                    return ast
+
+    def parse_mul():
+        ast = parse_power()  
+        while True:
+            match t.peek(None):
+                case OperatorToken('*') | OperatorToken('/') | OperatorToken('%'):  
+                    op = next(t).o
+                    ast = BinOp(op, ast, parse_power()) 
+                case _:
+                    return ast
+
+    def parse_power():  
+        ast = parse_concat()  
+        while True:
+            match t.peek(None):
+                case OperatorToken('**'):
+                    next(t)
+                    ast = BinOp('**', ast, parse_concat())
+                case _:
+                    return ast
+
+    def parse_concat():  
+        ast = parse_atom()
+        while True:
+            match t.peek(None):
+                case OperatorToken('++'):
+                    next(t)
+                    ast = BinOp('++', ast, parse_atom())
+                case _:
+                    return ast
+
+    def parse_atom():
+        # print(f"parse_atom: {t.peek(None)}")  # Debugging statement
+        match t.peek(None):
+            case OperatorToken('{'):
+                next(t)  # consume opening brace
+                expr = parse_statements()
+                expect(OperatorToken("}"))  # expect closing brace
+                return expr
+            case TypeToken(typ):  # Changed from KeywordToken to TypeToken
+                next(t)
+                if not isinstance(t.peek(None), VarToken):
+                    raise ParseError(f"Expected variable name after {typ}")
+                var = next(t).v
+                expect(OperatorToken("="))
+                expr = parse_expr()
+                expect(OperatorToken(";"))
+                # Create a sequence that continues evaluating after the declaration
+                next_expr = parse_statements() if t.peek(None) is not None else Var(var)
+                return Let(var, expr, next_expr)
+            case KeywordToken("println"):
+                next(t)
+                expect(OperatorToken("("))
+                expr = parse_expr()
+                expect(OperatorToken(")"))
+                expect(OperatorToken(";"))  # Always require semicolon
+                return PrintLn(expr)
+            case VarToken("input"):
+                next(t)
+                expect(OperatorToken("("))
+                # Optionally parse a prompt string
+                prompt = None
+                if not isinstance(t.peek(None), OperatorToken) or t.peek().o != ")":
+                    prompt = parse_expr()
+                expect(OperatorToken(")"))
+                return Input(prompt)
+            case VarToken("parseInt"):
+                next(t)
+                expect(OperatorToken("("))
+                expr = parse_expr()
+                expect(OperatorToken(")"))
+                return ParseInt(expr)
+            case VarToken("flush") if calls_builtin():
+                next(t)
+                expect(OperatorToken("("))
+                expect(OperatorToken(")"))
+                return Flush()
+            case VarToken("readAll" | "readLines" | "readInts" as builtin) if calls_builtin():
+                next(t)
+                expect(OperatorToken("("))
+                # Optionally parse the path of a file to read instead of stdin
+                path = None
+                if not isinstance(t.peek(None), OperatorToken) or t.peek().o != ")":
+                    path = parse_expr()
+                expect(OperatorToken(")"))
+                return ReadInput(builtin, path)
+            case VarToken("openMapped" | "mappedLineCount" | "mappedLine" | "mappedFind" as builtin) if calls_builtin():
+                next(t)
+                expect(OperatorToken("("))
+                args = []
+                if not isinstance(t.peek(None), OperatorToken) or t.peek().o != ")":
+                    args.append(parse_expr())
+                    while t.peek(None) == OperatorToken(","):
+                        next(t)  # consume comma
+                        args.append(parse_expr())
+                expect(OperatorToken(")"))
+                return FileCall(builtin, args)
+            case KeywordToken("str"):
+                next(t)
+                expect(OperatorToken("("))
+                expr = parse_expr()
+                expect(OperatorToken(")"))
+                return StrConversion(expr)
+            case ArrayToken(elements):
+                next(t)
+                return Array([Number(e.v) for e in elements])
+            case VarToken(name):
+                next(t)
+                
+                # First create the base variable expression
+                expr = Var(name)
+                
+                # Now handle any possible chained operations like array access, function calls, 
+                # or dictionary/field access
+                while True:
+                    if isinstance(t.peek(None), OperatorToken):
+                        if t.peek().o == '[':  # Array access
+                            indices = []
+                            # First dimension
+                            next(t)  # consume [
+                            indices.append(parse_expr())
+                            if isinstance(t.peek(None), OperatorToken) and t.peek().o == ':':
+                                next(t)  # consume :
+                                end = parse_expr()
+                                expect(OperatorToken(']'))
+                                expr = Slice(expr, indices[0], end)
+                            else:
+                                expect(OperatorToken(']'))
+                                 # Additional dimensions if any
+                                while isinstance(t.peek(None), OperatorToken) and t.peek().o == '[':
+                                    next(t)  # consume [
+                                    indices.append(parse_expr())
+                                    next(t)  # consume ]
+                                if isinstance(t.peek(None), OperatorToken) and t.peek().o == '=':
+                                    next(t)  # consume =
+                                    value = parse_expr()
+                                    expr = ArrayAssign(expr, indices, value)
+                                else:
+                                    expr = ArrayAccess(expr, indices)
+                        elif t.peek().o == '(':  # Function call
+                            next(t)  # consume opening parenthesis
+                            args = []
+                            # Handle empty parameter list
+                            if isinstance(t.peek(None), OperatorToken) and t.peek().o == ')':
+                                next(t)  # consume closing parenthesis
+                            else:
+                                # Parse the first argument
+                                args.append(parse_expr())
+                                
+                                # Parse additional arguments
+                                while isinstance(t.peek(None), OperatorToken) and t.peek().o == ',':
+                                    next(t)  # consume comma
+                                    args.append(parse_expr())
+                                
+                                expect(OperatorToken(")"))
+                            
+                            return Call(name, args)
+                        elif t.peek().o == '{':  # Dictionary/field access
+                            next(t)  # consume {
+                            key = parse_expr()
+                            expect(OperatorToken('}'))
+                            if isinstance(t.peek(None), OperatorToken) and t.peek().o == '=':
+                                next(t)  # consume =
+                                value = parse_expr()
+                                expr = DictAssign(expr, key, value)
+                                break  # Assignment ends the chain
+                            else:
+                                expr = DictAccess(expr, key)
+                        else:
+                            break  # No more chained operations
+                    else:
+                        break  # Not an operator, end of chain
+                
+                # Handle type instantiation (separate from chained access)
+                if name in user_defined_types and expr == Var(name) and isinstance(t.peek(None), OperatorToken) and t.peek().o == '{':
+                    # This is an inline type instantiation
+                    type_name = name
+                    expect(OperatorToken("{"))
+                    pairs = []
+                    
+                    while t.peek(None) != OperatorToken("}"):
+                        # Field key must be a string literal
+                        if not isinstance(t.peek(None), StringToken):
+                            raise ParseError("Expected field name as string literal")
+                        key = String(next(t).v)
+                        
+                        expect(OperatorToken(":"))
+                        value = parse_expr()  # This allows nested type instantiations
+                        pairs.append((key, value))
+                        
+                        if t.peek(None) == OperatorToken(","):
+                            next(t)
+                            # Check if there's another field after comma
+                            if t.peek(None) == OperatorToken("}"):
+                                break
+                    
+                    expect(OperatorToken("}"))
+                    return TypeInstantiation(type_name, Dict(pairs))
+                
+                return expr
+            case OperatorToken('['):
+                next(t)  # consume opening bracket
+                elements = []
+                
+                # Handle empty array
+                if isinstance(t.peek(None), OperatorToken) and t.peek().o == ']':
+                    next(t)
+                    return Array([])
+                
+                # Parse first element
+                elements.append(parse_expr())
+                
+                # Parse remaining elements
+                while isinstance(t.peek(None), OperatorToken) and t.peek().o == ',':
+                    next(t)  # consume comma
+                    elements.append(parse_expr())
+                
+                if not isinstance(t.peek(None), OperatorToken) or t.peek().o != ']':
+                    raise ParseError("Expected ']' after array elements")
+                next(t)  # consume closing bracket
+                
+                return Array(elements)
+                
+            # ...rest of parse_atom cases...
+            case KeywordToken("len"):
+                next(t)
+                expect(OperatorToken("("))
+                expr = parse_expr()
+                expect(OperatorToken(")"))
+                return Length(expr)
+            case OperatorToken('('):
+                next(t)
+                expr = parse_expr()  
+                if t.peek(None) != OperatorToken(')'):
+                    raise ParseError("Expected closing bracket ')'")
+                next(t)  
+                return expr
+            case NumberToken(v):
+                next(t)
+                return Number(v)
+            case StringToken(v):
+                next(t)
+                return String(v)
+            case _:
+                raise ParseError(f"Unexpected token: {t.peek(None)}")
+
+    return parse_statements()
@@ -0,0 +1,248 @@
+"""Profiling for BytecodeVM: opcode counts, hot instructions, time per function and per source line"""
+from collections import Counter, defaultdict
+from time import perf_counter
+
+# Name used for code outside any function
+MAIN = "<main>"
+
+class FetchHook(list):
+    """
+    Instruction list that calls each callback with the instruction pointer
+    whenever the VM fetches an instruction. BytecodeVM.run indexes whatever
+    list it holds, so only a VM that is being traced or profiled pays for
+    this; the run loop itself has no checks.
+    """
+    __slots__ = ("callbacks",)
+
+    def __init__(self, instructions):
+        super().__init__(instructions)
+        self.callbacks = []
+
+    def __getitem__(self, ip):
+        for callback in self.callbacks:
+            callback(ip)
+        return list.__getitem__(self, ip)
+
+def function_owners(instructions, constants, variable_indexes):
+    """For each instruction offset, the name of the Lucent function it belongs to"""
+    names = {index: name for name, index in variable_indexes.items()}
+    labels = {instr.args[0]: i for i, instr in enumerate(instructions) if instr.opcode == "LABEL"}
+    owners = [MAIN] * len(instructions)
+    # Functions compile to LOAD_CONST (label, params, type); MAKE_FUNCTION;
+    # STORE_VAR name; JUMP end; LABEL label; <body>; LABEL end. Nested
+    # functions come later in the stream, so they overwrite their parent
+    for i, instr in enumerate(instructions):
+        if instr.opcode != "MAKE_FUNCTION" or i == 0 or instructions[i - 1].opcode != "LOAD_CONST":
+            continue
+        start = labels.get(constants[instructions[i - 1].args[0]][0])
+        if start is None:
+            continue
+        end = len(instructions)
+        if start > 0 and instructions[start - 1].opcode == "JUMP":
+            end = labels.get(instructions[start - 1].args[0], end)
+        name = f"<function@{start}>"
+        if i + 1 < len(instructions) and instructions[i + 1].opcode in ("STORE_VAR", "STORE_GLOBAL"):
+            name = names.get(instructions[i + 1].args[0], name)
+        for j in range(start, end):
+            owners[j] = name
+    return owners
+
+class Profiler:
+    """
+    Counting profiler for a BytecodeVM. Records how often each opcode and
+    each instruction ran, and the time spent per instruction, per Lucent
+    function and per call stack. Times include the profiler's own
+    overhead, so compare them with each other rather than with plain runs.
+
+        profiler = Profiler(vm)
+        vm.run()
+        print(profiler.report())
+        profiler.write_collapsed("program.folded")
+    """
+
+    def __init__(self, vm):
+        self.vm = vm
+        self.owners = function_owners(vm.instructions, vm.constants, vm.variable_indexes)
+        self.opcode_counts = Counter()
+        self.hits = [0] * len(vm.instructions)
+        self.times = [0.0] * len(vm.instructions)
+        # Call stack (tuple of function names, outermost first) -> time
+        self.stack_times = defaultdict(float)
+        self.last_ip = None
+        self.last_stack = None
+        self.last_time = None
+        # The callers' names are recomputed only when the frames change
+        self._frames_len = 0
+        self._frames_top = None
+        self._callers = ()
+        vm.add_fetch_hook(self._on_fetch)
+
+    def _on_fetch(self, ip):
+        now = perf_counter()
+        if self.last_ip is not None:
+            self._charge(now - self.last_time)
+        self._enter(ip)
+        # Measured after the bookkeeping so it is not charged to the program
+        self.last_time = perf_counter()
+
+    def _charge(self, elapsed):
+        """Add the time since the last fetch to the instruction that was running"""
+        self.times[self.last_ip] += elapsed
+        self.stack_times[self.last_stack] += elapsed
+
+    def _enter(self, ip):
+        """Count the instruction about to run and work out its call stack"""
+        self.hits[ip] += 1
+        self.opcode_counts[list.__getitem__(self.vm.instructions, ip).opcode] += 1
+
+        frames = self.vm.call_stack
+        top = frames[-1] if frames else None
+        if len(frames) != self._frames_len or top is not self._frames_top:
+            # Each frame holds the return address into its caller; holding
+            # on to the top frame keeps its identity from being reused
+            self._frames_changed(frames)
+            self._frames_len = len(frames)
+            self._frames_top = top
+        self.last_stack = self._callers + (self.owners[ip],)
+        self.last_ip = ip
+
+    def _frames_changed(self, frames):
+        self._callers = tuple(self.owners[frame[0] - 1] for frame in frames)
+
+    def stop(self):
+        """Charge the final instruction and detach from the VM"""
+        if self.last_ip is not None:
+            self._charge(perf_counter() - self.last_time)
+            self.last_ip = None
+        self.vm.remove_fetch_hook(self._on_fetch)
+
+    def function_times(self):
+        """Function name -> (self time, total time including callees)"""
+        self_times = defaultdict(float)
+        total_times = defaultdict(float)
+        for stack, elapsed in self.stack_times.items():
+            self_times[stack[-1]] += elapsed
+            for name in set(stack):
+                total_times[name] += elapsed
+        return {name: (self_times[name], total) for name, total in total_times.items()}
+
+    def report(self, limit=15):
+        """Flat text report: opcodes, hottest instructions and functions"""
+        self.stop()
+        executed = sum(self.hits)
+        total_time = sum(self.times) or 1e-12
+        lines = [f"Instructions executed: {executed}  Time: {total_time:.4f}s", "",
+                 f"{'Count':>12} {'%':>6}  Opcode"]
+        for opcode, count in self.opcode_counts.most_common(limit):
+            lines.append(f"{count:>12} {100 * count / max(executed, 1):>5.1f}%  {opcode}")
+
+        lines += ["", f"{'Hits':>12} {'Time (s)':>10} {'%':>6} {'Offset':>7}  Function / instruction"]
+        hottest = sorted(range(len(self.times)), key=lambda ip: self.times[ip], reverse=True)
+        for ip in hottest[:limit]:
+            if not self.hits[ip]:
+                break
+            instr = list.__getitem__(self.vm.instructions, ip)
+            lines.append(f"{self.hits[ip]:>12} {self.times[ip]:>10.4f} {100 * self.times[ip] / total_time:>5.1f}% "
+                         f"{ip:>7}  {self.owners[ip]}: {instr.opcode} {instr.args or ''}".rstrip())
+
+        lines += ["", f"{'Self (s)':>10} {'Total (s)':>10} {'Total %':>8}  Function"]
+        times = sorted(self.function_times().items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_time, total) in times[:limit]:
+            lines.append(f"{self_time:>10.4f} {total:>10.4f} {100 * total / total_time:>7.1f}%  {name}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """Call stacks in collapsed format ("main;f;g <microseconds>") for flame graph tools"""
+        self.stop()
+        return "".join(f"{';'.join(stack)} {round(elapsed * 1e6)}\n"
+                       for stack, elapsed in sorted(self.stack_times.items()) if elapsed >= 5e-7)
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+class LineProfiler(Profiler):
+    """
+    Profiler that also charges time and hits to source lines, using the line
+    table from BytecodeCompiler.compile. A line is hit each time execution
+    enters it from another line or jumps back to it (a loop). Labels and
+    unconditional jumps are charged to the line that led to them, and
+    returning from a call does not count as a new hit of the call's line.
+
+        profiler = LineProfiler(vm, bytecode['lines'], source)
+        vm.run()
+        print(profiler.report())
+    """
+
+    def __init__(self, vm, lines, source=None):
+        if not lines or all(line is None for line in lines):
+            raise ValueError("Bytecode has no line table; recompile it from source")
+        self.lines = [None if instr.opcode in ("JUMP", "LABEL") else line
+                      for instr, line in zip(vm.instructions, lines)]
+        self.source_lines = source.splitlines() if source is not None else []
+        self.line_hits = Counter()
+        self.line_times = defaultdict(float)
+        # Time spent in functions called from a line, excluding the line itself
+        self.callee_times = defaultdict(float)
+        self.last_line = None
+        self._jumped_back = False
+        self._call_lines = frozenset()
+        super().__init__(vm)
+
+    def _charge(self, elapsed):
+        super()._charge(elapsed)
+        line = self.last_line
+        self.line_times[line] += elapsed
+        for call_line in self._call_lines:
+            if call_line != line:
+                self.callee_times[call_line] += elapsed
+
+    def _enter(self, ip):
+        if self.last_ip is not None and ip < self.last_ip:
+            self._jumped_back = True
+        returned = len(self.vm.call_stack) < self._frames_len
+        super()._enter(ip)
+        line = self.lines[ip]
+        if line is None:
+            return
+        if not returned and (line != self.last_line or self._jumped_back):
+            self.line_hits[line] += 1
+        self._jumped_back = False
+        self.last_line = line
+
+    def _frames_changed(self, frames):
+        super()._frames_changed(frames)
+        self._call_lines = frozenset(self.lines[frame[0] - 1] for frame in frames)
+
+    def line_report(self):
+        """Annotated listing: hits, time and share of the run for every line"""
+        self.stop()
+        total_time = sum(self.line_times.values()) or 1e-12
+        numbered = set(self.line_times) | set(self.line_hits)
+        numbered.discard(None)
+        last = max(len(self.source_lines), max(numbered, default=0))
+        lines = [f"Total time: {total_time:.6f} s", "Timer unit: 1e-06 s", "",
+                 f"{'Line #':>6} {'Hits':>10} {'Time':>12} {'Per Hit':>9} {'% Time':>7} {'Incl.':>12}  Line Contents",
+                 "=" * 80]
+        for number in range(1, last + 1):
+            text = self.source_lines[number - 1] if number <= len(self.source_lines) else ""
+            if number not in numbered:
+                lines.append(f"{number:>6} {'':>10} {'':>12} {'':>9} {'':>7} {'':>12}  {text}".rstrip())
+                continue
+            hits = self.line_hits[number]
+            elapsed = self.line_times[number] * 1e6
+            per_hit = f"{elapsed / hits:.1f}" if hits else ""
+            included = elapsed + self.callee_times[number] * 1e6
+            lines.append(f"{number:>6} {hits:>10} {elapsed:>12.1f} {per_hit:>9} "
+                         f"{100 * elapsed / 1e6 / total_time:>7.1f} {included:>12.1f}  {text}".rstrip())
+        return "\n".join(lines)
+
+    def report(self, limit=15):
+        """Time per Lucent function followed by the annotated listing"""
+        self.stop()
+        total_time = sum(self.times) or 1e-12
+        lines = [f"{'Self (s)':>10} {'Total (s)':>10} {'Total %':>8}  Function"]
+        times = sorted(self.function_times().items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_time, total) in times[:limit]:
+            lines.append(f"{self_time:>10.4f} {total:>10.4f} {100 * total / total_time:>7.1f}%  {name}")
+        return "\n".join(lines) + "\n\n" + self.line_report()
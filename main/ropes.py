@@ -0,0 +1,110 @@
+"""Lazy string concatenation so ++ in a loop builds strings in linear time"""
+
+# Shorter results are cheaper to copy than to defer
+ROPE_MIN_LENGTH = 128
+
+class Rope:
+    """
+    The result of left ++ right, kept as its two halves until the text is
+    needed. Appending to a rope is O(1). Indexing, slicing, comparing,
+    hashing or printing one joins all its pieces once and caches the
+    string, so a rope behaves like the str it stands for.
+    """
+    __slots__ = ("left", "right", "length", "flat")
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat = None
+
+    def __str__(self):
+        if self.flat is None:
+            # Walk iteratively: a loop of appends makes a very deep tree
+            pieces = []
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                if node.__class__ is not Rope:
+                    pieces.append(node)
+                elif node.flat is not None:
+                    pieces.append(node.flat)
+                else:
+                    stack.append(node.right)
+                    stack.append(node.left)
+            self.flat = "".join(pieces)
+            # The halves are no longer needed by this rope
+            self.left = self.right = None
+        return self.flat
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __int__(self):
+        return int(str(self))
+
+    def __add__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return concat(self, other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return concat(other, self)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return self.length == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return not self == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return str(self) < str(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return str(self) <= str(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return str(self) > str(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, STRING_TYPES):
+            return str(self) >= str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+# Types a string value can have at run time
+STRING_TYPES = (str, Rope)
+
+def concat(left, right):
+    """left ++ right for two strings (str or Rope)"""
+    if len(left) + len(right) < ROPE_MIN_LENGTH:
+        # Ropes are never this short, so both are plain strings
+        return left + right
+    return Rope(left, right)
+
+def value_type_name(value):
+    """Name of value's type for error messages, reporting ropes as str"""
+    return "str" if value.__class__ is Rope else type(value).__name__
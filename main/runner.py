@@ -0,0 +1,134 @@
+"""Runs a Lucent source or .lbc file with the bytecode VM (used by run.sh and the compile server)"""
+import sys
+import traceback
+from time import time
+from pathlib import Path
+
+from .parser import parse
+from .compiler import BytecodeCompiler
+from .typechecker import TypeCheckError
+from .vm import BytecodeVM
+from .cache import compile_cached
+from .output import OutputBuffer
+from .profiler import Profiler, LineProfiler
+from .memory import MemoryReport
+from .limits import ResourceLimits
+from .errors import ResourceLimitExceeded
+from . import lbc
+
+# Exit status of a program stopped by one of its resource limits
+LIMIT_EXIT_STATUS = 3
+
+def run_file(filename, option=None, source=None, memory=False, limits=None):
+    """
+    Run a file with bytecode VM with reliable output flushing; memory adds a
+    memory report. limits defaults to ResourceLimits.from_env()
+    """
+    try:
+        print(f"Running {filename}...")
+        debug_mode = option == "debug"
+        typecheck_mode = option == "typecheck"
+        cache_mode = option not in ("nocache", "compile")
+        
+        if debug_mode:
+            print("Debug mode enabled")
+        
+        if source is not None:
+            # Source text submitted directly (e.g. through the compile server)
+            code = source
+        elif filename.endswith(".lbc"):
+            # Precompiled bytecode - skip the front end entirely
+            bytecode = lbc.load(filename)
+            code = None
+        else:
+            # Read the source code
+            with open(filename, 'r') as f:
+                code = f.read()
+        
+        if code is None:
+            pass
+        elif typecheck_mode:
+            print("Type checking enabled")
+            # Run with type checking
+            try:
+                bytecode = compile_cached(code, typecheck=True)
+                print("Code type-checked successfully!")
+            except TypeCheckError as e:
+                print(f"Type Error: {e}")
+                return 1
+        elif cache_mode:
+            # Reuse the cached bytecode when the source is unchanged
+            bytecode = compile_cached(code)
+        else:
+            # Skip type checking - just parse and compile
+            ast = parse(code)
+            compiler = BytecodeCompiler()
+            bytecode = compiler.compile(ast)
+        
+        if option == "compile":
+            output_file = str(Path(filename).with_suffix(".lbc"))
+            lbc.save(bytecode, output_file)
+            print(f"Wrote {output_file}")
+            return 0
+        
+        # Run the program
+        start_time = time()
+        if limits is None:
+            limits = ResourceLimits.from_env()
+        vm = BytecodeVM(bytecode, adaptive=option == "adaptive", limits=limits)
+        
+        # Set debugging mode for VM if requested
+        if debug_mode:
+            vm.debug = True
+            # The trace is printed directly, so keep program output in step
+            vm.output = OutputBuffer(0)
+        profiler = None
+        if option == "vmprofile":
+            profiler = Profiler(vm)
+        elif option == "profile":
+            profiler = LineProfiler(vm, bytecode.get('lines'), code)
+        memory_report = MemoryReport(vm, bytecode.get('lines')) if memory else None
+        
+        try:
+            result = vm.run()
+        finally:
+            # Also reported when the program fails, e.g. with a MemoryError
+            if memory_report:
+                print(f"\n{memory_report.report()}")
+        end_time = time()
+        
+        if profiler:
+            print(f"\n{profiler.report()}")
+        if option == "vmprofile":
+            folded_file = str(Path(filename).with_suffix(".folded"))
+            profiler.write_collapsed(folded_file)
+            print(f"\nWrote collapsed stacks to {folded_file}")
+        
+        # Print execution stats
+        if debug_mode:
+            print(f"\nExecution completed in {end_time - start_time:.4f} seconds")
+        
+        return 0
+    except ResourceLimitExceeded as e:
+        # The program was stopped on purpose; a traceback would only be noise
+        print(f"Resource limit exceeded: {e}")
+        return LIMIT_EXIT_STATUS
+    except Exception as e:
+        print(f"Error: {type(e).__name__}: {e}")
+        traceback.print_exc()
+        return 1
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    memory = "--mem" in argv
+    argv = [arg for arg in argv if arg != "--mem"]
+    if not argv:
+        print("Usage: python3 -m main.runner <source_file|bytecode.lbc> [option] [--mem]")
+        return 1
+    option = argv[1] if len(argv) > 1 and argv[1] else None
+    return run_file(argv[0], option, memory=memory)
+
+if __name__ == "__main__":
+    # Make sure stdout is unbuffered for immediate output
+    sys.stdout.reconfigure(line_buffering=True, write_through=True)
+    sys.exit(main())
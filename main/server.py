@@ -0,0 +1,111 @@
+"""
+Persistent compile server.
+
+A long-lived daemon listening on a Unix socket keeps the compiler and VM
+imported, so submitted programs skip interpreter startup and module import.
+Each request is handled in a forked child: programs run in their own VM
+instance with their own copy of the interpreter state, and a crashing or
+misbehaving program cannot affect the server or other requests.
+
+Wire protocol (see main.client):
+  request:  one JSON line {"filename", "cwd", "source", "option", "stdin",
+            "output_buffer", "limits"}; source may be null, in which case
+            the server reads filename itself, cwd is the client's working
+            directory, output_buffer its $LUCENT_OUTPUT_BUFFER and limits
+            its $LUCENT_MAX_* variables
+  response: frames of 1-byte kind + u32 length + payload, where kind is
+            b"O" (stdout bytes), b"E" (stderr bytes) or b"X" (exit status,
+            ASCII integer, always the last frame)
+"""
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+from pathlib import Path
+
+from .client import FRAME_HEADER, default_socket_path
+# Imported up front so every forked child starts with a warm compiler
+from . import runner
+from .output import program_output, parse_buffer_size
+from .limits import ResourceLimits
+
+class _FrameWriter(io.RawIOBase):
+    """Binary stream that forwards every write to the client as one frame"""
+
+    def __init__(self, sock, kind):
+        self.sock = sock
+        self.kind = kind
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        if data:
+            self.sock.sendall(FRAME_HEADER.pack(self.kind, len(data)) + data)
+        return len(data)
+
+class RunRequestHandler(socketserver.StreamRequestHandler):
+    """Runs one submitted program; executes in a forked child of the server"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            source = request.get("source")
+            filename = request["filename"]
+            option = request.get("option") or None
+            output_buffer = request.get("output_buffer")
+            limits = ResourceLimits.from_env(request.get("limits") or {})
+            if request.get("cwd"):
+                # Relative paths (readAll, openMapped) resolve as they would in the client
+                os.chdir(request["cwd"])
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            self._send(b"E", f"Bad request: {e}\n".encode())
+            self._send(b"X", b"2")
+            return
+
+        # Stream the program's output back as it is produced
+        sys.stdout = io.TextIOWrapper(_FrameWriter(self.connection, b"O"),
+                                      encoding="utf-8", line_buffering=True, write_through=True)
+        sys.stderr = io.TextIOWrapper(_FrameWriter(self.connection, b"E"),
+                                      encoding="utf-8", line_buffering=True, write_through=True)
+        sys.stdin = io.StringIO(request.get("stdin") or "")
+        # Buffer program output as a local run by the client would
+        program_output.buffer_size = parse_buffer_size(output_buffer)
+
+        status = runner.run_file(filename, option, source=source, limits=limits)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self._send(b"X", str(status).encode())
+
+    def _send(self, kind, payload):
+        self.connection.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+class CompileServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that forks a fresh VM per submitted program"""
+    block_on_close = False
+
+def serve(socket_path=None):
+    """Run the compile server until interrupted"""
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        # Left behind by a server that did not shut down cleanly
+        os.unlink(socket_path)
+
+    server = CompileServer(socket_path, RunRequestHandler)
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Lucent compile server listening on {socket_path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        Path(socket_path).unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else None)
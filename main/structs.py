@@ -0,0 +1,72 @@
+"""Fixed-layout records for instances of user-defined types in the VM"""
+from .errors import TypeError
+
+class StructType:
+    """Layout of a user-defined type: its fields in declaration order and their offsets"""
+    __slots__ = ("name", "fields", "offsets")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = dict(fields)  # field name -> declared type
+        self.offsets = {field: offset for offset, field in enumerate(self.fields)}
+
+    def layout(self, field_names):
+        """
+        Validate the fields given at an instantiation site and return the
+        order to read the given values in (None when already in layout order).
+        Sites always pass the same names, so the VM caches the result per site.
+        """
+        position = {name: i for i, name in enumerate(field_names)}
+        for field in self.fields:
+            if field not in position:
+                raise TypeError(f"Missing required field '{field}' for type {self.name}")
+        for name in position:
+            if name not in self.offsets:
+                raise TypeError(f"Unknown field '{name}' for type {self.name}")
+        order = tuple(position[field] for field in self.fields)
+        return None if order == tuple(range(len(field_names))) else order
+
+    def instantiate(self, fields_dict):
+        """Build an instance from a {field: value} dict"""
+        order = self.layout(list(fields_dict))
+        values = list(fields_dict.values())
+        return StructInstance(self, values if order is None else [values[i] for i in order])
+
+class StructInstance:
+    """
+    An instance of a user-defined type: one value per field, stored by offset.
+    Behaves like the {field: value} dict it replaces when printed, compared or
+    passed to len(), but cannot gain fields that the type does not declare.
+    """
+    __slots__ = ("struct_type", "values")
+
+    def __init__(self, struct_type, values):
+        self.struct_type = struct_type
+        self.values = values
+
+    def items(self):
+        return zip(self.struct_type.offsets, self.values)
+
+    def __getitem__(self, field):
+        return self.values[self.struct_type.offsets[field]]
+
+    def __setitem__(self, field, value):
+        offset = self.struct_type.offsets.get(field)
+        if offset is None:
+            raise TypeError(f"Unknown field '{field}' for type {self.struct_type.name}")
+        self.values[offset] = value
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        if isinstance(other, StructInstance):
+            return dict(self.items()) == dict(other.items())
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
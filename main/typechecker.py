@@ -0,0 +1,547 @@
+"""Static type checker for Lucent programs"""
+from dataclasses import dataclass
+
+from .nodes import (AST, BinOp, Number, If, Var, Assign, String, Let, Sequence, Fun, Call,
+                    PrintLn, Return, StrConversion, While, Continue, Break, Array, ArrayAccess,
+                    ArrayAssign, Length, Dict, DictAccess, DictAssign, Slice, TypeDef,
+                    TypeInstantiation, ArrayInit, Input, ParseInt, Flush, ReadInput, FileCall)
+
+# Memory-mapped file builtin -> (parameter types, return type)
+FILE_BUILTIN_TYPES = {
+    "openMapped": (["string"], "file"),
+    "mappedLineCount": (["file"], "int"),
+    "mappedLine": (["file", "int"], "string"),
+    "mappedFind": (["file", "string", "int"], "int"),
+}
+
+@dataclass
+class TypeCheckError(Exception):
+    """An error raised during type checking"""
+    message: str
+    node: AST = None  
+    
+    def __str__(self):
+        return self.message
+
+def static_type(node):
+    """The type TypeChecker recorded on node, or None if it was never checked"""
+    return getattr(node, "static_type", None)
+
+class TypeChecker:
+    """
+    A static type checker for our language.
+
+    Checking is a single pass over the AST. Every node visited is annotated
+    with its inferred type in a `static_type` attribute, so later stages
+    (the bytecode compiler, the interpreter) can read types back with
+    static_type(node) instead of re-deriving them. "any" marks values whose
+    type is only known at run time, such as dictionary values: they can be
+    printed, compared, indexed and stored, but only reach a concrete type
+    through a conversion checked at run time (str(), parseInt(), ++), so
+    every type recorded as int, string, ... is proven. The empty array
+    literal has type any[] and fits every array type. An if is a statement:
+    its type is that of its branches when they agree, and "void" otherwise.
+
+    Variables are typed through the lexical scope only. A variable the code
+    can still reach at run time without seeing its declaration (a global
+    declared after the function that uses it, or a local declared in an
+    earlier block) is "unknown": allowed, but nothing about it is proven.
+    So is a variable declared with two different types, or assigned by a
+    function defined before its declaration, since code typed against one
+    declaration can run after the other or after that assignment.
+    """
+    
+    def __init__(self):
+        # Variables code at this point can reach at run time (the globals,
+        # plus the current function's parameters and locals) -> their
+        # declared types, None where the type is inferred
+        self.visible = {}
+        # Variables declared at this level with more than one type
+        self.unstable = set()
+        # Variables assigned where their type was not in scope
+        self.unchecked = set()
+        self.function_env = {}  
+        self.user_types = {}
+        self.current_function = None  
+        self.return_type = None  
+        self.errors = []
+    
+    def check(self, ast):
+        """Perform type checking on the entire AST"""
+        self._declare_functions(ast)
+        self.visible = self._declared_variables(ast)
+        self.unstable = {name for name, types in self.visible.items() if len(types) > 1}
+        self._check_node(ast, scope={})
+        
+        if self.errors:
+            raise self.errors[0]
+            
+        return True
+    
+    def _declare_functions(self, node):
+        """Register the signatures of functions defined in a block up front, so
+        functions can call ones defined after them (e.g. mutual recursion)"""
+        match node:
+            case Fun(n, params, rt, _, rest):
+                self.function_env[n] = (list(params), rt)
+                self._declare_functions(rest)
+            case Let(_, _, body, _):
+                self._declare_functions(body)
+            case Sequence(statements):
+                for stmt in statements:
+                    self._declare_functions(stmt)
+
+    @staticmethod
+    def _declared_variables(node):
+        """Variables declared in node, outside any function defined in it -> their declared types"""
+        names = {}
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            match node:
+                case Let(var, expr, body, var_type):
+                    names.setdefault(var, set()).add(var_type)
+                    pending += [expr, body]
+                case Fun(_, _, _, _, rest):
+                    pending.append(rest)
+                case Sequence(statements):
+                    pending += statements
+                case If(_, then, else_):
+                    pending += [then, else_]
+                case While(_, body):
+                    pending.append(body)
+        return names
+
+    def _check_node(self, node, scope):
+        """Infer the type of node and record it on the node"""
+        if node is None:
+            return "void"
+        node_type = self._infer(node, scope)
+        node.static_type = node_type
+        return node_type
+            
+    @staticmethod
+    def _compatible(expected, actual):
+        """
+        Whether a value of type actual can be used where expected is required.
+        "unknown" follows an error that was already reported, so it fits
+        anywhere rather than repeating it
+        """
+        if expected == actual or expected == "any" or "unknown" in (expected, actual):
+            return True
+        if actual == "any[]":
+            # The empty array literal
+            return expected.endswith("[]")
+        if expected.endswith("[]") and actual.endswith("[]"):
+            return TypeChecker._compatible(expected[:-2], actual[:-2])
+        return False
+
+    @staticmethod
+    def _converts(expected, actual):
+        """Like _compatible, for operands whose type is checked at run time (++, str(), parseInt())"""
+        return actual == "any" or TypeChecker._compatible(expected, actual)
+
+    def _infer(self, node, scope):
+        """Recursively check types in the AST"""
+        match node:
+            case Number(_):
+                return "int"
+                
+            case String(_):
+                return "string"
+                
+            case Var(name):
+                if name in scope:
+                    return scope[name]
+                elif name in self.visible:
+                    # Declared where this code cannot see its type
+                    return "unknown"
+                else:
+                    self.errors.append(TypeCheckError(f"Undefined variable '{name}'", node))
+                    return "unknown"
+                
+            case BinOp(op, left, right):
+                left_type = self._check_node(left, scope)
+                right_type = self._check_node(right, scope)
+                
+                if op == "++":
+                    if not self._converts("string", left_type) or not self._converts("string", right_type):
+                        self.errors.append(TypeCheckError(
+                            f"String concatenation (++) requires string operands, got '{left_type}' and '{right_type}'", node))
+                        return "string" 
+                    return "string"
+                
+                # Handle comparison operators
+                if op in ["<", ">", "<=", ">=", "==", "!="]:
+                    # Type compatibility for comparisons; comparing with "any" still gives a bool
+                    if "any" not in (left_type, right_type) and not self._compatible(left_type, right_type):
+                        self.errors.append(TypeCheckError(
+                            f"Cannot compare '{left_type}' with '{right_type}'", node))
+                    return "bool"
+                
+                # Handle logical operators
+                if op in ["and", "or"]:
+                    # Both operands should be boolean
+                    if not self._compatible("bool", left_type) or not self._compatible("bool", right_type):
+                        self.errors.append(TypeCheckError(
+                            f"Logical operator '{op}' requires boolean operands, got '{left_type}' and '{right_type}'", node))
+                    return "bool"
+                
+                # Handle arithmetic operators
+                if op in ["+", "-", "*", "/", "%", "**"]:
+                    # Both operands should be numeric
+                    if not self._compatible("int", left_type) or not self._compatible("int", right_type):
+                        self.errors.append(TypeCheckError(
+                            f"Arithmetic operator '{op}' requires int operands, got '{left_type}' and '{right_type}'", node))
+                    return "int"
+                
+                # Unknown operator
+                self.errors.append(TypeCheckError(f"Unknown operator '{op}'", node))
+                return "unknown"
+                
+            case If(cond, then, else_):
+                cond_type = self._check_node(cond, scope)
+                
+                # Condition must be a boolean
+                if not self._compatible("bool", cond_type):
+                    self.errors.append(TypeCheckError(
+                        f"If condition must be boolean, got '{cond_type}'", cond))
+                
+                # Check both branches
+                then_type = self._check_node(then, scope)
+                else_type = self._check_node(else_, scope)
+                
+                # Used as an expression only when both branches agree; otherwise
+                # (e.g. no else branch) the if is a statement
+                if then_type != else_type:
+                    return "void"
+                    
+                return then_type
+                
+            case Let(var, expr, body, var_type):
+                # Check the initialization expression
+                expr_type = self._check_node(expr, scope)
+                
+                # If variable type is specified, verify it matches expr_type
+                if var_type and not self._compatible(var_type, expr_type):
+                    self.errors.append(TypeCheckError(
+                        f"Cannot assign {expr_type} to variable '{var}' of type {var_type}", node))
+                
+                # Add the variable to scope for the body
+                new_scope = scope.copy()
+                new_scope[var] = var_type if var_type else expr_type
+                if var in self.unstable or var in self.unchecked:
+                    new_scope[var] = "unknown"
+                
+                # Check the body with the updated scope
+                return self._check_node(body, new_scope)
+                
+            case Assign(name, expr):
+                expr_type = self._check_node(expr, scope)
+                
+                # Check if variable exists and has the right type
+                if name in scope:
+                    var_type = scope[name]
+                    if not self._compatible(var_type, expr_type):
+                        self.errors.append(TypeCheckError(
+                            f"Cannot assign {expr_type} to variable '{name}' of type {var_type}", node))
+                elif name in self.visible:
+                    # Nothing checks this value against the variable's type
+                    self.unchecked.add(name)
+                else:
+                    self.errors.append(TypeCheckError(f"Undefined variable '{name}'", node))
+                
+                return expr_type
+                
+            case Fun(n, params, rt, b, e):
+                # Store function signature in environment
+                param_types = [(param_name, param_type) for param_name, param_type in params]
+                self.function_env[n] = (param_types, rt)
+                
+                # Create a new scope for function parameters
+                func_scope = scope.copy()
+                for param_name, param_type in params:
+                    func_scope[param_name] = param_type
+                
+                # Save current function context
+                prev_function = self.current_function
+                prev_return_type = self.return_type
+                prev_visible = self.visible
+                prev_unstable = self.unstable
+                self.current_function = n
+                self.return_type = rt
+                declared = self._declared_variables(b)
+                self.visible = {**prev_visible, **dict.fromkeys(func_scope), **declared}
+                self.unstable = {name for name, types in declared.items() if len(types) > 1}
+                
+                # Check function body
+                self._declare_functions(b)
+                self._check_node(b, func_scope)
+                
+                # Restore function context
+                self.current_function = prev_function
+                self.return_type = prev_return_type
+                self.visible = prev_visible
+                self.unstable = prev_unstable
+                
+                # Continue with code after function definition
+                return self._check_node(e, scope)
+
+            case Call("len", [arg]) if "len" not in self.function_env:
+                # Built-in len() works on arrays, strings and dictionaries
+                arg_type = self._check_node(arg, scope)
+                if not (arg_type.endswith("[]") or arg_type in ("string", "dict", "file", "any", "unknown")):
+                    self.errors.append(TypeCheckError(f"len() is not supported for type {arg_type}", node))
+                return "int"
+                
+            case Call(n, args):
+                # Check if the function exists
+                if n not in self.function_env:
+                    self.errors.append(TypeCheckError(f"Undefined function '{n}'", node))
+                    return "unknown"
+                
+                # Get function signature
+                func_sig = self.function_env[n]
+                param_types = func_sig[0]
+                return_type = func_sig[1]
+                
+                # Check argument count
+                if len(args) != len(param_types):
+                    self.errors.append(TypeCheckError(
+                        f"Function '{n}' expects {len(param_types)} arguments, got {len(args)}", node))
+                else:
+                    # Check argument types
+                    for i, (arg, (_, expected_type)) in enumerate(zip(args, param_types)):
+                        arg_type = self._check_node(arg, scope)
+                        if not self._compatible(expected_type, arg_type):
+                            self.errors.append(TypeCheckError(
+                                f"Function '{n}' argument {i+1} expects {expected_type}, got {arg_type}", arg))
+                
+                return return_type
+                
+            case Return(expr):
+                expr_type = self._check_node(expr, scope)
+                
+                # Check if return type matches function return type
+                if self.current_function and self.return_type and not self._compatible(self.return_type, expr_type):
+                    self.errors.append(TypeCheckError(
+                        f"Function '{self.current_function}' expects return type {self.return_type}, got {expr_type}", node))
+                
+                return expr_type
+                
+            case Sequence(statements):
+                result_type = "void"
+                for stmt in statements:
+                    result_type = self._check_node(stmt, scope)
+                return result_type
+                
+            case PrintLn(expr):
+                # PrintLn can accept any type
+                self._check_node(expr, scope)
+                return "void"
+                
+            case StrConversion(expr):
+                # str() can convert int, bool or string, and decodes a file
+                expr_type = self._check_node(expr, scope)
+                if not any(self._converts(t, expr_type) for t in ["int", "bool", "string", "file"]):
+                    self.errors.append(TypeCheckError(
+                        f"str() only supports int, bool, string and file types, got {expr_type}", node))
+                return "string"
+                
+            case While(cond, body):
+                cond_type = self._check_node(cond, scope)
+                
+                # Condition must be a boolean
+                if not self._compatible("bool", cond_type):
+                    self.errors.append(TypeCheckError(
+                        f"While condition must be boolean, got '{cond_type}'", cond))
+                
+                # Check the loop body
+                self._check_node(body, scope)
+                return "void"
+                
+            case Continue() | Break():
+                return "void"
+
+            case Array(elements):
+                if not elements:
+                    return "any[]"  # Empty arrays fit any array type
+                    
+                # Check that all array elements have the same type
+                elem_types = [self._check_node(elem, scope) for elem in elements]
+                if len(set(elem_types)) != 1:
+                    self.errors.append(TypeCheckError(
+                        f"Array elements must have the same type, got {set(elem_types)}", node))
+                    return "unknown[]"
+                
+                return f"{elem_types[0]}[]"
+                
+            case ArrayAccess(array, indices):
+                array_type = self._check_node(array, scope)
+                index_types = [self._check_node(index, scope) for index in indices]
+                
+                # Check that all indices are integers
+                if not all(self._compatible("int", index_type) for index_type in index_types):
+                    self.errors.append(TypeCheckError(
+                        f"Array indices must be int, got {index_types}", indices))
+                
+                # Each index strips one array dimension; indexing a string gives a string
+                for _ in indices:
+                    if array_type in ("any", "unknown"):
+                        return array_type
+                    if array_type == "string":
+                        continue
+                    if array_type == "file":
+                        # A byte of the file
+                        array_type = "int"
+                        continue
+                    if not array_type.endswith("[]"):
+                        self.errors.append(TypeCheckError(
+                            f"Cannot index into non-array type {array_type}", array))
+                        return "unknown"
+                    array_type = array_type[:-2]  # Remove '[]'
+
+                # Return element type
+                return array_type
+
+            case ArrayAssign(array, indices, value):
+                # The target is checked like a read of the same element
+                element_type = self._check_node(ArrayAccess(array, indices), scope)
+                value_type = self._check_node(value, scope)
+                if not self._compatible(element_type, value_type):
+                    self.errors.append(TypeCheckError(
+                        f"Cannot assign {value_type} to element of type {element_type}", node))
+                return value_type
+
+            case Length(expr):
+                self._check_node(expr, scope)
+                return "int"
+
+            case Slice(sequence, start, end):
+                sequence_type = self._check_node(sequence, scope)
+                for bound in (start, end):
+                    if not self._compatible("int", self._check_node(bound, scope)):
+                        self.errors.append(TypeCheckError("Slice bounds must be int", bound))
+                if not (sequence_type.endswith("[]") or sequence_type in ("string", "file", "any", "unknown")):
+                    self.errors.append(TypeCheckError(f"Cannot slice {sequence_type}", node))
+                    return "unknown"
+                return sequence_type
+
+            case Dict(pairs):
+                for key, value in pairs:
+                    self._check_node(key, scope)
+                    self._check_node(value, scope)
+                return "dict"
+
+            case DictAccess(dict_expr, key):
+                dict_type = self._check_node(dict_expr, scope)
+                self._check_node(key, scope)
+
+                # Field access on a user-defined type has a known type
+                if dict_type in self.user_types:
+                    fields = self.user_types[dict_type]
+                    if isinstance(key, String):
+                        if key.val not in fields:
+                            self.errors.append(TypeCheckError(
+                                f"Type {dict_type} has no field '{key.val}'", node))
+                            return "unknown"
+                        return fields[key.val]
+                elif dict_type not in ("dict", "any", "unknown"):
+                    self.errors.append(TypeCheckError(
+                        f"Cannot access key in non-dict type {dict_type}", node))
+                    return "unknown"
+                
+                # Dictionary values are only known at run time
+                return "any"
+
+            case DictAssign(dict_expr, key, value):
+                dict_type = self._check_node(dict_expr, scope)
+                self._check_node(key, scope)
+                value_type = self._check_node(value, scope)
+
+                if dict_type in self.user_types and isinstance(key, String):
+                    field_type = self.user_types[dict_type].get(key.val)
+                    if field_type is None:
+                        self.errors.append(TypeCheckError(
+                            f"Type {dict_type} has no field '{key.val}'", node))
+                    elif not self._compatible(field_type, value_type):
+                        self.errors.append(TypeCheckError(
+                            f"Cannot assign {value_type} to field '{key.val}' of type {field_type}", node))
+                elif dict_type not in self.user_types and dict_type not in ("dict", "any", "unknown"):
+                    self.errors.append(TypeCheckError(
+                        f"Cannot assign key in non-dict type {dict_type}", node))
+                return value_type
+
+            case TypeDef(name, fields):
+                self.user_types[name] = dict(fields)
+                return "void"
+
+            case TypeInstantiation(type_name, Dict(pairs)):
+                if type_name not in self.user_types:
+                    self.errors.append(TypeCheckError(f"Unknown type: {type_name}", node))
+                    return "unknown"
+
+                fields = self.user_types[type_name]
+                given = set()
+                for key, value in pairs:
+                    value_type = self._check_node(value, scope)
+                    field_name = key.val if isinstance(key, String) else None
+                    given.add(field_name)
+                    if field_name not in fields:
+                        self.errors.append(TypeCheckError(
+                            f"Unknown field '{field_name}' for type {type_name}", node))
+                    elif not self._compatible(fields[field_name], value_type):
+                        self.errors.append(TypeCheckError(
+                            f"Field '{field_name}' of type {type_name} expects {fields[field_name]}, got {value_type}", value))
+                for field_name in fields:
+                    if field_name not in given:
+                        self.errors.append(TypeCheckError(
+                            f"Missing required field '{field_name}' for type {type_name}", node))
+                return type_name
+                
+            case ArrayInit(element_type, sizes):
+                size_types = [self._check_node(size, scope) for size in sizes]
+                if not all(self._compatible("int", size_type) for size_type in size_types):
+                    self.errors.append(TypeCheckError(
+                        f"Array sizes must be integers, got '{size_types}'", sizes))
+                
+                return f"{element_type}{'[]' * len(sizes)}"
+                
+            case Input(prompt):
+                self._check_node(prompt, scope)
+                return "string"
+
+            case Flush():
+                return "int"
+
+            case ReadInput(builtin, path):
+                if path is not None:
+                    path_type = self._check_node(path, scope)
+                    if not self._compatible("string", path_type):
+                        self.errors.append(TypeCheckError(
+                            f"{builtin} path must be a string, got {path_type}", node))
+                return {"readAll": "string", "readLines": "string[]", "readInts": "int[]"}[builtin]
+
+            case FileCall(builtin, args):
+                param_types, return_type = FILE_BUILTIN_TYPES[builtin]
+                if len(args) != len(param_types):
+                    self.errors.append(TypeCheckError(
+                        f"{builtin}() takes {len(param_types)} arguments, got {len(args)}", node))
+                for param_type, arg in zip(param_types, args):
+                    arg_type = self._check_node(arg, scope)
+                    if not self._compatible(param_type, arg_type):
+                        self.errors.append(TypeCheckError(
+                            f"{builtin}() expects {param_type}, got {arg_type}", arg))
+                return return_type
+
+            case ParseInt(expr):
+                expr_type = self._check_node(expr, scope)
+                if not self._converts("string", expr_type):
+                    self.errors.append(TypeCheckError(
+                        f"parseInt argument must be a string, got {expr_type}", node))
+                return "int"
+
+            case _:
+                # A node type the checker does not know; nothing about it is proven
+                self.errors.append(TypeCheckError(f"Cannot type check {type(node).__name__}", node))
+                return "unknown"
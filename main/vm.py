@@ -0,0 +1,931 @@
+"""Stack-based virtual machine that executes compiled bytecode"""
+import math
+import time
+from .errors import TypeError, ResourceLimitExceeded
+from .compiler import BytecodeInstruction
+from .structs import StructType, StructInstance
+from .ropes import STRING_TYPES, concat, value_type_name
+from .arrays import TypedArray, ARRAY_TYPES, SEQUENCE_TYPES, new_array, detach_views, slice_array
+from .output import OutputBuffer, program_output
+from .input import READERS, read_line
+from .mapped import FILE_BUILTINS, open_mapped, close_mapped
+from .profiler import FetchHook
+
+# Quickening: in adaptive mode these generic opcodes start out in an
+# *_ADAPTIVE form that rewrites itself into the specialised form matching
+# the (container, key) operand types it observes. Specialised forms guard
+# their operand types and de-optimise back to the adaptive form on a miss.
+# Only loads are quickened: their generic forms check the container and
+# index types, which the guard replaces. BINARY_ADD and the like do no
+# checks at all, so a guarded int form of them could only be slower.
+SPECIALIZATIONS = {
+    ("LOAD_ARRAY_ITEM", list, int): "LOAD_ARRAY_ITEM_LIST",
+    ("LOAD_ARRAY_ITEM", TypedArray, int): "LOAD_ARRAY_ITEM_TYPED",
+    ("LOAD_ARRAY_ITEM", str, int): "LOAD_ARRAY_ITEM_STR",
+    ("LOAD_DICT_ITEM", dict, str): "LOAD_DICT_ITEM_DICT",
+    ("LOAD_DICT_ITEM", dict, int): "LOAD_DICT_ITEM_DICT",
+}
+ADAPTIVE_OPCODES = {generic: generic + "_ADAPTIVE" for generic, _, _ in SPECIALIZATIONS}
+GENERIC_OPCODES = {adaptive: generic for generic, adaptive in ADAPTIVE_OPCODES.items()}
+# A site that misses this many times stays generic for good
+MAX_DEOPTS = 4
+
+# Values len() accepts
+SIZED_TYPES = SEQUENCE_TYPES + (dict, StructInstance)
+
+# Under ResourceLimits the opcodes that can grow a string, array or dict run
+# in a *_LIMITED form that checks the size first, so runs without limits
+# pay nothing for the check. These take precedence over adaptive forms.
+LIMITED_OPCODES = {generic: generic + "_LIMITED"
+                   for generic in ("BINARY_ADD", "BINARY_MUL", "BINARY_CONCAT", "STR_CONCAT", "STORE_DICT_ITEM")}
+UNLIMITED_OPCODES = {limited: generic for generic, limited in LIMITED_OPCODES.items()}
+
+# Define a BytecodeVM class to execute compiled bytecode
+class BytecodeVM:
+    def __init__(self, bytecode, adaptive=False, limits=None, stdout=None, stdin=None):
+        # ResourceLimits to enforce, or None; an empty ResourceLimits is None
+        self.limits = limits or None
+        if adaptive or self.limits:
+            # Quickening rewrites instructions in place, so work on a copy
+            # rather than the (possibly cached) compiled bytecode
+            rewrites = dict(ADAPTIVE_OPCODES) if adaptive else {}
+            if self.limits:
+                rewrites.update(LIMITED_OPCODES)
+            self.instructions = [BytecodeInstruction(rewrites.get(instr.opcode, instr.opcode), instr.args)
+                                 for instr in bytecode['instructions']]
+        else:
+            self.instructions = bytecode['instructions']
+        self.constants = bytecode['constants']
+        # Variable name -> index, for reports that name functions
+        self.variable_indexes = bytecode['variables']
+        # Index -> name, from this program's own map (the first name wins, as a scan would find)
+        self.variable_names = {}
+        for name, index in bytecode['variables'].items():
+            self.variable_names.setdefault(index, name)
+        # Initialize variables array with None values for all variables
+        self.variables = [None] * max(len(bytecode['variables']) + 1, 1)
+        # Store global variables set
+        self.global_vars = bytecode['global_vars']
+        # Create a separate globals dict for global variable access
+        self.globals = {}
+        # Built-in functions
+        self.builtins = {'len': self._builtin_len}
+        self.stack = []
+        self.ip = 0  # Instruction pointer
+        self.call_stack = []  # For function calls
+        self._debug = False  # Debug mode flag (see the debug property)
+        # Add user-defined types dictionary (name -> StructType)
+        self.user_defined_types = {}
+        # Per-instruction inline caches, e.g. (StructType, offset) for LOAD_FIELD
+        # or the backoff counter of an adaptive instruction
+        self.inline_caches = [None] * len(self.instructions)
+        # Site -> number of failed specialisations (adaptive mode)
+        self.deopt_counts = {}
+        # Where PRINT, the debug trace and the error dump write; flushed at
+        # exit, before INPUT and by flush(). Given streams keep VMs in one
+        # process (e.g. on several threads) from sharing sys.stdout and sys.stdin
+        self.output = program_output if stdout is None else OutputBuffer.for_stream(stdout)
+        # Where INPUT and readAll/readLines/readInts read; None is sys.stdin
+        self.input = stdin
+        # Copy-on-write slices taken by this program (see ArraySlice)
+        self.live_views = {}
+        # Files mapped by openMapped, closed when run() finishes
+        self.mapped_files = []
+        # Instructions run so far, counted at limit checkpoints (see _checkpoint)
+        self.instruction_count = 0
+        self._segment_start = 0
+        self._deadline = None
+    
+    @property
+    def debug(self):
+        """Debug mode prints every instruction and the stack before it runs"""
+        return self._debug
+
+    @debug.setter
+    def debug(self, enabled):
+        if enabled and not self._debug:
+            self.add_fetch_hook(self._trace_instruction)
+        elif self._debug and not enabled:
+            self.remove_fetch_hook(self._trace_instruction)
+        self._debug = enabled
+
+    def add_fetch_hook(self, callback):
+        """
+        Call callback(ip) before each instruction runs. Hooks swap in an
+        instruction list that makes the calls, so run() has no per-instruction
+        checks and a VM without hooks pays nothing for them.
+        """
+        if not isinstance(self.instructions, FetchHook):
+            self.instructions = FetchHook(self.instructions)
+        self.instructions.callbacks.append(callback)
+
+    def remove_fetch_hook(self, callback):
+        if isinstance(self.instructions, FetchHook) and callback in self.instructions.callbacks:
+            self.instructions.callbacks.remove(callback)
+            if not self.instructions.callbacks:
+                self.instructions = list(self.instructions)
+
+    def _trace_instruction(self, ip):
+        instruction = list.__getitem__(self.instructions, ip)
+        args = instruction.args if instruction.args else []
+        stack_str = str(self.stack)[-60:] if self.stack else "[]"
+        self.output.write(f"EXEC: {ip}: {instruction.opcode} {args} (Stack: {stack_str})\n")
+
+    def _builtin_len(self, arg):
+        """Built-in len function implementation"""
+        if isinstance(arg, SIZED_TYPES):
+            return len(arg)
+        else:
+            raise TypeError(f"Object of type {type(arg).__name__} has no len()")
+        
+    def run(self):
+        self._result = None
+        if self.limits is not None and self.limits.seconds is not None:
+            self._deadline = time.monotonic() + self.limits.seconds
+        # Every opcode costs one dict lookup, however many opcodes there are,
+        # so the typed and quickened forms are as cheap to reach as LOAD_CONST
+        dispatch = DISPATCH
+        opcode = args = None
+        try:
+            while self.ip < len(self.instructions):
+                instruction = self.instructions[self.ip]
+                self.ip += 1
+                opcode = instruction.opcode
+                args = instruction.args
+                try:
+                    handler = dispatch[opcode]
+                except KeyError:
+                    raise ValueError(f"Unknown opcode: {opcode}") from None
+                handler(self, args)
+            
+            if self.limits is not None:
+                self.instruction_count += self.ip - self._segment_start
+            self.output.flush()
+            # Return the last value on the stack, if any
+            return self._result if not self.stack else self.stack[-1]
+                
+        except ResourceLimitExceeded:
+            # Not a fault in the program's state, so there is nothing to dump
+            self.output.flush()
+            raise
+        except Exception as e:
+            # The state dump goes with the program's output, wherever that is
+            self.output.write(f"VM Error at instruction {self.ip-1}: {opcode} {args or []}\n"
+                              f"Stack: {self.stack}\nVariables: {self.variables}\n")
+            self.output.flush()
+            raise
+        finally:
+            close_mapped(self.mapped_files)
+    
+    # Opcode handlers: run() calls DISPATCH[opcode](self, args) with the
+    # instruction pointer already past the instruction
+    
+    def _op_load_const(self, args):
+        self.stack.append(self.constants[args[0]])
+    
+    def _op_load_var(self, args):
+        var_idx = args[0]
+        var_name = self._get_var_name(var_idx)
+        
+        # Check for built-in functions first
+        if var_name in self.builtins:
+            # For built-ins, we create a special callable object
+            self.stack.append(('__builtin__', var_name))
+            return
+        
+        # For regular variables, we use the local vars first then fallback to globals
+        if var_idx >= len(self.variables) or self.variables[var_idx] is None:
+            # Check if it's a global variable
+            if var_name in self.globals:
+                self.stack.append(self.globals[var_name])
+            else:
+                raise ValueError(f"Variable at index {var_idx} not initialized")
+        else:
+            self.stack.append(self.variables[var_idx])
+    
+    def _op_load_global(self, args):
+        var_idx = args[0]
+        var_name = self._get_var_name(var_idx)
+        # For global variables, we directly look in the globals dictionary
+        if var_name in self.globals:
+            self.stack.append(self.globals[var_name])
+        else:
+            raise ValueError(f"Global variable {var_name} not initialized")
+    
+    def _op_store_var(self, args):
+        var_idx = args[0]
+        var_name = self._get_var_name(var_idx)
+        value = self.stack.pop()
+        
+        # Expand variables array if needed
+        if var_idx >= len(self.variables):
+            self.variables.extend([None] * (var_idx - len(self.variables) + 1))
+        
+        # Store in the local variables array
+        self.variables[var_idx] = value
+        
+        # If on the top frame and it's a global, also store in globals
+        if not self.call_stack and var_name in self.global_vars:
+            self.globals[var_name] = value
+    
+    def _op_store_global(self, args):
+        var_idx = args[0]
+        var_name = self._get_var_name(var_idx)
+        value = self.stack.pop()
+        
+        # Store in both the globals dict and the variables array
+        self.globals[var_name] = value
+        
+        if var_idx >= len(self.variables):
+            self.variables.extend([None] * (var_idx - len(self.variables) + 1))
+        self.variables[var_idx] = value
+    
+    def _op_binary_add(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left + right)
+    
+    def _op_binary_sub(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left - right)
+    
+    def _op_binary_mul(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left * right)
+    
+    def _op_binary_div(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left // right)
+    
+    def _op_binary_mod(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left % right)
+    
+    def _op_binary_power(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left ** right)
+    
+    def _op_binary_concat(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        # String concatenation with type checking
+        if not isinstance(left, STRING_TYPES) or not isinstance(right, STRING_TYPES):
+            raise TypeError(f"Cannot concatenate {value_type_name(left)} with {value_type_name(right)}")
+        # Long results are deferred as ropes (see ropes.py)
+        self.stack.append(concat(left, right))
+    
+    def _op_binary_lt(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left < right)
+    
+    def _op_binary_gt(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left > right)
+    
+    def _op_binary_le(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left <= right)
+    
+    def _op_binary_ge(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left >= right)
+    
+    def _op_binary_eq(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left == right)
+    
+    def _op_binary_ne(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left != right)
+    
+    def _op_binary_and(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left and right)
+    
+    def _op_binary_or(self, args):
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self.stack.append(left or right)
+    
+    def _op_str_convert(self, args):
+        value = self.stack.pop()
+        self.stack.append(str(value))
+    
+    def _op_print(self, args):
+        if not self.stack:
+            self.output.write("ERROR: Stack underflow in PRINT operation\n")
+            return
+        value = self.stack.pop()
+        self.output.write(f"{value}\n")
+        self._result = value
+    
+    def _op_pop_top(self, args):
+        self.stack.pop()
+    
+    def _op_jump(self, args):
+        # Find the label index before updating IP
+        label_idx = self._find_label(args[0])
+        # Loops end in a backward jump, so this bounds their running time
+        if label_idx < self.ip and self.limits is not None:
+            self._checkpoint(self.ip, label_idx)
+        self.ip = label_idx
+    
+    def _op_jump_if_false(self, args):
+        condition = self.stack.pop()
+        if not condition:
+            # Find the label index before updating IP
+            label_idx = self._find_label(args[0])
+            self.ip = label_idx
+    
+    def _op_label(self, args):
+        # Labels are just markers, no operation needed
+        pass
+    
+    def _op_load_array_item(self, args):
+        idx = self.stack.pop()
+        arr = self.stack.pop()
+        self.stack.append(self._load_index(arr, idx))
+    
+    def _op_store_array_item(self, args):
+        value = self.stack.pop()
+        idx = self.stack.pop()
+        arr = self.stack.pop()
+        if not isinstance(arr, ARRAY_TYPES):
+            raise TypeError(f"Cannot assign to {type(arr).__name__}")
+        if not isinstance(idx, int):
+            raise TypeError("Array index must be integer")
+        if idx < 0 or idx >= len(arr):
+            raise IndexError("Array index out of bounds")
+        if self.live_views and id(arr) in self.live_views:
+            detach_views(arr, self.live_views)
+        arr[idx] = value
+        self.stack.append(value)
+    
+    def _op_build_list(self, args):
+        # Take all the elements with one slice of the stack
+        start = len(self.stack) - args[0]
+        elements = self.stack[start:]
+        del self.stack[start:]
+        self.stack.append(elements)
+    
+    def _op_build_const_list(self, args):
+        # Literal of constants: a fresh copy of the constant tuple
+        self.stack.append(list(self.constants[args[0]]))
+    
+    def _op_create_array_init(self, args):
+        element_type = args[0]
+        num_dimensions = args[1]  # Number of dimensions to pop from stack
+        
+        start = len(self.stack) - num_dimensions
+        sizes = self.stack[start:]
+        del self.stack[start:]
+        
+        if not all(isinstance(size, int) and size >= 0 for size in sizes):
+            raise ValueError(f"Array sizes must be non-negative integers, got {sizes}")
+        if self.limits is not None:
+            self._check_size(math.prod(sizes))
+        
+        # int and bool arrays are stored flat (see arrays.py)
+        self.stack.append(new_array(element_type, sizes))
+    
+    def _op_get_length(self, args):
+        # Pop the object whose length we need to get
+        obj = self.stack.pop()
+        
+        # Check the type and get its length
+        if isinstance(obj, SIZED_TYPES):
+            length = len(obj)
+            self.stack.append(length)
+        else:
+            raise TypeError(f"Cannot get length of {type(obj).__name__}")
+    
+    def _op_slice(self, args):
+        end_idx = self.stack.pop()
+        start_idx = self.stack.pop()
+        seq = self.stack.pop()
+        if not isinstance(seq, SEQUENCE_TYPES):
+            raise TypeError(f"Cannot slice {type(seq).__name__}")
+        self.stack.append(slice_array(seq, start_idx, end_idx, self.live_views))
+    
+    def _op_build_map(self, args):
+        # Keys and values alternate on the stack; take them with
+        # one slice and insert the pairs last-to-first, the order
+        # dictionaries have always been built in
+        start = len(self.stack) - 2 * args[0]
+        items = self.stack[start:]
+        del self.stack[start:]
+        self.stack.append(dict(zip(items[-2::-2], items[::-2])))
+
+    def _op_load_dict_item(self, args):
+        key = self.stack.pop()
+        dict_obj = self.stack.pop()
+        # If this is a nested access, let the next instruction handle it
+        self.stack.append(self._load_item(dict_obj, key))
+
+    def _op_store_dict_item(self, args):
+        value = self.stack.pop()
+        key = self.stack.pop()
+        dict_obj = self.stack.pop()
+        self._store_item(dict_obj, key, value)
+        self.stack.append(value)
+    
+    def _op_load_field(self, args):
+        # Constant-key access; struct fields hit the per-site cache
+        obj = self.stack[-1]
+        cache = self.inline_caches[self.ip - 1]
+        if cache is not None and obj.__class__ is StructInstance and obj.struct_type is cache[0]:
+            self.stack[-1] = obj.values[cache[1]]
+        else:
+            self.stack[-1] = self._load_item(obj, args[0], self.ip - 1)
+    
+    def _op_store_field(self, args):
+        value = self.stack.pop()
+        obj = self.stack[-1]
+        cache = self.inline_caches[self.ip - 1]
+        if cache is not None and obj.__class__ is StructInstance and obj.struct_type is cache[0]:
+            obj.values[cache[1]] = value
+        else:
+            self._store_item(obj, args[0], value, self.ip - 1)
+        self.stack[-1] = value
+    
+    def _op_make_function(self, args):
+        # Function metadata is already on the stack
+        # Just keep it there (it's a tuple with function info)
+        pass
+        
+    def _op_create_type_def(self, args):
+        # Get type definition from arguments
+        type_name = args[0]
+        field_count = args[1]
+        
+        # Pop field definitions from stack (name, type pairs)
+        fields = []
+        for _ in range(field_count):
+            field_type = self.stack.pop()  # Type comes second on stack
+            field_name = self.stack.pop()  # Name comes first on stack
+            fields.append((field_name, field_type))
+        
+        # Register the type, with fields in declaration order
+        self.user_defined_types[type_name] = StructType(type_name, reversed(fields))
+        
+        # Don't push anything onto the stack
+        # Type definitions don't have a runtime value
+    
+    def _op_create_type_instance(self, args):
+        # Get type name from arguments
+        type_name = args[0]
+        
+        # Get instance fields from the Dict already on stack
+        fields_dict = self.stack.pop()
+        
+        if type_name not in self.user_defined_types:
+            raise TypeError(f"Unknown type: {type_name}")
+        
+        # Checks for missing and extra fields, then copies them
+        # into the type's layout
+        instance = self.user_defined_types[type_name].instantiate(fields_dict)
+        
+        # Push instance onto stack
+        self.stack.append(instance)
+    
+    def _op_create_struct(self, args):
+        type_name, field_names = args
+        struct_type = self.user_defined_types.get(type_name)
+        if struct_type is None:
+            raise TypeError(f"Unknown type: {type_name}")
+        
+        # The field names at a site never change, so they are
+        # validated once and the resulting layout order cached
+        cache = self.inline_caches[self.ip - 1]
+        if cache is None or cache[0] is not struct_type:
+            cache = (struct_type, struct_type.layout(field_names))
+            self.inline_caches[self.ip - 1] = cache
+        
+        # Field values were pushed in the order they were written
+        count = len(field_names)
+        values = self.stack[len(self.stack) - count:]
+        del self.stack[len(self.stack) - count:]
+        if cache[1] is not None:
+            values = [values[i] for i in cache[1]]
+        self.stack.append(StructInstance(struct_type, values))
+    
+    def _op_call_function(self, args):
+        num_args = args[0]
+        # Arguments are the top num_args values, in order
+        start = len(self.stack) - num_args
+        arg_vals = self.stack[start:]
+        del self.stack[start:]
+
+        # Pop function object (metadata tuple or built-in)
+        func_obj = self.stack.pop()
+
+        # Handle built-in functions
+        if isinstance(func_obj, tuple) and func_obj[0] == '__builtin__':
+            builtin_name = func_obj[1]
+            if builtin_name in self.builtins:
+                # Call the built-in function
+                if len(arg_vals) != 1:
+                    raise TypeError(f"{builtin_name}() takes exactly 1 argument ({len(arg_vals)} given)")
+                self._result = self.builtins[builtin_name](arg_vals[0])
+                self.stack.append(self._result)
+                return
+            else:
+                raise ValueError(f"Unknown built-in function: {builtin_name}")
+
+        # Handle regular functions
+        if not isinstance(func_obj, tuple) or len(func_obj) not in [3, 4]:
+            raise TypeError(f"Cannot call {func_obj}")
+
+        # Unpack function metadata
+        func_label, params, return_type = func_obj
+
+        # Check that number of arguments matches number of parameters
+        if len(arg_vals) != len(params):
+            raise TypeError(f"Function expected {len(params)} arguments but got {len(arg_vals)}")
+
+        # Save current instruction pointer for return
+        return_ip = self.ip
+
+        # Create a new variables array for the function call
+        # This preserves lexical scoping - local variables don't affect parent scope
+        new_vars = [None] * len(self.variables)
+
+        # Save current context to call stack (to restore on return)
+        self.call_stack.append((return_ip, self.variables))
+
+        # Set the new variables array as active
+        self.variables = new_vars
+
+        # Push arguments onto the stack for the function body to access
+        self.stack.extend(arg_vals)
+
+        # Jump to function body
+        self.ip = self._find_label(func_label)
+        if self.limits is not None:
+            self._checkpoint(return_ip, self.ip)
+
+    def _op_return_value(self, args):
+        # Get return value
+        return_value = self.stack.pop()
+
+        # Restore calling context if there's a saved context
+        if self.call_stack:
+            # Pop the last call frame
+            return_ip, saved_variables = self.call_stack.pop()
+
+            # Restore variables from before the call
+            self.variables = saved_variables
+
+            if self.limits is not None:
+                self._checkpoint(self.ip, return_ip)
+
+            # Jump back to caller
+            self.ip = return_ip
+
+            # Push return value onto stack for caller
+            self.stack.append(return_value)
+        else:
+            # Top-level return or end of program
+            self.stack.append(return_value)
+            self.ip = len(self.instructions)  # Exit execution
+    
+    def _op_input(self, args):
+        # Read one line of input from the user, after showing
+        # everything printed so far (including the prompt)
+        self.output.flush()
+        self.stack.append(read_line(self.input))
+    
+    def _op_print_no_newline(self, args):
+        value = self.stack.pop()
+        self.output.write(f"{value}")
+    
+    def _op_flush_output(self, args):
+        self.output.flush()
+        self.stack.append(0)
+    
+    def _op_read_input(self, args):
+        # readAll/readLines/readInts, from a file if a path was given
+        path = self.stack.pop() if args[1] else None
+        self.stack.append(READERS[args[0]](path, self.input, self.output))
+        if self.limits is not None:
+            self._check_size(len(self.stack[-1]))
+    
+    def _op_file_call(self, args):
+        function, arity = FILE_BUILTINS[args[0]]
+        if args[1] != arity:
+            raise TypeError(f"{args[0]}() takes exactly {arity} arguments ({args[1]} given)")
+        start = len(self.stack) - arity
+        call_args = self.stack[start:]
+        del self.stack[start:]
+        result = function(*call_args)
+        if function is open_mapped:
+            self.mapped_files.append(result)
+        self.stack.append(result)
+        
+    def _op_str_to_int(self, args):
+        value = self.stack.pop()
+        if not isinstance(value, STRING_TYPES):
+            raise TypeError(f"parseInt argument must be a string, got {type(value).__name__}")
+        try:
+            self.stack.append(int(value))
+        except ValueError:
+            # If conversion fails, push 0
+            self.stack.append(0)
+    
+    # Type-specialised opcodes: the compiler only emits them for operands
+    # the type checker proved, so they leave out the generic forms' checks
+    # and replace the top of the stack in place instead of popping both operands
+    
+    def _op_int_add(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] + right
+    
+    def _op_int_sub(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] - right
+    
+    def _op_int_mul(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] * right
+    
+    def _op_int_div(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] // right
+    
+    def _op_int_mod(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] % right
+    
+    def _op_int_lt(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] < right
+    
+    def _op_int_le(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] <= right
+    
+    def _op_int_gt(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] > right
+    
+    def _op_int_ge(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] >= right
+    
+    def _op_int_eq(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] == right
+    
+    def _op_int_ne(self, args):
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] != right
+    
+    def _op_array_load_int(self, args):
+        # No isinstance checks: the array and the int index are proven
+        stack = self.stack
+        idx = stack.pop()
+        if idx < 0:
+            raise IndexError("Array index out of bounds")
+        try:
+            stack[-1] = stack[-1][idx]
+        except IndexError:
+            raise IndexError("Array index out of bounds") from None
+    
+    def _op_str_concat(self, args):
+        # Both operands are proven strings, so the concatenation check is skipped
+        stack = self.stack
+        right = stack.pop()
+        stack[-1] = concat(stack[-1], right)
+    
+    # Quickened forms (adaptive mode only): the guard stands in for the
+    # generic form's type and bounds checks. On a miss they put the operand
+    # back, de-optimise and re-run the instruction in its adaptive form
+    
+    def _op_load_array_item_list(self, args):
+        stack = self.stack
+        idx = stack.pop()
+        arr = stack[-1]
+        if arr.__class__ is list and idx.__class__ is int and 0 <= idx < len(arr):
+            stack[-1] = arr[idx]
+        else:
+            stack.append(idx)
+            self._deoptimize(self.ip - 1, "LOAD_ARRAY_ITEM")
+            self.ip -= 1
+    
+    def _op_load_array_item_str(self, args):
+        stack = self.stack
+        idx = stack.pop()
+        arr = stack[-1]
+        if arr.__class__ is str and idx.__class__ is int and 0 <= idx < len(arr):
+            stack[-1] = arr[idx]
+        else:
+            stack.append(idx)
+            self._deoptimize(self.ip - 1, "LOAD_ARRAY_ITEM")
+            self.ip -= 1
+    
+    def _op_load_array_item_typed(self, args):
+        stack = self.stack
+        idx = stack.pop()
+        arr = stack[-1]
+        if arr.__class__ is TypedArray and idx.__class__ is int and 0 <= idx < len(arr):
+            stack[-1] = arr[idx]
+        else:
+            stack.append(idx)
+            self._deoptimize(self.ip - 1, "LOAD_ARRAY_ITEM")
+            self.ip -= 1
+    
+    def _op_load_dict_item_dict(self, args):
+        stack = self.stack
+        key = stack.pop()
+        dict_obj = stack[-1]
+        if dict_obj.__class__ is dict and key in dict_obj:
+            stack[-1] = dict_obj[key]
+        else:
+            stack.append(key)
+            self._deoptimize(self.ip - 1, "LOAD_DICT_ITEM")
+            self.ip -= 1
+    
+    def _op_adaptive(self, args):
+        # Adaptive instruction: run the generic operation and,
+        # unless backing off after misses, specialise the site
+        # for the operand types seen
+        site = self.ip - 1
+        # Read past any fetch hooks: the instruction is rewritten in place
+        instruction = list.__getitem__(self.instructions, site)
+        generic = GENERIC_OPCODES[instruction.opcode]
+        right = self.stack.pop()
+        left = self.stack.pop()
+        if self.inline_caches[site]:
+            self.inline_caches[site] -= 1
+        else:
+            specialized = SPECIALIZATIONS.get((generic, left.__class__, right.__class__))
+            if specialized:
+                instruction.opcode = specialized
+            else:
+                self._deoptimize(site, generic)
+        self.stack.append(self._execute_generic(generic, left, right))
+    
+    def _op_limited(self, args):
+        # Resource limits: check the size of what is built, then build it
+        generic = UNLIMITED_OPCODES[list.__getitem__(self.instructions, self.ip - 1).opcode]
+        if generic == "STORE_DICT_ITEM":
+            value = self.stack.pop()
+            key = self.stack.pop()
+            dict_obj = self.stack.pop()
+            if isinstance(dict_obj, dict) and key not in dict_obj:
+                self._check_size(len(dict_obj) + 1)
+            self._store_item(dict_obj, key, value)
+            self.stack.append(value)
+            return
+        right = self.stack.pop()
+        left = self.stack.pop()
+        self._check_size(self._result_size(generic, left, right))
+        self.stack.append(self._execute_limited(generic, left, right))
+            
+    def _load_index(self, arr, idx):
+        """arr[idx] for arrays and strings"""
+        if not isinstance(arr, SEQUENCE_TYPES):
+            raise TypeError(f"Cannot index into {type(arr).__name__}")
+        if not isinstance(idx, int):
+            raise TypeError("Array index must be integer")
+        if idx < 0 or idx >= len(arr):
+            raise IndexError("Array index out of bounds")
+        return arr[idx]
+    
+    def _execute_generic(self, opcode, left, right):
+        """Unspecialised semantics of the opcodes that adaptive mode quickens"""
+        if opcode == "LOAD_ARRAY_ITEM":
+            return self._load_index(left, right)
+        return self._load_item(left, right)
+    
+    def _checkpoint(self, end, resume):
+        """
+        Limit checkpoint on a backward jump, call or return: charge the
+        instructions from the last checkpoint up to end, continue counting
+        from resume and raise ResourceLimitExceeded if any limit is passed
+        """
+        self.instruction_count += end - self._segment_start
+        self._segment_start = resume
+        limits = self.limits
+        if limits.instructions is not None and self.instruction_count > limits.instructions:
+            raise ResourceLimitExceeded("instructions", limits.instructions, self.instruction_count)
+        if limits.call_depth is not None and len(self.call_stack) > limits.call_depth:
+            raise ResourceLimitExceeded("call_depth", limits.call_depth, len(self.call_stack))
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            elapsed = limits.seconds + time.monotonic() - self._deadline
+            raise ResourceLimitExceeded("seconds", limits.seconds, f"{elapsed:.2f}s")
+    
+    def _check_size(self, size):
+        """Raise ResourceLimitExceeded if a container of size elements is over the limit"""
+        maximum = self.limits.container_size
+        if maximum is not None and size is not None and size > maximum:
+            raise ResourceLimitExceeded("container_size", maximum, size)
+    
+    def _result_size(self, opcode, left, right):
+        """Length of the string or array left + right, left ++ right or left * right, None for numbers"""
+        if opcode == "BINARY_MUL":
+            if isinstance(left, int) and isinstance(right, SEQUENCE_TYPES):
+                left, right = right, left
+            if isinstance(left, SEQUENCE_TYPES) and isinstance(right, int):
+                return len(left) * max(right, 0)
+            return None
+        if isinstance(left, SEQUENCE_TYPES) and isinstance(right, SEQUENCE_TYPES):
+            return len(left) + len(right)
+        return None
+    
+    def _execute_limited(self, opcode, left, right):
+        """Semantics of the opcodes with a *_LIMITED form, matching their _op_* handlers"""
+        if opcode == "BINARY_ADD":
+            return left + right
+        if opcode == "BINARY_MUL":
+            return left * right
+        if opcode == "BINARY_CONCAT" and (not isinstance(left, STRING_TYPES) or not isinstance(right, STRING_TYPES)):
+            raise TypeError(f"Cannot concatenate {value_type_name(left)} with {value_type_name(right)}")
+        return concat(left, right)
+    
+    def _deoptimize(self, site, generic):
+        """
+        A specialisation at site missed: return it to the adaptive form and
+        back off exponentially before specialising again, or settle on the
+        generic opcode once the site has missed MAX_DEOPTS times
+        """
+        # Read past any fetch hooks: this is not an instruction being run
+        instruction = list.__getitem__(self.instructions, site)
+        deopts = self.deopt_counts.get(site, 0) + 1
+        self.deopt_counts[site] = deopts
+        if deopts >= MAX_DEOPTS:
+            instruction.opcode = generic
+        else:
+            instruction.opcode = ADAPTIVE_OPCODES[generic]
+            self.inline_caches[site] = 2 ** deopts
+    
+    def _load_item(self, obj, key, site=None):
+        """obj{key} for dicts and struct instances; site caches the field offset"""
+        if obj.__class__ is StructInstance:
+            offset = obj.struct_type.offsets.get(key)
+            if offset is None:
+                raise KeyError(f"Key {key} not found in dictionary or object")
+            if site is not None:
+                self.inline_caches[site] = (obj.struct_type, offset)
+            return obj.values[offset]
+        if not isinstance(obj, dict):
+            raise TypeError(f"Cannot access key in non-dict type {type(obj).__name__}")
+        try:
+            return obj[key]
+        except KeyError:
+            raise KeyError(f"Key {key} not found in dictionary or object")
+    
+    def _store_item(self, obj, key, value, site=None):
+        """obj{key} = value for dicts and struct instances"""
+        if obj.__class__ is StructInstance:
+            obj[key] = value
+            if site is not None:
+                self.inline_caches[site] = (obj.struct_type, obj.struct_type.offsets[key])
+            return
+        if not isinstance(obj, dict):
+            raise TypeError(f"Cannot assign key in non-dict type {type(obj).__name__}")
+        obj[key] = value
+    
+    def _find_label(self, label):
+        """Find the index of a label in the instruction sequence"""
+        for i, instr in enumerate(self.instructions):
+            if instr.opcode == "LABEL" and instr.args[0] == label:
+                return i
+        raise ValueError(f"Label not found: {label}")
+        
+    def _get_var_name(self, var_idx):
+        """Get variable name from index, in this program's variables map"""
+        name = self.variable_names.get(var_idx)
+        return f"var{var_idx}" if name is None else name  # Fallback if name not found
+
+# Opcode -> BytecodeVM handler; CREATE_ARRAY and CREATE_DICT are the names
+# older bytecode uses for BUILD_LIST and BUILD_MAP
+DISPATCH = {name[len("_op_"):].upper(): handler for name, handler in vars(BytecodeVM).items()
+            if name.startswith("_op_") and name not in ("_op_adaptive", "_op_limited")}
+DISPATCH["CREATE_ARRAY"] = DISPATCH["BUILD_LIST"]
+DISPATCH["CREATE_DICT"] = DISPATCH["BUILD_MAP"]
+DISPATCH.update(dict.fromkeys(GENERIC_OPCODES, BytecodeVM._op_adaptive))
+DISPATCH.update(dict.fromkeys(UNLIMITED_OPCODES, BytecodeVM._op_limited))
@@ -1,20 +1,75 @@
 #!/bin/bash
 
 # Enhanced script to run files in our custom language
-# Usage: ./run.sh filename.txt [debug]
+# Usage: ./run.sh filename.txt [debug|typecheck|adaptive|profile|vmprofile|nocache|compile] [--interactive|--throughput] [--mem]
+#        ./run.sh filename.lbc [debug] [--interactive|--throughput] [--mem]
+#        ./run.sh serve   (start a compile server that later runs are sent to)
+#        ./run.sh batch *.txt [-j N] [--timeout SECONDS] ...   (run many programs in a worker pool)
 # Note: Type checking is optional (disabled by default for now)
+# Compiled bytecode is cached in $LUCENT_CACHE_DIR (default ~/.cache/lucent)
 
 COMPILER_DIR="/home/venkat/Desktop/Compilers"
+
+# Output mode: interactive (default) shows every line as soon as it is
+# printed; throughput collects output in a 64 KiB buffer that is written
+# out when full, before input() and when the program calls flush()
+OUTPUT_MODE="interactive"
+# --mem adds a memory report after the run (peak RSS, growth per opcode,
+# largest live arrays and dicts)
+MEM_ARGS=()
+ARGS=()
+for ARG in "$@"; do
+  case "$ARG" in
+    --interactive) OUTPUT_MODE="interactive" ;;
+    --throughput) OUTPUT_MODE="throughput" ;;
+    --mem) MEM_ARGS=(--mem) ;;
+    *) ARGS+=("$ARG") ;;
+  esac
+done
+set -- "${ARGS[@]}"
+
 CODE_FILE="$1"
 RUN_OPTION="$2"
 
+if [ "$OUTPUT_MODE" = "throughput" ]; then
+  export LUCENT_OUTPUT_BUFFER="${LUCENT_OUTPUT_BUFFER:-65536}"
+else
+  export LUCENT_OUTPUT_BUFFER=0
+fi
+
+# Start a persistent compile server; later runs are submitted to it
+if [ "$CODE_FILE" = "serve" ]; then
+  PYTHONPATH="$COMPILER_DIR" exec python3 -m main.server
+fi
+
+# Run many programs in a pool of warm worker processes (see --help)
+if [ "$CODE_FILE" = "batch" ]; then
+  shift
+  PYTHONPATH="$COMPILER_DIR" exec python3 -m main.batch "$@"
+fi
+
 # Check if a file argument was provided
 if [ -z "$CODE_FILE" ]; then
-  echo "Usage: $0 <source_file> [debug|typecheck]"
+  echo "Usage: $0 <source_file|bytecode.lbc> [debug|typecheck|adaptive|profile|vmprofile|nocache|compile] [--interactive|--throughput] [--mem]"
+  echo "       $0 serve"
+  echo "       $0 batch <program>... [-j N] [--timeout SECONDS] [--json results.json]"
   echo "Example: $0 euler.txt"
   echo "Options:"
   echo "  debug     - Enable VM debugging output"
   echo "  typecheck - Enable static type checking"
+  echo "  adaptive  - Specialise instructions at run time for the operand types seen"
+  echo "  profile   - Report time and hits per source line and per function"
+  echo "  vmprofile - Report opcode counts, hot instructions and time per function;"
+  echo "              write collapsed stacks for flame graphs to <source>.folded"
+  echo "  nocache   - Recompile even if a cached build exists"
+  echo "  compile   - Write precompiled bytecode to <source>.lbc instead of running"
+  echo "Output modes:"
+  echo "  --interactive - Show each line as soon as it is printed (default)"
+  echo "  --throughput  - Buffer output (\$LUCENT_OUTPUT_BUFFER characters, default 65536)"
+  echo "Memory:"
+  echo "  --mem         - Report peak RSS, memory growth per opcode and the largest live arrays and dicts"
+  echo "Resource limits (environment; exit status 3 when exceeded):"
+  echo "  LUCENT_MAX_INSTRUCTIONS, LUCENT_MAX_SECONDS, LUCENT_MAX_CALL_DEPTH, LUCENT_MAX_CONTAINER_SIZE"
   echo "Note: Type checking is currently disabled by default"
   exit 1
 fi
@@ -25,87 +80,21 @@ if [ ! -f "$CODE_FILE" ]; then
   exit 1
 fi
 
-# Create a wrapper Python script to handle execution more robustly
-cat > "$COMPILER_DIR/run_now.py" << EOF
-#!/usr/bin/env python3
-import sys
-import os
-from time import time
-from pathlib import Path
-
-# Make sure stdout is unbuffered for immediate output
-os.environ['PYTHONUNBUFFERED'] = '1'
-sys.stdout.reconfigure(line_buffering=True, write_through=True)
-
-# Add parent directory to path
-sys.path.append('${COMPILER_DIR}')
-
-# Import required components
-from main import parse, BytecodeCompiler, BytecodeVM, TypeChecker, TypeCheckError, compile_with_static_type_check
-
-def run_file(filename, option=None):
-    """Run a file with bytecode VM with reliable output flushing"""
-    try:
-        # Read the source code
-        with open(filename, 'r') as f:
-            code = f.read()
-        
-        print(f"Running {filename}...")
-        debug_mode = option == "debug"
-        typecheck_mode = option == "typecheck"
-        
-        if debug_mode:
-            print("Debug mode enabled")
-        
-        if typecheck_mode:
-            print("Type checking enabled")
-            # Run with type checking
-            try:
-                bytecode = compile_with_static_type_check(code)
-                print("Code type-checked successfully!")
-            except TypeCheckError as e:
-                print(f"Type Error: {e}")
-                return 1
-        else:
-            # Skip type checking - just parse and compile
-            ast = parse(code)
-            compiler = BytecodeCompiler()
-            bytecode = compiler.compile(ast)
-        
-        # Run the program
-        start_time = time()
-        vm = BytecodeVM(bytecode)
-        
-        # Set debugging mode for VM if requested
-        if debug_mode:
-            vm.debug = True
-        
-        result = vm.run()
-        end_time = time()
-        
-        # Print execution stats
-        if debug_mode:
-            print(f"\nExecution completed in {end_time - start_time:.4f} seconds")
-        
-        return 0
-    except Exception as e:
-        print(f"Error: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        return 1
-
-if __name__ == "__main__":
-    option = sys.argv[2] if len(sys.argv) > 2 else None
-    sys.exit(run_file(sys.argv[1], option))
-EOF
-
-# Make the wrapper script executable
-chmod +x "$COMPILER_DIR/run_now.py"
-
-# Run the program with Python unbuffered output
-PYTHONUNBUFFERED=1 python3 -u "$COMPILER_DIR/run_now.py" "$CODE_FILE" "$RUN_OPTION"
-
-# Clean up
-rm "$COMPILER_DIR/run_now.py"
+# Hand the program to the compile server when one is running; the client
+# exits with 75 if the server cannot be reached, so fall back to a local run.
+# Memory reports always run locally, since peak RSS is per process, and so
+# do programs reading a terminal, which the server cannot forward
+if [ ${#MEM_ARGS[@]} -eq 0 ] && [ ! -t 0 ] && [ -S "${LUCENT_SOCKET:-${XDG_RUNTIME_DIR:-${TMPDIR:-/tmp}}/lucent-$(id -u).sock}" ]; then
+  PYTHONPATH="$COMPILER_DIR" python3 -m main.client "$CODE_FILE" "$RUN_OPTION"
+  STATUS=$?
+  if [ $STATUS -ne 75 ]; then
+    exit $STATUS
+  fi
+fi
 
-exit $?
\ No newline at end of file
+# Run the program; interactive mode also keeps Python's own output unbuffered
+if [ "$OUTPUT_MODE" = "throughput" ]; then
+  PYTHONPATH="$COMPILER_DIR" python3 -m main.runner "$CODE_FILE" "$RUN_OPTION" "${MEM_ARGS[@]}"
+else
+  PYTHONUNBUFFERED=1 PYTHONPATH="$COMPILER_DIR" python3 -u -m main.runner "$CODE_FILE" "$RUN_OPTION" "${MEM_ARGS[@]}"
+fi
@@ -119,8 +119,12 @@ if __name__ == "__main__":
             run_tests()
         elif test_type == "all":
             run_all_tests()
+        elif test_type == "parallel":
+            # Every suite at once in worker processes (see tests/parallel_runner.py)
+            from tests.parallel_runner import main
+            sys.exit(main(sys.argv[2:]))
         else:
             print(f"Unknown test type: {test_type}")
-            print("Available test types: unit, bytecode, error, algorithm, euler, euler_bytecode, all")
+            print("Available test types: unit, bytecode, error, algorithm, euler, euler_bytecode, all, parallel")
     else:
         run_all_tests()
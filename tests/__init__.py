@@ -0,0 +1 @@
+"""Test suites for the Lucent compiler and VM"""
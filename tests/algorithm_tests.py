@@ -49,8 +49,8 @@ def nth_prime(n):
     
     return primes[-1]
 
-def run_algorithm_tests():
-    """Run various algorithm tests comparing with reference implementations"""
+def get_test_cases():
+    """Algorithm tests comparing e() with reference implementations"""
     tests = [
         ReferenceTest(
             name="Factorial",
@@ -204,6 +204,11 @@ def run_algorithm_tests():
     for test in tests:
         test.compile_to_bytecode = False
         
+    return tests
+
+def run_algorithm_tests():
+    """Run various algorithm tests comparing with reference implementations"""
+    tests = get_test_cases()
     runner = ReferenceTestRunner()
     for test in tests:
         runner.run_test(test)
@@ -3,7 +3,6 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from main import parse, BytecodeCompiler, BytecodeVM
-from tests.test_framework import capture_stdout 
 from io import StringIO
 
 def run_bytecode_test(code, expected_output=None, env=None):
@@ -29,9 +28,9 @@ def run_bytecode_test(code, expected_output=None, env=None):
     print(f"\nMax Stack Size: {bytecode['max_stack']}")
     
     # Run the bytecode
-    with capture_stdout() as stdout:
-        vm = BytecodeVM(bytecode)
-        vm.run()
+    stdout = StringIO()
+    vm = BytecodeVM(bytecode, stdout=stdout)
+    vm.run()
     
     actual_output = stdout.getvalue().strip()
     
@@ -3,7 +3,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from main import parse, BytecodeCompiler, BytecodeVM
-from tests.test_framework import capture_stdout
+from io import StringIO
 
 def test_basic_dict():
     print("\n===== Testing Basic Dictionary Operations =====")
@@ -89,9 +89,9 @@ def run_dict_test(code, expected_output):
             print(f"{i}: {repr(const)}")
         
         # Run the bytecode
-        with capture_stdout() as stdout:
-            vm = BytecodeVM(bytecode)
-            vm.run()
+        stdout = StringIO()
+        vm = BytecodeVM(bytecode, stdout=stdout)
+        vm.run()
         
         actual_output = stdout.getvalue().strip()
         print(f"\nExpected output: {expected_output}")
@@ -2,8 +2,9 @@ from tests.test_framework import TestCase, run_test_suite
 from main import TypeError, ParseError
 
 
-def run_tests():
-    test_cases = [
+def get_test_cases():
+    """Programs e() must reject, as TestCase objects"""
+    return [
          # Type Error Tests
         TestCase(
             name="Invalid Type in String Concat",
@@ -150,6 +151,9 @@ def run_tests():
             expected_error=TypeError
         ),
     ]
+
+def run_tests():
+    test_cases = get_test_cases()
     results = run_test_suite(test_cases)
     results.print_summary()
 
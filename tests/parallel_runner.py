@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Parallel runner for the whole test corpus.
+
+Discovers every test in tests/*.py and runs them in a pool of worker
+processes, each test with its output captured and a timeout:
+  * TestCase and ReferenceTest lists returned by a suite's get_test_cases()
+  * test_* functions of the assert-based suites (bytecode_tests, dict_tests)
+  * unittest test methods in the test_*.py files
+Results can be written as JUnit XML for CI or as JSON.
+
+Usage: python3 -m tests.parallel_runner [-j N] [--timeout SECONDS] [--filter TEXT]
+                                        [--junit results.xml] [--json results.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+import unittest
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout, redirect_stderr
+from dataclasses import dataclass, asdict
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main.output import program_output
+from tests.test_framework import run_test_case
+from tests.reference_tests import ReferenceTest, ReferenceTestRunner
+
+TESTS_DIR = ROOT / "tests"
+# Captured output kept per test in reports
+MAX_OUTPUT = 10000
+# Statuses that make the run fail
+FAILING = ("failed", "error", "timeout")
+
+@dataclass
+class Test:
+    """One discovered test: key locates it in its module (case index, function or unittest name)"""
+    # Not a test class itself, for pytest
+    __test__ = False
+
+    module: str
+    kind: str
+    key: object
+    name: str
+
+    @property
+    def id(self):
+        return f"{self.module}::{self.name}"
+
+class TestTimeout(BaseException):
+    """Raised by the timer; not an Exception, so suites catching errors cannot swallow it"""
+
+def _alarm(signum, frame):
+    raise TestTimeout()
+
+def _unittest_names(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _unittest_names(test)
+        else:
+            yield test.id().split(".", 2)[-1]
+
+def discover(tests_dir=TESTS_DIR):
+    """Every test in tests_dir, in file order; a module that fails to import is one erroring test"""
+    tests = []
+    for path in sorted(tests_dir.glob("*.py")):
+        module_name = path.stem
+        if module_name == Path(__file__).stem:
+            continue
+        try:
+            with redirect_stdout(StringIO()):
+                module = importlib.import_module(f"tests.{module_name}")
+        except Exception:
+            tests.append(Test(module_name, "import", None, "<import>"))
+            continue
+        if hasattr(module, "get_test_cases"):
+            seen = Counter()
+            for index, case in enumerate(module.get_test_cases()):
+                # Keep ids unique when a suite repeats a name
+                seen[case.name] += 1
+                name = case.name if seen[case.name] == 1 else f"{case.name} ({seen[case.name]})"
+                tests.append(Test(module_name, "case", index, name))
+        elif module_name.startswith("test_"):
+            for name in _unittest_names(unittest.defaultTestLoader.loadTestsFromModule(module)):
+                tests.append(Test(module_name, "unittest", name, name))
+        else:
+            for name, value in vars(module).items():
+                if name.startswith("test_") and callable(value) and getattr(value, "__module__", None) == module.__name__:
+                    tests.append(Test(module_name, "function", name, name))
+    return tests
+
+def _run_case(module, index):
+    case = module.get_test_cases()[index]
+    if isinstance(case, ReferenceTest):
+        results = ReferenceTestRunner(verbose=False).run_test(case)
+        failures = [f"input {value!r}: {result.error_message}" for value, result in results.items() if not result.success]
+        return ("failed", "\n".join(failures)) if failures else ("passed", "")
+    # Suites running cases another way (e.g. with the VM) provide their own run_test_case
+    passed, message = getattr(module, "run_test_case", run_test_case)(case)
+    return ("passed" if passed else "failed"), message
+
+def _run_function(module, name):
+    try:
+        getattr(module, name)()
+    except AssertionError as ex:
+        return "failed", f"AssertionError: {ex}"
+    return "passed", ""
+
+def _run_unittest(module, name):
+    result = unittest.TestResult()
+    unittest.defaultTestLoader.loadTestsFromName(name, module).run(result)
+    problems = result.failures + result.errors
+    if problems:
+        return ("failed" if result.failures else "error"), problems[-1][1]
+    if result.skipped:
+        return "skipped", result.skipped[0][1]
+    return "passed", ""
+
+_RUNNERS = {"case": _run_case, "function": _run_function, "unittest": _run_unittest}
+
+def run_test(test, timeout):
+    """Run one test in this process; returns its result entry"""
+    output = StringIO()
+    status, message = "error", ""
+    if timeout:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                module = importlib.import_module(f"tests.{test.module}")
+                if test.kind != "import":
+                    status, message = _RUNNERS[test.kind](module, test.key)
+            finally:
+                program_output.flush()
+    except TestTimeout:
+        status, message = "timeout", f"timed out after {timeout:g}s"
+    except Exception:
+        status, message = "error", traceback.format_exc()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    # unittest records an interrupted test as an error rather than letting TestTimeout out
+    if status == "error" and "TestTimeout" in message:
+        status, message = "timeout", f"timed out after {timeout:g}s"
+    entry = asdict(test)
+    entry.update(id=test.id, status=status, message=message, seconds=time.perf_counter() - start,
+                 output=output.getvalue()[-MAX_OUTPUT:])
+    return entry
+
+def run_tests(tests, jobs, timeout, progress=None):
+    """Run tests in a pool of jobs worker processes; results are in the order of tests"""
+    results = [None] * len(tests)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_test, test, timeout): index for index, test in enumerate(tests)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except BrokenProcessPool:
+                # A test killed its worker (e.g. os._exit); the pool cannot run anything else
+                entry = asdict(tests[index])
+                entry.update(id=tests[index].id, status="error", message="worker process died",
+                             seconds=0.0, output="")
+                results[index] = entry
+            if progress:
+                progress(results[index])
+    return results
+
+def write_junit(results, path, seconds):
+    """JUnit XML with one testsuite per module"""
+    root = ET.Element("testsuites", tests=str(len(results)), time=f"{seconds:.3f}")
+    suites = {}
+    for entry in results:
+        suite = suites.get(entry["module"])
+        if suite is None:
+            suite = suites[entry["module"]] = ET.SubElement(root, "testsuite", name=entry["module"])
+        case = ET.SubElement(suite, "testcase", classname=f"tests.{entry['module']}", name=entry["name"],
+                             time=f"{entry['seconds']:.3f}")
+        if entry["status"] == "failed":
+            ET.SubElement(case, "failure", message=entry["message"].split("\n")[0][:200]).text = entry["message"]
+        elif entry["status"] in ("error", "timeout"):
+            ET.SubElement(case, "error", type=entry["status"], message=entry["message"].split("\n")[0][:200]).text = entry["message"]
+        elif entry["status"] == "skipped":
+            ET.SubElement(case, "skipped", message=entry["message"])
+        if entry["output"]:
+            ET.SubElement(case, "system-out").text = entry["output"]
+    for suite in suites.values():
+        cases = suite.findall("testcase")
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(sum(case.find("failure") is not None for case in cases)))
+        suite.set("errors", str(sum(case.find("error") is not None for case in cases)))
+        suite.set("skipped", str(sum(case.find("skipped") is not None for case in cases)))
+        suite.set("time", f"{sum(float(case.get('time')) for case in cases):.3f}")
+    root.set("failures", str(sum(int(suite.get("failures")) for suite in suites.values())))
+    root.set("errors", str(sum(int(suite.get("errors")) for suite in suites.values())))
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+def print_report(results, seconds, jobs):
+    for entry in results:
+        if entry["status"] in FAILING:
+            print(f"\n{entry['status'].upper()}: {entry['id']} ({entry['seconds']:.2f}s)")
+            for line in entry["message"].strip().split("\n")[-15:]:
+                print(f"    {line}")
+    counts = Counter(entry["status"] for entry in results)
+    summary = ", ".join(f"{counts[status]} {status}" for status in ("passed", "failed", "error", "timeout", "skipped")
+                        if counts[status])
+    slowest = sorted(results, key=lambda entry: entry["seconds"], reverse=True)[:5]
+    print(f"\nSlowest: " + ", ".join(f"{entry['id']} {entry['seconds']:.2f}s" for entry in slowest))
+    print(f"{len(results)} tests in {seconds:.2f}s with {jobs} workers: {summary}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a test is abandoned (0 for none)")
+    parser.add_argument("--filter", default="", help="only tests whose id (module::name) contains this text")
+    parser.add_argument("--junit", help="write JUnit XML results to this file")
+    parser.add_argument("--json", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    tests = [test for test in discover() if args.filter in test.id]
+    if not tests:
+        print("No tests found")
+        return 1
+    start = time.perf_counter()
+
+    def progress(entry):
+        print("." if entry["status"] in ("passed", "skipped") else entry["status"][0].upper(), end="", flush=True)
+
+    results = run_tests(tests, max(args.jobs, 1), args.timeout, progress=progress)
+    seconds = time.perf_counter() - start
+    print()
+    print_report(results, seconds, args.jobs)
+    if args.junit:
+        write_junit(results, args.junit, seconds)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "python": sys.version.split()[0], "jobs": args.jobs, "timeout": args.timeout, "seconds": seconds,
+            "summary": dict(Counter(entry["status"] for entry in results)), "tests": results,
+        }, indent=2, default=repr) + "\n")
+    return 1 if any(entry["status"] in FAILING for entry in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,8 +50,8 @@ def euler6(n):
     square_of_sum = sum(range(1, n+1)) ** 2
     return square_of_sum - sum_of_squares
 
-def run_euler_tests():
-    """Run Project Euler problem tests with reference implementations"""
+def get_test_cases():
+    """Project Euler problems comparing e() with reference implementations"""
     tests = [
         ReferenceTest(
             name="Project Euler #1",
@@ -189,6 +189,11 @@ def run_euler_tests():
     for test in tests:
         test.compile_to_bytecode = False
         
+    return tests
+
+def run_euler_tests():
+    """Run Project Euler problem tests with reference implementations"""
+    tests = get_test_cases()
     runner = ReferenceTestRunner()
     for test in tests:
         runner.run_test(test)
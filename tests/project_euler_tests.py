@@ -2,7 +2,8 @@ from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
-from tests.test_framework import TestCase, capture_stdout
+from io import StringIO
+from tests.test_framework import TestCase
 from main import parse, BytecodeCompiler, BytecodeVM
 
 def run_bytecode_euler_test(code, expected_output=None):
@@ -21,9 +22,9 @@ def run_bytecode_euler_test(code, expected_output=None):
     
     # Run the bytecode
     print("\nExecuting bytecode...")
-    with capture_stdout() as stdout:
-        vm = BytecodeVM(bytecode)
-        vm.run()
+    stdout = StringIO()
+    vm = BytecodeVM(bytecode, stdout=stdout)
+    vm.run()
     
     actual_output = stdout.getvalue().strip()
     
@@ -50,8 +51,15 @@ def run_bytecode_euler_test(code, expected_output=None):
     
     return None
 
-def run_tests():
-    test_cases = [
+def run_test_case(test_case):
+    """Run one case with the bytecode VM; returns (passed, message) like test_framework.run_test_case"""
+    if run_bytecode_euler_test(test_case.code, test_case.expected_output):
+        return True, "Test passed successfully"
+    return False, "Output mismatch (see the captured output)"
+
+def get_test_cases():
+    """Project Euler problems for the bytecode VM, as TestCase objects"""
+    return [
         TestCase(
             name="Project Euler #1 - Multiples of 3 or 5",
             code="""
@@ -229,6 +237,9 @@ def run_tests():
             expected_output="Sum of primes below 20,000: 21171191"
         ),
     ]
+
+def run_tests():
+    test_cases = get_test_cases()
     
     # Use the bytecode VM for execution instead of normal run_test_suite
     print("\n=== Running Project Euler Problems with Bytecode VM ===")
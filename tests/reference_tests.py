@@ -3,7 +3,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from main import parse, e, BytecodeCompiler, BytecodeVM
-from tests.test_framework import capture_stdout
+from io import StringIO
 import inspect
 import time
 from dataclasses import dataclass
@@ -107,19 +107,19 @@ class ReferenceTestRunner:
             else:
                 env = [("input", test_case)]
             
-            with capture_stdout() as stdout:
-                lang_start = time.time()
-                if bytecode and test.compile_to_bytecode:
-                    # Bytecode execution
-                    vm = BytecodeVM(bytecode)
-                    vm.run(env=env)
-                else:
-                    # Interpreter execution - using the imported e function
-                    try:
-                        e(ast, env)
-                    except Exception as inner_ex:
-                        raise Exception(f"Error during execution: {type(inner_ex).__name__}: {str(inner_ex)}")
-                lang_end = time.time()
+            stdout = StringIO()
+            lang_start = time.time()
+            if bytecode and test.compile_to_bytecode:
+                # Bytecode execution
+                vm = BytecodeVM(bytecode, stdout=stdout)
+                vm.run(env=env)
+            else:
+                # Interpreter execution - using the imported e function
+                try:
+                    e(ast, env, stdout=stdout)
+                except Exception as inner_ex:
+                    raise Exception(f"Error during execution: {type(inner_ex).__name__}: {str(inner_ex)}")
+            lang_end = time.time()
             
             language_output = stdout.getvalue().strip()
             lang_time_ms = (lang_end - lang_start) * 1000
@@ -195,10 +195,9 @@ def is_prime(n):
         i += 6
     return True
 
-def run_example_tests():
-    """Run some example reference tests"""
-    # Define test cases
-    tests = [
+def get_test_cases():
+    """Example reference tests"""
+    return [
         ReferenceTest(
             name="Fibonacci",
             description="Calculate the nth Fibonacci number",
@@ -272,6 +271,10 @@ def run_example_tests():
             test_cases=[1, 2, 3, 4, 5, 13, 17, 20, 97, 100, 541]
         )
     ]
+
+def run_example_tests():
+    """Run some example reference tests"""
+    tests = get_test_cases()
     
     # Run the tests
     runner = ReferenceTestRunner()
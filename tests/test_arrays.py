@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test suite for flat typed storage of new int[] / bool[] arrays
+"""
+
+import gc
+import os
+import sys
+import unittest
+from array import array
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, TypedArray
+from main.arrays import ArraySlice, slice_array, detach_views
+
+
+PROGRAM = """
+int[][] g = new int[3][4];
+g[1][2] = 7;
+fun setFirst(r: int[]): int { r[0] = 5; return 0; }
+setFirst(g[1]);
+println(g);
+println(len(g) * 10 + len(g[0]));
+bool[] b = new bool[3];
+int one = 1;
+b[1] = one > 0;
+println(b[0] == b[1]);
+int[] a = new int[3];
+a[0] = 1;
+println(a + a);
+println(a[0:2]);
+println(g[1:3]);
+int[] expected = [1, 0, 0];
+println(a == expected);
+string[] s = new string[2];
+println(s);
+"""
+
+EXPECTED = """[[0, 0, 0, 0], [5, 0, 7, 0], [0, 0, 0, 0]]
+34
+False
+[1, 0, 0, 1, 0, 0]
+[1, 0]
+[[5, 0, 7, 0], [0, 0, 0, 0]]
+True
+['', '']
+"""
+
+
+class TestTypedArrays(unittest.TestCase):
+    """Test cases for arrays created with new T[...]"""
+
+    def run_vm(self, code):
+        """Helper returning (output, vm) after running code on the VM"""
+        vm = BytecodeVM(BytecodeCompiler().compile(parse(code)))
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        return output.getvalue(), vm
+
+    def test_vm_semantics(self):
+        output, vm = self.run_vm(PROGRAM)
+        self.assertEqual(output, EXPECTED)
+        grid = vm.globals["g"]
+        self.assertIsInstance(grid, TypedArray)
+        self.assertIsInstance(grid.data, array)
+        self.assertEqual(len(grid.data), 12)
+
+    def test_interpreter_semantics(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            e(parse(PROGRAM))
+        self.assertEqual(output.getvalue(), EXPECTED)
+
+    def test_bool_storage(self):
+        _, vm = self.run_vm("bool[][] seen = new bool[2][2]; int one = 1; seen[1][0] = one > 0;")
+        seen = vm.globals["seen"]
+        self.assertIsInstance(seen.data, bytearray)
+        self.assertIs(seen[1][0], True)
+        self.assertEqual(repr(seen), "[[False, False], [True, False]]")
+
+    def test_promotes_values_that_do_not_fit(self):
+        output, vm = self.run_vm("int[] xs = new int[2]; xs[0] = 9223372036854775807 * 4; xs[1] = 3; println(xs);")
+        self.assertEqual(output, "[36893488147419103228, 3]\n")
+        self.assertIsInstance(vm.globals["xs"].data, list)
+
+    def test_row_assignment_aliases(self):
+        # Assigning a row rebinds it, as with nested lists
+        output, _ = self.run_vm("int[][] g = new int[2][2]; g[0] = g[1]; g[0][0] = 5; println(g);")
+        self.assertEqual(output, "[[5, 0], [5, 0]]\n")
+        output, _ = self.run_vm("bool[][] b = new bool[2][2]; b[0] = b[1]; int one = 1; b[0][1] = one > 0; println(b);")
+        self.assertEqual(output, "[[False, True], [False, True]]\n")
+        grid = TypedArray(array("q", [0]) * 4, (2, 2))
+        old_row = grid[0]
+        new_row = [1, 2]
+        grid[0] = new_row
+        self.assertIs(grid[0], new_row)
+        # A view of the old row no longer belongs to grid
+        old_row[1] = 4
+        self.assertEqual(grid, [[1, 2], [0, 0]])
+        self.assertEqual(old_row, [0, 4])
+
+    def test_jagged_row_assignment(self):
+        output, _ = self.run_vm("int[][] jag = new int[2][2]; jag[1] = [1, 2, 3]; println(jag); println(len(jag[1]));")
+        self.assertEqual(output, "[[0, 0], [1, 2, 3]]\n3\n")
+        cube = TypedArray(array("q", [0]) * 8, (2, 2, 2))
+        plane = cube[0]
+        cube[0][1] = [5]
+        cube[0] = [[7]]
+        self.assertEqual(repr(cube), "[[[7]], [[0, 0], [0, 0]]]")
+        self.assertEqual(repr(plane), "[[0, 0], [5]]")
+
+    def test_slice_rows_can_be_rebound(self):
+        # Slicing rows gives a new list: rebinding its slots leaves the array alone, writing a row does not
+        output, _ = self.run_vm("int[][] g = new int[3][2]; int[][] s = g[0:2]; s[0] = [9]; s[1][1] = 3; println(g); println(s);")
+        self.assertEqual(output, "[[0, 0], [0, 3], [0, 0]]\n[[9], [0, 3]]\n")
+
+    def test_bounds(self):
+        with self.assertRaises(IndexError):
+            self.run_vm("int[][] g = new int[2][2]; println(g[1][2]);")
+
+
+SLICES = """
+int[] xs = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19];
+fun second(a: int[]): int { return a[1]; }
+fun bump(a: int[]): int { a[0] = a[0] + 100; return a[0]; }
+println(second(xs[2:18]));
+println(bump(xs[2:20]));
+println(xs[2]);
+fun mid(a: int[]): int { return second(a[1:len(a)]); }
+println(mid(xs[0:20]));
+xs[2] = 50;
+println(xs[0:18][2]);
+"""
+
+
+class TestArraySlices(unittest.TestCase):
+    """Test cases for slices taken as views over lists"""
+
+    run_vm = TestTypedArrays.run_vm
+
+    def test_same_results_as_copies(self):
+        expected = "3\n102\n2\n2\n50\n"
+        output = StringIO()
+        with redirect_stdout(output):
+            BytecodeVM(BytecodeCompiler().compile(parse(SLICES))).run()
+        self.assertEqual(output.getvalue(), expected)
+        output = StringIO()
+        with redirect_stdout(output):
+            e(parse(SLICES))
+        self.assertEqual(output.getvalue(), expected)
+
+    def test_slice_is_a_view(self):
+        _, vm = self.run_vm("int[] xs = [" + ", ".join(map(str, range(40))) + "]; int[] ys = xs[5:30];")
+        xs, ys = vm.globals["xs"], vm.globals["ys"]
+        self.assertIsInstance(ys, ArraySlice)
+        self.assertIs(ys.base, xs)
+        self.assertIn(id(xs), vm.live_views)
+        self.assertEqual(ys[0:3], [5, 6, 7])
+        # Short slices, and slices taken without a registry, are simply copied
+        self.assertIsInstance(slice_array(xs, 0, 3, vm.live_views), list)
+        self.assertIsInstance(slice_array(xs, 0, 30), list)
+
+    def test_copy_on_write(self):
+        base, views = list(range(40)), {}
+        first = slice_array(base, 0, 30, views)
+        nested = first[10:30]
+        first[10] = -1
+        self.assertEqual(base[10], 10)
+        self.assertEqual(nested[0], 10)
+        detach_views(base, views)
+        base[11] = -2
+        self.assertEqual((first[11], nested[1]), (11, 11))
+        self.assertEqual(first + [1], list(range(30)[:10]) + [-1] + list(range(11, 30)) + [1])
+
+    def test_registry_drains(self):
+        base, live_views = list(range(40)), {}
+        views = [slice_array(base, i, 40, live_views) for i in range(5)]
+        self.assertIn(id(base), live_views)
+        del views
+        gc.collect()
+        self.assertNotIn(id(base), live_views)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test suite for the batch runner (BatchRunner, run_batch and python3 -m main.batch)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import BatchRunner, ResourceLimits, run_batch, save_bytecode, parse, BytecodeCompiler
+from main.batch import run_program, main as batch_main
+
+
+PROGRAMS = {
+    "hello.txt": 'println("hello");\n',
+    "square.txt": 'fun sq(n: int): int { return n * n; }\nprintln(sq(12));\n',
+    "echo.txt": 'string line = input();\nprintln(line ++ "!");\n',
+    "divide.txt": 'int x = 1 / 0;\nprintln(x);\n',
+    "spin.txt": 'int i = 0;\nwhile (i < 1) { i = i * 1; }\n',
+    "count.txt": 'int i = 0;\nwhile (i < 1000) { i = i + 1; }\nprintln(i);\n',
+}
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for running many programs in a pool of worker processes"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.paths = {}
+        for name, code in PROGRAMS.items():
+            self.paths[name] = os.path.join(self.tmp.name, name)
+            with open(self.paths[name], "w") as f:
+                f.write(code)
+
+    def test_run_program(self):
+        result = run_program(self.paths["echo.txt"], timeout=10, stdin="hi\n", cache=False)
+        self.assertEqual((result.status, result.output), ("ok", "hi!\n"))
+        result = run_program(self.paths["divide.txt"], timeout=10, cache=False)
+        self.assertEqual(result.status, "error")
+        self.assertIn("ZeroDivisionError", result.error)
+        # The VM's state dump is part of the program's output
+        self.assertIn("VM Error", result.output)
+        # The type checker's messages are kept apart from the output
+        result = run_program(self.paths["hello.txt"], cache=False, typecheck=True)
+        self.assertEqual((result.status, result.output), ("ok", "hello\n"))
+        self.assertIn("Static type check passed", result.log)
+        result = run_program(os.path.join(self.tmp.name, "missing.txt"))
+        self.assertEqual(result.status, "error")
+        self.assertIn("FileNotFoundError", result.error)
+
+    def test_timeout_and_limits(self):
+        result = run_program(self.paths["spin.txt"], timeout=0.2, cache=False)
+        self.assertEqual(result.status, "timeout")
+        self.assertLess(result.seconds, 5)
+        result = run_program(self.paths["count.txt"], limits=ResourceLimits(instructions=100), cache=False)
+        self.assertEqual(result.status, "limit")
+        self.assertIn("instructions limit of 100 exceeded", result.error)
+
+    def test_pool_keeps_order(self):
+        lbc_path = os.path.join(self.tmp.name, "count.lbc")
+        save_bytecode(BytecodeCompiler().compile(parse(PROGRAMS["count.txt"])), lbc_path)
+        names = ["hello.txt", "divide.txt", "square.txt", "spin.txt", "echo.txt", "count.txt"]
+        paths = [self.paths[name] for name in names] + [lbc_path]
+        seen = []
+        with BatchRunner(jobs=2, timeout=0.5, stdin="batch\n", limits=ResourceLimits(), cache=False) as runner:
+            results = runner.run(paths, progress=seen.append)
+            # The workers are reused for the next batch
+            pool = runner.pool
+            again = runner.run([self.paths["hello.txt"]])
+            self.assertIs(runner.pool, pool)
+        self.assertEqual([result.path for result in results], paths)
+        self.assertEqual([result.status for result in results], ["ok", "error", "ok", "timeout", "ok", "ok", "ok"])
+        self.assertEqual([results[i].output for i in (0, 2, 4, 5, 6)], ["hello\n", "144\n", "batch!\n", "1000\n", "1000\n"])
+        self.assertEqual(len(seen), len(paths))
+        self.assertEqual(again[0].output, "hello\n")
+        self.assertEqual(run_batch([self.paths["square.txt"]], jobs=1, cache=False)[0].output, "144\n")
+
+    def test_cli(self):
+        results, outputs = os.path.join(self.tmp.name, "results.json"), os.path.join(self.tmp.name, "out")
+        output = StringIO()
+        with redirect_stdout(output):
+            status = batch_main([self.paths["hello.txt"], self.paths["divide.txt"], "-j", "2", "--nocache",
+                                 "--json", results, "--output-dir", outputs])
+        self.assertEqual(status, 1)
+        self.assertIn("ERROR: " + self.paths["divide.txt"], output.getvalue())
+        self.assertIn("2 programs in", output.getvalue())
+        data = json.loads(open(results).read())
+        self.assertEqual(data["summary"]["statuses"], {"ok": 1, "error": 1})
+        self.assertEqual(data["programs"][0]["output"], "hello\n")
+        with open(os.path.join(outputs, "hello.txt.out")) as f:
+            self.assertEqual(f.read(), "hello\n")
+        with redirect_stdout(StringIO()):
+            self.assertEqual(batch_main([self.paths["hello.txt"], self.paths["square.txt"], "--nocache"]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
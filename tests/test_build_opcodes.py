@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test suite for the BUILD_* instructions that construct array and dict literals
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, BytecodeInstruction, save_bytecode, load_bytecode
+
+
+class TestBuildOpcodes(unittest.TestCase):
+    """Test cases for literal construction in the VM"""
+
+    def compile(self, code):
+        return BytecodeCompiler().compile(parse(code))
+
+    def run_bytecode(self, bytecode):
+        output = StringIO()
+        with redirect_stdout(output):
+            BytecodeVM(bytecode).run()
+        return output.getvalue()
+
+    def opcodes(self, bytecode):
+        return [instr.opcode for instr in bytecode['instructions']]
+
+    def test_constant_literal_is_fresh_each_time(self):
+        bytecode = self.compile("""
+        int i = 0;
+        while (i < 2) {
+            int[] xs = [1, 2, 3];
+            xs[0] = xs[0] + 10;
+            println(xs);
+            i = i + 1;
+        }
+        """)
+        self.assertIn("BUILD_CONST_LIST", self.opcodes(bytecode))
+        self.assertEqual(self.run_bytecode(bytecode), "[11, 2, 3]\n[11, 2, 3]\n")
+
+    def test_nested_and_computed_elements(self):
+        bytecode = self.compile('int k = 2; int[][] g = [[1, 2], [k, k * k]]; string[] s = ["a", "b"]; println(g); println(s);')
+        self.assertIn("BUILD_LIST", self.opcodes(bytecode))
+        self.assertEqual(self.run_bytecode(bytecode), "[[1, 2], [2, 4]]\n['a', 'b']\n")
+
+    def test_dict_order_unchanged(self):
+        bytecode = self.compile('dict d = {"a": 1, "b": 2, "a": 3}; println(d);')
+        self.assertIn("BUILD_MAP", self.opcodes(bytecode))
+        self.assertEqual(self.run_bytecode(bytecode), "{'a': 1, 'b': 2}\n")
+
+    def test_empty_literals(self):
+        self.assertEqual(self.run_bytecode(self.compile('int[] xs = []; dict d = {}; println(len(xs)); println(d);')),
+                         "0\n{}\n")
+
+    def test_legacy_opcodes(self):
+        # Bytecode from before BUILD_* still runs
+        bytecode = self.compile("println(0);")
+        bytecode['constants'] = [1, 2, "k"]
+        bytecode['instructions'] = [
+            BytecodeInstruction("LOAD_CONST", [0]), BytecodeInstruction("LOAD_CONST", [1]),
+            BytecodeInstruction("CREATE_ARRAY", [2]), BytecodeInstruction("PRINT", []),
+            BytecodeInstruction("LOAD_CONST", [2]), BytecodeInstruction("LOAD_CONST", [0]),
+            BytecodeInstruction("CREATE_DICT", [1]), BytecodeInstruction("PRINT", []),
+        ]
+        self.assertEqual(self.run_bytecode(bytecode), "[1, 2]\n{'k': 1}\n")
+
+    def test_lbc_round_trip(self):
+        bytecode = self.compile('string[] s = ["x", "y"]; println(s);')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prog.lbc")
+            save_bytecode(bytecode, path)
+            self.assertEqual(self.run_bytecode(load_bytecode(path)), "['x', 'y']\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test suite for the bulk input builtins readAll(), readLines() and readInts()
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, TypeChecker, TypeCheckError, TypedArray
+from main.input import read_ints
+
+
+PROGRAM = """
+int[] xs = readInts(path);
+int total = 0;
+int i = 0;
+while (i < len(xs)) { total = total + xs[i]; i = i + 1; }
+println(total);
+string[] lines = readLines(path);
+println(lines[1]);
+string rest = readAll();
+println(len(rest));
+"""
+
+
+class TestBulkInput(unittest.TestCase):
+    """Test cases for reading stdin or a file in one call"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(handle, "w") as f:
+            f.write("3 4\n5  6\n")
+        self.code = f'string path = "{self.path}";' + PROGRAM
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def run_program(self, run):
+        output = StringIO()
+        with redirect_stdout(output), mock.patch("sys.stdin", StringIO("one\ntwo\n")):
+            run()
+        return output.getvalue()
+
+    def test_vm(self):
+        bytecode = BytecodeCompiler().compile(parse(self.code))
+        self.assertEqual(self.run_program(lambda: BytecodeVM(bytecode).run()), "18\n5  6\n8\n")
+
+    def test_interpreter(self):
+        self.assertEqual(self.run_program(lambda: e(parse(self.code))), "18\n5  6\n8\n")
+
+    def test_type_check(self):
+        self.assertTrue(TypeChecker().check(parse(self.code)))
+        with self.assertRaisesRegex(TypeCheckError, "readInts path must be a string"):
+            TypeChecker().check(parse("int[] xs = readInts(5);"))
+
+    def test_read_ints_storage(self):
+        xs = read_ints(self.path)
+        self.assertIsInstance(xs, TypedArray)
+        self.assertEqual(xs, [3, 4, 5, 6])
+        with mock.patch("sys.stdin", StringIO("1 99999999999999999999999")):
+            self.assertEqual(read_ints(), [1, 99999999999999999999999])
+
+    def test_read_ints_rejects_words(self):
+        with mock.patch("sys.stdin", StringIO("1 2 x3")):
+            with self.assertRaisesRegex(ValueError, "'x3' is not an integer"):
+                read_ints()
+
+    def test_user_definitions_take_precedence(self):
+        """A program's own function or variable named like a builtin is the one it uses"""
+        cases = [
+            ("fun readLines(n: int): int { return n; } println(readLines(3));", "3\n"),
+            ('string readAll = "mine"; println(readAll);', "mine\n"),
+            ("int readInts = 7; int[] xs = [1, 2, 3]; int[] ys = xs[1:readInts]; println(len(ys));", "2\n"),
+        ]
+        for code, expected in cases:
+            with self.subTest(code=code):
+                self.assertTrue(TypeChecker().check(parse(code)))
+                bytecode = BytecodeCompiler().compile(parse(code))
+                self.assertEqual(self.run_program(lambda: BytecodeVM(bytecode).run()), expected)
+                self.assertEqual(self.run_program(lambda: e(parse(code))), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test suite for the serialized bytecode file format (.lbc)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import (parse, BytecodeCompiler, BytecodeVM, BytecodeFormatError,
+                  encode_bytecode, decode_bytecode, save_bytecode, load_bytecode)
+
+
+class TestBytecodeFormat(unittest.TestCase):
+    """Test cases for saving and loading compiled bytecode"""
+
+    def compile(self, code):
+        return BytecodeCompiler().compile(parse(code))
+
+    def run_bytecode(self, bytecode):
+        """Helper to capture stdout when running bytecode"""
+        old_stdout = sys.stdout
+        captured_output = StringIO()
+        sys.stdout = captured_output
+
+        try:
+            BytecodeVM(bytecode).run()
+            return captured_output.getvalue().strip()
+        finally:
+            sys.stdout = old_stdout
+
+    def test_round_trip(self):
+        """Decoding an encoded program gives back identical bytecode"""
+        code = """
+        fun fact(n: int): int {
+            if (n <= 1) {
+                return 1;
+            }
+            return n * fact(n - 1);
+        }
+        dict d = {"neg": 0 - 42, "big": 123456789012345678901234567890};
+        println(fact(5));
+        println(d{"neg"});
+        """
+        bytecode = self.compile(code)
+        self.assertEqual(decode_bytecode(encode_bytecode(bytecode)), bytecode)
+
+    def test_save_and_load(self):
+        """A saved .lbc file runs with the same output as the source program"""
+        code = """
+        int[] arr = [3, 1, 2];
+        string s = "héllo";
+        println(arr[0] + len(s));
+        """
+        expected = self.run_bytecode(self.compile(code))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.lbc")
+            save_bytecode(self.compile(code), path)
+            self.assertEqual(self.run_bytecode(load_bytecode(path)), expected)
+
+    def test_checksum_mismatch(self):
+        """A flipped byte in the payload is detected"""
+        data = bytearray(encode_bytecode(self.compile("println(1 + 2);")))
+        data[12] ^= 0xFF
+        with self.assertRaises(BytecodeFormatError):
+            decode_bytecode(bytes(data))
+
+    def test_rejects_other_formats(self):
+        """Truncated files, foreign files and other versions are rejected"""
+        data = encode_bytecode(self.compile("println(1);"))
+        with self.assertRaises(BytecodeFormatError):
+            decode_bytecode(data[:-3])
+        with self.assertRaises(BytecodeFormatError):
+            decode_bytecode(b"\x80\x04not bytecode")
+        with self.assertRaises(BytecodeFormatError):
+            decode_bytecode(data[:4] + b"\xff\xff" + data[6:])
+
+
+if __name__ == "__main__":
+    unittest.main()
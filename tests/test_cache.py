@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test suite for the on-disk bytecode cache
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import BytecodeCache, BytecodeVM, compile_cached
+
+
+class TestBytecodeCache(unittest.TestCase):
+    """Test cases for the bytecode cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = BytecodeCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_bytecode(self, bytecode):
+        """Helper to capture stdout when running bytecode"""
+        old_stdout = sys.stdout
+        captured_output = StringIO()
+        sys.stdout = captured_output
+
+        try:
+            BytecodeVM(bytecode).run()
+            return captured_output.getvalue().strip()
+        finally:
+            sys.stdout = old_stdout
+
+    def test_hit_after_compile(self):
+        """A second compile of the same source is served from the cache"""
+        code = """
+        int x = 5;
+        println(x * 3);
+        """
+        key = self.cache.key(code, "plain")
+        self.assertIsNone(self.cache.get(key))
+
+        first = compile_cached(code, cache=self.cache)
+        self.assertIsNotNone(self.cache.get(key))
+
+        second = compile_cached(code, cache=self.cache)
+        self.assertEqual(self.run_bytecode(first), "15")
+        self.assertEqual(self.run_bytecode(second), "15")
+
+    def test_key_depends_on_source_and_mode(self):
+        """Different sources and compile modes never share an entry"""
+        self.assertNotEqual(self.cache.key("println(1);"), self.cache.key("println(2);"))
+        self.assertNotEqual(self.cache.key("println(1);", "plain"),
+                            self.cache.key("println(1);", "typecheck"))
+
+    def test_corrupt_entry_is_dropped(self):
+        """A damaged entry is treated as a miss and removed"""
+        code = "println(1);"
+        key = self.cache.key(code, "plain")
+        compile_cached(code, cache=self.cache)
+        path = self.cache._path(key)
+        path.write_bytes(b"not bytecode")
+
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(path.exists())
+
+    def test_unserializable_bytecode_is_not_cached(self):
+        """Bytecode the .lbc format cannot hold is skipped rather than failing the put"""
+        key = self.cache.key("println(1);", "plain")
+        bytecode = compile_cached("println(1);", cache=BytecodeCache(os.path.join(self.tmp.name, "other")))
+        bytecode["constants"].append(object())
+        self.cache.put(key, bytecode)
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(list(self.cache.cache_dir.glob("*.lbc")), [])
+
+    def test_lru_eviction(self):
+        """Old entries are evicted once the cache exceeds its size limit"""
+        compile_cached("println(1);", cache=self.cache)
+        entry_size = next(self.cache.cache_dir.glob("*.lbc")).stat().st_size
+        self.cache.max_bytes = entry_size * 2
+
+        keys = []
+        for i in range(4):
+            code = f"println({i + 10});"
+            keys.append(self.cache.key(code, "plain"))
+            compile_cached(code, cache=self.cache)
+            # Give each entry a distinct access time
+            os.utime(self.cache._path(keys[-1]), (i + 1, i + 1))
+            self.cache._evict()
+
+        self.assertIsNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
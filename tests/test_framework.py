@@ -46,7 +46,10 @@ class TestResult:
 
 @contextmanager
 def capture_stdout():
-    """Capture stdout for testing"""
+    """
+    Capture stdout for testing. This swaps sys.stdout for the whole process;
+    to capture one program's output, pass stdout= to e() or BytecodeVM instead
+    """
     old_stdout = sys.stdout
     stdout = StringIO()
     sys.stdout = stdout
@@ -58,8 +61,8 @@ def capture_stdout():
 def run_test_case(test_case: TestCase) -> tuple[bool, str]:
     """Run a single test case and return (passed, message)"""
     try:
-        with capture_stdout() as output:
-            e(parse(test_case.code), test_case.env)
+        output = StringIO()
+        e(parse(test_case.code), test_case.env, stdout=output)
         actual_output = output.getvalue().strip()
 
         # If we have expected output, verify it matches
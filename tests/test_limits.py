@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test suite for resource limits (ResourceLimits and ResourceLimitExceeded)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, ResourceLimits, ResourceLimitExceeded
+from main.runner import main as runner_main
+
+
+LOOP = """
+int i = 0;
+while (i < 1000) {
+    i = i + 1;
+}
+println(i);
+"""
+
+RECURSION = """
+fun down(n: int): int {
+    if (n == 0) {
+        return 0;
+    } else {
+        return down(n - 1) + 1;
+    }
+}
+println(down(50));
+"""
+
+
+class TestResourceLimits(unittest.TestCase):
+    """Test cases for limits enforced by BytecodeVM"""
+
+    def run_program(self, code, limits, adaptive=False):
+        vm = BytecodeVM(BytecodeCompiler().compile(parse(code)), adaptive=adaptive, limits=limits)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        return vm, output.getvalue()
+
+    def assertExceeds(self, code, limits, limit):
+        with self.assertRaises(ResourceLimitExceeded) as caught:
+            self.run_program(code, limits)
+        self.assertEqual(caught.exception.limit, limit)
+        return caught.exception
+
+    def test_within_limits(self):
+        vm, output = self.run_program(LOOP, ResourceLimits(instructions=100000, call_depth=10, container_size=10))
+        self.assertEqual(output, "1000\n")
+        # Every loop iteration runs at least its condition, body and jump
+        self.assertGreater(vm.instruction_count, 5000)
+        _, output = self.run_program(RECURSION, ResourceLimits(call_depth=51))
+        self.assertEqual(output, "50\n")
+
+    def test_instruction_budget(self):
+        error = self.assertExceeds(LOOP, ResourceLimits(instructions=1000), "instructions")
+        self.assertEqual(error.maximum, 1000)
+        self.assertGreater(error.used, 1000)
+        # Infinite recursion is also caught by the budget, at calls
+        self.assertExceeds("fun f(n: int): int { return f(n + 1); }\nf(0);",
+                           ResourceLimits(instructions=500), "instructions")
+
+    def test_timeout(self):
+        error = self.assertExceeds("int i = 0;\nwhile (i < 1) { i = i * 1; }\n",
+                                   ResourceLimits(seconds=0.05), "seconds")
+        self.assertIn("seconds limit of 0.05 exceeded", str(error))
+
+    def test_call_depth(self):
+        error = self.assertExceeds(RECURSION, ResourceLimits(call_depth=20), "call_depth")
+        self.assertEqual(error.used, 21)
+
+    def test_container_size(self):
+        self.assertExceeds("int[][] grid = new int[1000][1000];", ResourceLimits(container_size=10000), "container_size")
+        self.assertExceeds('string s = "ab";\nint i = 0;\nwhile (i < 20) { s = s ++ s; i = i + 1; }',
+                           ResourceLimits(container_size=1000), "container_size")
+        self.assertExceeds('println("ab" * 1000);', ResourceLimits(container_size=1000), "container_size")
+        self.assertExceeds('dict d = {"a": 1};\nint i = 0;\nwhile (i < 100) { d{str(i)} = i; i = i + 1; }',
+                           ResourceLimits(container_size=50), "container_size")
+        # Replacing an existing key does not grow the dict
+        _, output = self.run_program('dict d = {"a": 1};\nint i = 0;\nwhile (i < 100) { d{"a"} = i; i = i + 1; }\nprintln(d{"a"});',
+                                     ResourceLimits(container_size=1))
+        self.assertEqual(output, "99\n")
+
+    def test_adaptive(self):
+        _, output = self.run_program(LOOP, ResourceLimits(container_size=10), adaptive=True)
+        self.assertEqual(output, "1000\n")
+        with self.assertRaises(ResourceLimitExceeded):
+            self.run_program('string s = "ab";\nint i = 0;\nwhile (i < 20) { s = s + s; i = i + 1; }',
+                             ResourceLimits(container_size=1000), adaptive=True)
+
+    def test_unlimited_shares_bytecode(self):
+        bytecode = BytecodeCompiler().compile(parse(LOOP))
+        self.assertIs(BytecodeVM(bytecode, limits=ResourceLimits()).instructions, bytecode['instructions'])
+        self.assertIsNone(BytecodeVM(bytecode, limits=ResourceLimits()).limits)
+
+    def test_from_env(self):
+        limits = ResourceLimits.from_env({"LUCENT_MAX_INSTRUCTIONS": "500", "LUCENT_MAX_SECONDS": "1.5",
+                                          "LUCENT_MAX_CALL_DEPTH": "0", "LUCENT_MAX_CONTAINER_SIZE": "lots"})
+        self.assertEqual((limits.instructions, limits.seconds, limits.call_depth, limits.container_size),
+                         (500, 1.5, None, None))
+        self.assertTrue(limits)
+        self.assertFalse(ResourceLimits.from_env({}))
+
+    def test_runner(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.txt")
+            with open(path, "w") as f:
+                f.write(LOOP)
+            output = StringIO()
+            with mock.patch.dict(os.environ, {"LUCENT_MAX_INSTRUCTIONS": "100"}), redirect_stdout(output):
+                self.assertEqual(runner_main([path, "nocache"]), 3)
+        self.assertIn("Resource limit exceeded: instructions limit of 100 exceeded", output.getvalue())
+        self.assertNotIn("Traceback", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test suite for the source line table and the line profiler
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, LineProfiler, lex
+
+
+PROGRAM = """fun inner(n: int): int {
+    int s = 0;
+    int i = 0;
+    while (i < n) {
+        s = s + i;
+        i = i + 1;
+    }
+    return s;
+}
+int t = 0;
+int j = 0;
+while (j < 3) { t = t + inner(4); j = j + 1; }
+println(t);
+"""
+
+
+class TestLineProfiler(unittest.TestCase):
+    """Test cases for line numbers in bytecode and LineProfiler"""
+
+    def profile(self, code=PROGRAM):
+        bytecode = BytecodeCompiler().compile(parse(code))
+        vm = BytecodeVM(bytecode)
+        profiler = LineProfiler(vm, bytecode['lines'], code)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        profiler.stop()
+        return profiler, output.getvalue()
+
+    def test_tokens_carry_lines(self):
+        tokens = list(lex("int a = 1;\n\nprintln(\n  a);"))
+        self.assertEqual([t.line for t in tokens][:5], [1, 1, 1, 1, 1])
+        self.assertEqual(tokens[-2].line, 4)
+
+    def test_line_table(self):
+        bytecode = BytecodeCompiler().compile(parse(PROGRAM))
+        lines = bytecode['lines']
+        self.assertEqual(len(lines), len(bytecode['instructions']))
+        by_opcode = {}
+        for instr, line in zip(bytecode['instructions'], lines):
+            by_opcode.setdefault(instr.opcode, set()).add(line)
+        self.assertEqual(by_opcode["PRINT"], {13})
+        self.assertEqual(by_opcode["CALL_FUNCTION"], {12})
+        # The implicit return at the end of a function belongs to its header
+        self.assertEqual(by_opcode["RETURN_VALUE"], {1, 8})
+
+    def test_hits(self):
+        profiler, output = self.profile()
+        self.assertEqual(output, "18\n")
+        hits = profiler.line_hits
+        # Loop conditions run once more than their bodies; calls return
+        # to line 12 without counting another hit
+        self.assertEqual([hits[n] for n in (2, 4, 5, 6, 8, 12, 13)], [3, 15, 12, 12, 3, 4, 1])
+        self.assertNotIn(7, hits)
+
+    def test_single_line_loop(self):
+        profiler, _ = self.profile("int i = 0;\nwhile (i < 5) { i = i + 1; }\nprintln(i);\n")
+        self.assertEqual([profiler.line_hits[n] for n in (1, 2, 3)], [1, 6, 1])
+
+    def test_call_time_included(self):
+        profiler, _ = self.profile()
+        # Line 1 also defines the function, outside any call
+        callee_time = sum(profiler.line_times[n] for n in range(2, 9))
+        self.assertGreaterEqual(profiler.callee_times[12], callee_time)
+        self.assertEqual(profiler.callee_times[13], 0)
+
+    def test_report(self):
+        profiler, _ = self.profile()
+        report = profiler.report()
+        self.assertIn("inner", report)
+        listing = report.splitlines()
+        header = next(i for i, line in enumerate(listing) if line.startswith("Line #"))
+        rows = listing[header + 2:]
+        self.assertEqual(len(rows), 13)
+        self.assertTrue(rows[4].endswith("        s = s + i;"))
+        self.assertEqual(rows[4].split()[:2], ["5", "12"])
+        self.assertEqual(rows[6].split(), ["7", "}"])
+
+    def test_requires_line_table(self):
+        bytecode = BytecodeCompiler().compile(parse("println(1);"))
+        with self.assertRaises(ValueError):
+            LineProfiler(BytecodeVM(bytecode), [None] * len(bytecode['instructions']))
+
+
+if __name__ == '__main__':
+    unittest.main()
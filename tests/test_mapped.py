@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test suite for memory-mapped files (openMapped and the mapped* builtins)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, TypeChecker, TypeCheckError, MappedFile, TypeError
+from main.interpreter import RuntimeContext
+from main.mapped import open_mapped
+
+
+PROGRAM = """
+file f = openMapped(path);
+println(len(f));
+println(f[0]);
+file head = f[0:5];
+println(str(head));
+int n = mappedLineCount(f);
+println(n);
+println(mappedLine(f, 3));
+println(mappedLine(f, 0));
+int count = 0;
+int at = mappedFind(f, "error", 0);
+while (at >= 0) { count = count + 1; at = mappedFind(f, "error", at + 1); }
+println(count);
+fun size(m: file): int { return len(m); }
+println(size(f[12:30]));
+"""
+
+EXPECTED = "38\n97\nalpha\n4\nerror: net\nalpha beta\n2\n18\n"
+
+
+class TestMappedFiles(unittest.TestCase):
+    """Test cases for reading files through mmap"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(handle, "wb") as f:
+            f.write(b"alpha beta\r\nerror: disk\nok\nerror: net\n")
+        self.code = f'string path = "{self.path}";' + PROGRAM
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_vm(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            BytecodeVM(BytecodeCompiler().compile(parse(self.code))).run()
+        self.assertEqual(output.getvalue(), EXPECTED)
+
+    def test_interpreter(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            e(parse(self.code))
+        self.assertEqual(output.getvalue(), EXPECTED)
+
+    def test_type_check(self):
+        self.assertTrue(TypeChecker().check(parse(self.code)))
+        with self.assertRaisesRegex(TypeCheckError, "expects file, got string"):
+            TypeChecker().check(parse('int n = mappedLineCount("x");'))
+
+    def test_slices_share_the_mapping(self):
+        f = open_mapped(self.path)
+        tail = f[12:][7:]
+        self.assertIsInstance(tail, MappedFile)
+        self.assertIs(tail.mapping, f.mapping)
+        self.assertEqual(str(tail[0:4]), "disk")
+        self.assertEqual(tail.find("error"), 8)
+        self.assertEqual(tail.line_count(), 3)
+
+    def test_lines_out_of_order_and_bounds(self):
+        f = open_mapped(self.path)
+        self.assertEqual([f.line(i) for i in (2, 1, 3, 0)], ["ok", "error: disk", "error: net", "alpha beta"])
+        with self.assertRaises(IndexError):
+            f.line(4)
+
+    def test_read_only(self):
+        with self.assertRaisesRegex(TypeError, "Cannot assign to MappedFile"):
+            BytecodeVM(BytecodeCompiler().compile(parse(
+                f'file f = openMapped("{self.path}"); f[0] = 1;'))).run()
+
+    def test_files_closed_when_program_ends(self):
+        code = f'file f = openMapped("{self.path}"); println(len(f));'
+        vm = BytecodeVM(BytecodeCompiler().compile(parse(code)), stdout=StringIO())
+        vm.run()
+        mapped = [value for value in vm.variables + list(vm.globals.values()) if isinstance(value, MappedFile)]
+        self.assertTrue(mapped)
+        self.assertTrue(all(f.mapping.closed for f in mapped))
+        self.assertEqual(vm.mapped_files, [])
+        # A context given to e() stays open for the host's next call until closed
+        context = RuntimeContext(stdout=StringIO())
+        e(parse(code), context=context)
+        files = list(context.mapped_files)
+        self.assertFalse(files[0].mapping.closed)
+        context.close()
+        self.assertTrue(files[0].mapping.closed)
+
+    def test_builtin_names_stay_identifiers(self):
+        """file and the mapped* names are builtins only when the program doesn't use them itself"""
+        cases = [
+            ('string file = "data"; println(file);', "data\n"),
+            ('fun openMapped(p: string): string { return p ++ "!"; } println(openMapped("x"));', "x!\n"),
+            ('int mappedLine = 4; println(mappedLine);', "4\n"),
+            (f'file[] fs = [openMapped("{self.path}")]; println(len(fs[0]));', "38\n"),
+        ]
+        for code, expected in cases:
+            with self.subTest(code=code):
+                self.assertTrue(TypeChecker().check(parse(code)))
+                output = StringIO()
+                BytecodeVM(BytecodeCompiler().compile(parse(code)), stdout=output).run()
+                self.assertEqual(output.getvalue(), expected)
+                output = StringIO()
+                e(parse(code), stdout=output)
+                self.assertEqual(output.getvalue(), expected)
+
+    def test_empty_file(self):
+        with open(self.path, "w"):
+            pass
+        f = open_mapped(self.path)
+        self.assertEqual((len(f), f.line_count(), str(f)), (0, 0, ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
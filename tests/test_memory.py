@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test suite for memory instrumentation (MemoryReport and run.sh --mem)
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, MemoryReport
+from main.arrays import new_array
+from main.memory import deep_size, describe, live_containers, peak_rss
+from main.runner import main as runner_main
+
+
+PROGRAM = """
+int[][] grid = new int[100][100];
+int[][] top = grid[0:10];
+dict d = {"a": 1};
+int i = 0;
+while (i < 500) {
+    d{"k" ++ str(i)} = i;
+    i = i + 1;
+}
+println(len(d));
+"""
+
+
+class TestMemoryReport(unittest.TestCase):
+    """Test cases for memory reports of VM runs"""
+
+    def run_program(self, code=PROGRAM):
+        bytecode = BytecodeCompiler().compile(parse(code))
+        vm = BytecodeVM(bytecode)
+        memory = MemoryReport(vm, bytecode['lines'])
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        return vm, memory, output.getvalue()
+
+    def test_growth_by_opcode(self):
+        vm, memory, output = self.run_program()
+        self.assertEqual(output, "501\n")
+        memory.stop()
+        # The 100x100 int array is one allocation of 80000 bytes
+        self.assertGreaterEqual(memory.opcode_growth["CREATE_ARRAY_INIT"], 80000)
+        self.assertGreater(memory.opcode_growth["STORE_DICT_ITEM"], 0)
+        site = max(memory.site_growth, key=memory.site_growth.get)
+        self.assertEqual(vm.instructions[site].opcode, "CREATE_ARRAY_INIT")
+
+    def test_live_containers(self):
+        vm, memory, _ = self.run_program()
+        containers = {describe(value): labels for labels, value in live_containers(vm)}
+        self.assertEqual(containers["int[100][100] (flat)"], ["grid"])
+        # Slicing rows gives a list of row views, as with nested lists
+        self.assertEqual(containers["array[10]"], ["top"])
+        self.assertEqual(containers["dict{501}"], ["d"])
+        memory.report()
+
+    def test_describe_promoted_array(self):
+        flags = new_array("bool", [3])
+        self.assertEqual(describe(flags), "bool[3] (flat)")
+        flags[0] = True
+        self.assertEqual(describe(flags), "bool[3] (flat)")
+        flags[0] = 5
+        self.assertEqual(describe(flags), "any[3] (list)")
+        big = new_array("int", [2, 2])
+        big[1][1] = 2**70
+        self.assertEqual(describe(big), "int[2][2] (list)")
+
+    def test_deep_size_counts_shared_storage_once(self):
+        vm, memory, _ = self.run_program()
+        memory.report()
+        grid, top = vm.globals["grid"], vm.globals["top"]
+        self.assertGreaterEqual(deep_size(grid), 80000)
+        # The slice's rows are views holding no storage of their own once the grid is counted
+        seen = set()
+        deep_size(grid, seen)
+        self.assertLess(deep_size(top, seen), 10 * 100 * 8)
+        self.assertGreater(deep_size([[1, 2], {"x": "y" * 1000}]), 1000)
+
+    def test_report(self):
+        _, memory, _ = self.run_program()
+        report = memory.report()
+        self.assertIn("Peak RSS", report)
+        self.assertIn("CREATE_ARRAY_INIT", report)
+        self.assertIn("int[100][100] (flat)", report)
+        self.assertFalse(tracemalloc.is_tracing())
+        if peak_rss() is not None:
+            self.assertGreater(peak_rss(), 1 << 20)
+
+    def test_runner_option(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.txt")
+            with open(path, "w") as f:
+                f.write(PROGRAM)
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(runner_main([path, "nocache", "--mem"]), 0)
+        self.assertIn("501\n", output.getvalue())
+        self.assertIn("Largest live containers", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test suite for buffered program output and the flush() builtin
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, TypeChecker
+from main.output import OutputBuffer, program_output, parse_buffer_size
+
+
+class CountingStream(StringIO):
+    """StringIO that records how many times it was written to"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+
+class SlowStream(StringIO):
+    """StringIO that lets other threads run during a write, as a real stdout does"""
+
+    def write(self, text):
+        time.sleep(0)
+        return super().write(text)
+
+
+class TestOutputBuffer(unittest.TestCase):
+    """Test cases for OutputBuffer"""
+
+    def test_interactive_writes_through(self):
+        stream = CountingStream()
+        with redirect_stdout(stream):
+            buffer = OutputBuffer(0)
+            buffer.write("a\n")
+            self.assertEqual(stream.getvalue(), "a\n")
+
+    def test_buffers_until_full(self):
+        stream = CountingStream()
+        with redirect_stdout(stream):
+            buffer = OutputBuffer(10)
+            for _ in range(4):
+                buffer.write("ab\n")
+            # 12 characters: one write once the buffer filled up
+            self.assertEqual(stream.writes, ["ab\n" * 4])
+            buffer.write("c\n")
+            self.assertEqual(stream.getvalue(), "ab\n" * 4)
+            buffer.flush()
+        self.assertEqual(stream.getvalue(), "ab\n" * 4 + "c\n")
+
+    def test_shared_buffer_loses_nothing_across_threads(self):
+        stream = SlowStream()
+        buffer = OutputBuffer(buffer_size=64, stream=stream)
+        saved_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            def write(n):
+                for i in range(2000):
+                    buffer.write(f"{n}:{i}\n")
+            threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(saved_interval)
+        buffer.flush()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(sorted(lines), sorted(f"{n}:{i}" for n in range(4) for i in range(2000)))
+        for n in range(4):
+            self.assertEqual([line for line in lines if line.startswith(f"{n}:")], [f"{n}:{i}" for i in range(2000)])
+
+    def test_buffer_size_setting(self):
+        self.assertEqual(parse_buffer_size("4096"), 4096)
+        self.assertEqual(parse_buffer_size(None), 0)
+        self.assertEqual(parse_buffer_size("-5"), 0)
+        self.assertEqual(parse_buffer_size("lots"), 0)
+
+
+class TestProgramOutput(unittest.TestCase):
+    """Test cases for when programs' buffered output is written"""
+
+    PROGRAM = 'println(1); println(2); flush(); println(3);'
+
+    def setUp(self):
+        self.saved_size = program_output.buffer_size
+        program_output.buffer_size = 1 << 16
+
+    def tearDown(self):
+        program_output.buffer_size = self.saved_size
+
+    def test_vm_flushes_at_exit_and_on_flush(self):
+        stream = CountingStream()
+        with redirect_stdout(stream):
+            BytecodeVM(BytecodeCompiler().compile(parse(self.PROGRAM))).run()
+        self.assertEqual([w for w in stream.writes if w], ["1\n2\n", "3\n"])
+
+    def test_interpreter_flush_builtin(self):
+        stream = CountingStream()
+        with redirect_stdout(stream):
+            e(parse(self.PROGRAM))
+            self.assertEqual(stream.getvalue(), "1\n2\n")
+            program_output.flush()
+        self.assertEqual(stream.getvalue(), "1\n2\n3\n")
+
+    def test_prompt_shown_before_input(self):
+        code = 'println("start"); string name = input("name? "); println(name);'
+        for run in (lambda: BytecodeVM(BytecodeCompiler().compile(parse(code))).run(),
+                    lambda: (e(parse(code)), program_output.flush())):
+            stream = StringIO()
+
+            def fake_input():
+                # Everything printed before input() must already be visible
+                self.assertEqual(stream.getvalue(), "start\nname? ")
+                return "bob"
+
+            with redirect_stdout(stream), mock.patch("builtins.input", fake_input):
+                run()
+            self.assertEqual(stream.getvalue(), "start\nname? bob\n")
+
+    def test_vm_error_shows_earlier_output_first(self):
+        stream = StringIO()
+        with redirect_stdout(stream):
+            with self.assertRaises(IndexError):
+                BytecodeVM(BytecodeCompiler().compile(parse('println(7); int[] xs = [1]; println(xs[3]);'))).run()
+        self.assertTrue(stream.getvalue().startswith("7\nVM Error"))
+
+    def test_flush_type_checks(self):
+        checker = TypeChecker()
+        self.assertTrue(checker.check(parse('int n = flush(); println(n);')))
+
+    def test_flush_is_an_ordinary_name_when_declared(self):
+        for code, expected in [('int flush = 2; println(flush);', "2\n"),
+                               ('fun flush(n: int): int { return n + 1; } println(flush(4));', "5\n")]:
+            with self.subTest(code=code):
+                self.assertTrue(TypeChecker().check(parse(code)))
+                for run in (lambda out: BytecodeVM(BytecodeCompiler().compile(parse(code)), stdout=out).run(),
+                            lambda out: e(parse(code), stdout=out)):
+                    stream = StringIO()
+                    run(stream)
+                    self.assertEqual(stream.getvalue(), expected)
+
+
+
+class TestInjectedStreams(unittest.TestCase):
+    """Test cases for programs given their own output and input streams"""
+
+    CODE = 'string name = input("name? "); string[] rest = readLines(); println(name ++ "/" ++ str(len(rest)));'
+
+    def test_vm_streams(self):
+        out, host = StringIO(), StringIO()
+        with redirect_stdout(host):
+            BytecodeVM(BytecodeCompiler().compile(parse(self.CODE)), stdout=out, stdin=StringIO("bob\na\nb\n")).run()
+        self.assertEqual(out.getvalue(), "name? bob/2\n")
+        self.assertEqual(host.getvalue(), "")
+
+    def test_interpreter_streams(self):
+        out, host = StringIO(), StringIO()
+        with redirect_stdout(host):
+            e(parse(self.CODE), stdout=out, stdin=StringIO("amy"))
+        self.assertEqual(out.getvalue(), "name? amy/0\n")
+        self.assertEqual(host.getvalue(), "")
+
+    def test_vm_diagnostics_follow_output(self):
+        # The error dump and the debug trace go with the program's output, not to sys.stdout
+        out, host = StringIO(), StringIO()
+        vm = BytecodeVM(BytecodeCompiler().compile(parse('println(1); int x = 1 / 0;')), stdout=out)
+        with redirect_stdout(host), self.assertRaises(ZeroDivisionError):
+            vm.run()
+        self.assertTrue(out.getvalue().startswith("1\nVM Error at instruction"), out.getvalue())
+        self.assertIn("Variables:", out.getvalue())
+        out = StringIO()
+        vm = BytecodeVM(BytecodeCompiler().compile(parse('println(2);')), stdout=out)
+        vm.debug = True
+        with redirect_stdout(host):
+            vm.run()
+        self.assertIn("EXEC: 0: LOAD_CONST", out.getvalue())
+        self.assertTrue(out.getvalue().endswith("2\n"))
+        self.assertEqual(host.getvalue(), "")
+
+    def test_injected_output_is_buffered(self):
+        stream = CountingStream()
+        BytecodeVM(BytecodeCompiler().compile(parse('println(1); println(2); flush(); println(3);')), stdout=stream).run()
+        self.assertEqual([w for w in stream.writes if w], ["1\n2\n", "3\n"])
+
+    def test_concurrent_programs(self):
+        code = 'int i = 0; while (i < 200) { println(i * {n}); i = i + 1; }'
+        outputs = {}
+
+        def run(n, engine):
+            out = StringIO()
+            program = code.replace("{n}", str(n))
+            if engine == "vm":
+                BytecodeVM(BytecodeCompiler().compile(parse(program)), stdout=out).run()
+            else:
+                e(parse(program), stdout=out)
+            outputs[(n, engine)] = out.getvalue()
+
+        threads = [threading.Thread(target=run, args=(n, engine)) for n in range(1, 5) for engine in ("vm", "e")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for (n, engine), text in outputs.items():
+            self.assertEqual(text, "".join(f"{i * n}\n" for i in range(200)), (n, engine))
+        self.assertEqual(len(outputs), 8)
+
+if __name__ == '__main__':
+    unittest.main()
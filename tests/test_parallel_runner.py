@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test suite for the parallel test runner
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.parallel_runner import Test, discover, run_test, run_tests, main
+
+
+def spin_forever():
+    while True:
+        pass
+
+
+class TestParallelRunner(unittest.TestCase):
+    """Test cases for test discovery and running tests in worker processes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tests = {test.id: test for test in discover()}
+
+    def test_discovery(self):
+        kinds = {(test.module, test.kind) for test in self.tests.values()}
+        self.assertIn(("unit_tests", "case"), kinds)
+        self.assertIn(("algorithm_tests", "case"), kinds)
+        self.assertIn(("bytecode_tests", "function"), kinds)
+        self.assertIn(("test_limits", "unittest"), kinds)
+        self.assertIn("project_euler_tests::Project Euler #1 - Multiples of 3 or 5", self.tests)
+        self.assertIn("test_limits::TestResourceLimits.test_call_depth", self.tests)
+        self.assertNotIn("test_framework", {test.module for test in self.tests.values()})
+
+    def test_run_each_kind(self):
+        for test_id in ("unit_tests::If with Environment Variables", "bytecode_tests::test_variables",
+                        "project_euler_tests::Project Euler #1 - Multiples of 3 or 5",
+                        "test_limits::TestResourceLimits.test_from_env"):
+            entry = run_test(self.tests[test_id], timeout=30)
+            self.assertEqual(entry["status"], "passed", entry["message"])
+        # Reference tests report the inputs that failed
+        failing = next(test for test in self.tests.values() if test.module == "reference_tests")
+        entry = run_test(failing, timeout=30)
+        self.assertEqual(entry["status"], "failed")
+        self.assertIn("input", entry["message"])
+
+    def test_timeout(self):
+        entry = run_test(Test("test_parallel_runner", "function", "spin_forever", "spin_forever"), timeout=0.2)
+        self.assertEqual(entry["status"], "timeout")
+        self.assertLess(entry["seconds"], 5)
+
+    def test_pool_keeps_order(self):
+        tests = [test for test in self.tests.values() if test.module == "unit_tests"][:6]
+        results = run_tests(tests, jobs=2, timeout=30)
+        self.assertEqual([entry["id"] for entry in results], [test.id for test in tests])
+        self.assertTrue(all(entry["status"] == "passed" for entry in results))
+
+    def test_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            junit, results = os.path.join(tmp, "results.xml"), os.path.join(tmp, "results.json")
+            with redirect_stdout(StringIO()):
+                status = main(["-j", "2", "--filter", "unit_tests::If", "--junit", junit, "--json", results])
+            self.assertEqual(status, 0)
+            root = ET.parse(junit).getroot()
+            self.assertEqual(root.get("failures"), "0")
+            self.assertEqual(root.find("testsuite").get("name"), "unit_tests")
+            data = json.loads(open(results).read())
+            self.assertEqual(data["summary"], {"passed": int(root.get("tests"))})
+
+
+if __name__ == '__main__':
+    unittest.main()
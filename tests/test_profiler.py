@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test suite for the instruction-level profiler and debug tracing of BytecodeVM
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, Profiler
+from main.profiler import FetchHook, function_owners, MAIN
+
+
+PROGRAM = """
+fun inner(n: int): int { int s = 0; int i = 0; while (i < n) { s = s + i; i = i + 1; } return s; }
+fun outer(k: int): int { int t = 0; int j = 0; while (j < k) { t = t + inner(5); j = j + 1; } return t; }
+println(outer(4));
+"""
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for Profiler"""
+
+    def profile(self, code=PROGRAM):
+        vm = BytecodeVM(BytecodeCompiler().compile(parse(code)))
+        profiler = Profiler(vm)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        profiler.stop()
+        return vm, profiler, output.getvalue()
+
+    def test_counts_match_execution(self):
+        vm, profiler, output = self.profile()
+        self.assertEqual(output, "40\n")
+        self.assertEqual(profiler.opcode_counts["CALL_FUNCTION"], 5)
+        self.assertEqual(profiler.opcode_counts["PRINT"], 1)
+        self.assertEqual(sum(profiler.opcode_counts.values()), sum(profiler.hits))
+        # Every fetch is counted once, so the loop test runs n + 1 times per call
+        lt_sites = [ip for ip, instr in enumerate(vm.instructions) if instr.opcode == "BINARY_LT"]
+        self.assertEqual(sorted(profiler.hits[ip] for ip in lt_sites), [5, 24])
+
+    def test_function_attribution(self):
+        vm, profiler, _ = self.profile()
+        owners = function_owners(vm.instructions, vm.constants, vm.variable_indexes)
+        self.assertEqual(owners[0], MAIN)
+        self.assertEqual({"inner", "outer", MAIN}, set(owners))
+        stacks = {line.rsplit(" ", 1)[0] for line in profiler.collapsed().splitlines()}
+        self.assertIn("<main>;outer;inner", stacks)
+        self.assertNotIn("<main>;inner", stacks)
+        times = profiler.function_times()
+        self.assertGreaterEqual(times["outer"][1], times["inner"][1])
+
+    def test_report_and_collapsed_file(self):
+        _, profiler, _ = self.profile()
+        report = profiler.report()
+        self.assertIn("CALL_FUNCTION", report)
+        self.assertIn("inner", report)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "p.folded")
+            profiler.write_collapsed(path)
+            with open(path) as f:
+                for line in f:
+                    stack, weight = line.rsplit(" ", 1)
+                    self.assertTrue(stack.startswith("<main>"))
+                    self.assertGreater(int(weight), 0)
+
+    def test_no_hooks_without_profiling(self):
+        vm, _, _ = self.profile()
+        # Stopping the profiler restores the plain instruction list
+        self.assertIs(type(vm.instructions), list)
+        self.assertIs(type(BytecodeVM(BytecodeCompiler().compile(parse(PROGRAM))).instructions), list)
+
+    def test_debug_trace(self):
+        vm = BytecodeVM(BytecodeCompiler().compile(parse("println(1 + 2);")))
+        vm.debug = True
+        self.assertIsInstance(vm.instructions, FetchHook)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("EXEC: 0: LOAD_CONST"))
+        self.assertIn("PRINT", lines[-2])
+        self.assertEqual(lines[-1], "3")
+        vm.debug = False
+        self.assertIs(type(vm.instructions), list)
+
+
+if __name__ == '__main__':
+    unittest.main()
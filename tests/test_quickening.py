@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test suite for the adaptive (quickening) mode of the bytecode VM
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM
+from main.vm import MAX_DEOPTS
+
+
+PROGRAM = """
+int[] xs = [4, 5, 6];
+dict d = {"a": 1};
+string key = "a";
+string s = "";
+string word = "abc";
+int total = 0;
+int i = 0;
+while (i < 3) {
+    total = total + xs[i] + d{key};
+    s = s + word[i];
+    i = i + 1;
+}
+println(total);
+println(s);
+"""
+
+
+class TestQuickening(unittest.TestCase):
+    """Test cases for instructions that specialise on observed operand types"""
+
+    def run_code(self, code, adaptive=True):
+        """Helper returning (output, vm) after running code"""
+        bytecode = BytecodeCompiler().compile(parse(code))
+        vm = BytecodeVM(bytecode, adaptive=adaptive)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        return output.getvalue(), vm
+
+    def opcodes(self, vm):
+        return [instr.opcode for instr in vm.instructions]
+
+    def test_specializes(self):
+        output, vm = self.run_code(PROGRAM)
+        self.assertEqual(output, "18\nabc\n")
+        opcodes = self.opcodes(vm)
+        for opcode in ["LOAD_ARRAY_ITEM_LIST", "LOAD_ARRAY_ITEM_STR", "LOAD_DICT_ITEM_DICT"]:
+            self.assertIn(opcode, opcodes)
+        # Arithmetic has no checks for a guard to replace, so it is never quickened
+        self.assertIn("BINARY_ADD", opcodes)
+        self.assertIn("BINARY_LT", opcodes)
+        self.assertFalse(vm.deopt_counts)
+
+    def test_same_output_as_generic(self):
+        generic, vm = self.run_code(PROGRAM, adaptive=False)
+        adaptive, _ = self.run_code(PROGRAM)
+        self.assertEqual(generic, adaptive)
+        self.assertNotIn("LOAD_ARRAY_ITEM_LIST", self.opcodes(vm))
+
+    def test_compiled_bytecode_untouched(self):
+        bytecode = BytecodeCompiler().compile(parse(PROGRAM))
+        before = [instr.opcode for instr in bytecode['instructions']]
+        with redirect_stdout(StringIO()):
+            BytecodeVM(bytecode, adaptive=True).run()
+        self.assertEqual([instr.opcode for instr in bytecode['instructions']], before)
+
+    def test_deoptimize_on_type_change(self):
+        # The same index site sees a list, then a string
+        output, vm = self.run_code("""
+        fun at(seq: int[], k: int): int { return seq[k]; }
+        int[] xs = [1, 2, 3];
+        int i = 0;
+        while (i < 3) { println(at(xs, i)); i = i + 1; }
+        println(at("ab", 1));
+        println(at(xs, 0));
+        """)
+        self.assertEqual(output, "1\n2\n3\nb\n1\n")
+        self.assertTrue(vm.deopt_counts)
+
+    def test_polymorphic_site_goes_generic(self):
+        # One index site alternating between a list and a string
+        output, vm = self.run_code("""
+        fun at(seq: int[], k: int): int { return seq[k]; }
+        int[] xs = [1, 2, 3];
+        int i = 0;
+        while (i < 20) {
+            if (i % 2 == 0) { println(at(xs, 0)); } else { println(at("ab", 0)); }
+            i = i + 1;
+        }
+        """)
+        self.assertEqual(output.split("\n")[:4], ["1", "a", "1", "a"])
+        self.assertIn("LOAD_ARRAY_ITEM", self.opcodes(vm))
+        self.assertLessEqual(max(vm.deopt_counts.values()), MAX_DEOPTS)
+
+    def test_errors_still_raised(self):
+        with self.assertRaises(IndexError):
+            self.run_code("int[] xs = [1, 2]; int i = 0; while (i < 3) { println(xs[i]); i = i + 1; }")
+        with self.assertRaises(KeyError):
+            self.run_code('dict d = {"a": 1}; println(d{"b"});')
+
+
+if __name__ == '__main__':
+    unittest.main()
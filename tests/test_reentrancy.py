@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test suite for per-program compiler, parser and interpreter state
+"""
+
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, RuntimeContext, ParseError, TypeError
+
+
+def program(n):
+    """A program whose variables, struct type and output depend on n"""
+    variables = "".join(f"int v{n}_{i} = {i};\n" for i in range(n))
+    return f"""
+    type T{n} {{ "a": int, "b": string }};
+    {variables}
+    T{n} t = T{n} {{ "a": {n}, "b": "x{n}" }};
+    int total = 0;
+    int i = 0;
+    while (i < 50) {{
+        total = total + i * {n};
+        i = i + 1;
+    }}
+    println(t{{"b"}} ++ ":" ++ str(total + t{{"a"}}));
+    """
+
+
+def expected(n):
+    return f"x{n}:{sum(range(50)) * n + n}\n"
+
+
+def slicing_program(n):
+    """Takes slices of a list and writes to both sides of them"""
+    values = ", ".join(str(i * n) for i in range(40))
+    return f"""
+    int[] xs = [{values}];
+    int total = 0;
+    int round = 0;
+    while (round < 100) {{
+        int[] ys = xs[5:35];
+        xs[5] = xs[5] + 1;
+        ys[1] = 0 - 1;
+        total = total + ys[0] + xs[6];
+        round = round + 1;
+    }}
+    println(total);
+    """
+
+
+def slicing_expected(n):
+    return f"{sum(5 * n + r + 6 * n for r in range(100))}\n"
+
+
+class TestReentrancy(unittest.TestCase):
+    """Test cases for compiling and running several programs in one process"""
+
+    def test_vm_keeps_its_own_variable_names(self):
+        first = BytecodeCompiler().compile(parse('int a = 1; int b = 2; println(a + b);'))
+        vm = BytecodeVM(first, stdout=StringIO())
+        # A later compilation with a different variable layout must not affect vm
+        BytecodeCompiler().compile(parse('int x = 5; int y = 6; int z = 7; println(z);'))
+        vm.run()
+        self.assertEqual(vm.output.stream.getvalue(), "3\n")
+        self.assertEqual(vm._get_var_name(first['variables']['b']), "b")
+
+    def test_parse_types_are_per_call(self):
+        parse('type Point { "x": int, "y": int };')
+        with self.assertRaises(ParseError):
+            parse('Point p = Point { "x": 1, "y": 2 };')
+        # A shared dict lets a host parse a program in pieces
+        types = {}
+        parse('type Point { "x": int, "y": int };', types)
+        self.assertEqual(types, {"Point": {"x": "int", "y": "int"}})
+        parse('Point p = Point { "x": 1, "y": 2 };', types)
+
+    def test_runtime_context(self):
+        out = StringIO()
+        types = {}
+        context = RuntimeContext(stdout=out)
+        e(parse('type Point { "x": int, "y": int };', types), context=context)
+        self.assertIn("Point", context.types)
+        e(parse('Point p = Point { "x": 1, "y": 2 }; println(p{"y"});', types), context=context)
+        self.assertEqual(out.getvalue(), "2\n")
+        # A new context has no types
+        with self.assertRaisesRegex(TypeError, "Unknown type: Point"):
+            e(parse('Point p = Point { "x": 1, "y": 2 };', types), stdout=StringIO())
+
+    def test_concurrent_compile_and_run(self):
+        def run(n):
+            vm_out, e_out = StringIO(), StringIO()
+            BytecodeVM(BytecodeCompiler().compile(parse(program(n))), stdout=vm_out).run()
+            e(parse(program(n)), stdout=e_out)
+            return vm_out.getvalue(), e_out.getvalue()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(run, range(1, 17)))
+        for n, outputs in enumerate(results, 1):
+            self.assertEqual(outputs, (expected(n), expected(n)))
+
+    def test_concurrent_slicing(self):
+        switch = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch)
+
+        def run(n):
+            vm = BytecodeVM(BytecodeCompiler().compile(parse(slicing_program(n))), stdout=StringIO())
+            vm.run()
+            out = StringIO()
+            e(parse(slicing_program(n)), stdout=out)
+            return vm.output.stream.getvalue(), out.getvalue()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(run, range(1, 9)))
+        for n, outputs in enumerate(results, 1):
+            self.assertEqual(outputs, (slicing_expected(n), slicing_expected(n)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test suite for ropes: deferred results of string concatenation
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, e, BytecodeCompiler, BytecodeVM, Rope, TypeError
+from main.ropes import concat, ROPE_MIN_LENGTH
+
+
+PROGRAM = """
+string s = "";
+int i = 0;
+while (i < 300) { s = s ++ str(i % 10); i = i + 1; }
+println(len(s));
+println(s[5] ++ s[299]);
+println(s[0:12]);
+string t = "";
+i = 0;
+while (i < 300) { t = str(i % 10) ++ t; i = i + 1; }
+println(t[0:5]);
+println(s < t);
+dict d = {"k": 1};
+d{s} = 7;
+string u = "";
+i = 0;
+while (i < 300) { u = u ++ str(i % 10); i = i + 1; }
+println(d{u});
+println(parseInt(s[0:9]) + 1);
+"""
+
+EXPECTED = "300\n59\n012345678901\n98765\nTrue\n7\n12345679\n"
+
+
+class TestRopes(unittest.TestCase):
+    """Test cases for ++ results built as ropes"""
+
+    def test_vm(self):
+        vm = BytecodeVM(BytecodeCompiler().compile(parse(PROGRAM)))
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        self.assertEqual(output.getvalue(), EXPECTED)
+        self.assertIsInstance(vm.globals["s"], Rope)
+
+    def test_interpreter(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            e(parse(PROGRAM))
+        self.assertEqual(output.getvalue(), EXPECTED)
+
+    def test_short_results_stay_str(self):
+        self.assertEqual(concat("ab", "cd"), "abcd")
+        self.assertIs(type(concat("ab", "cd")), str)
+        self.assertIsInstance(concat("a" * ROPE_MIN_LENGTH, "b"), Rope)
+
+    def test_behaves_like_str(self):
+        text = "x" * ROPE_MIN_LENGTH
+        rope = concat(concat(text, "y"), "z")
+        flat = text + "yz"
+        self.assertEqual(len(rope), len(flat))
+        self.assertEqual(rope, flat)
+        self.assertEqual(flat, rope)
+        self.assertEqual(hash(rope), hash(flat))
+        self.assertEqual({flat: 1}[rope], 1)
+        self.assertEqual(str(rope), flat)
+        self.assertEqual(repr([rope]), repr([flat]))
+        self.assertEqual(rope[-1], "z")
+        self.assertEqual("<" + rope, "<" + flat)
+
+    def test_deep_rope_flattens(self):
+        rope = "a" * ROPE_MIN_LENGTH
+        for _ in range(100000):
+            rope = concat(rope, "b")
+        self.assertEqual(str(rope).count("b"), 100000)
+
+    def test_type_errors_name_str(self):
+        code = 'string s = ""; int i = 0; while (i < 200) { s = s ++ "a"; i = i + 1; } println(s ++ 1);'
+        with self.assertRaises(TypeError) as caught:
+            with redirect_stdout(StringIO()):
+                e(parse(code))
+        self.assertIn("Cannot concatenate str with int", str(caught.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
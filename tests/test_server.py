@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compile server and its client
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from unittest import mock
+
+# Add parent directory to path for imports
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import client
+
+
+class TestCompileServer(unittest.TestCase):
+    """Test cases for running programs through the compile server"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.tmp.name, "lucent.sock")
+        env = dict(os.environ, LUCENT_CACHE_DIR=os.path.join(cls.tmp.name, "cache"))
+        cls.server = subprocess.Popen([sys.executable, "-m", "main.server", cls.socket_path],
+                                      cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+        deadline = time.time() + 10
+        while not os.path.exists(cls.socket_path):
+            if time.time() > deadline or cls.server.poll() is not None:
+                raise RuntimeError("Compile server did not start")
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        cls.tmp.cleanup()
+
+    def submit(self, code, stdin_data="", cwd=None):
+        """Helper to run code through the server and capture its output"""
+        path = os.path.join(self.tmp.name, "program.txt")
+        with open(path, "w") as f:
+            f.write(code)
+        stdout, stderr = BytesIO(), BytesIO()
+        status = client.run(path, socket_path=self.socket_path, stdin_data=stdin_data,
+                            stdout=stdout, stderr=stderr, cwd=cwd)
+        lines = stdout.getvalue().decode().splitlines()
+        # Drop the "Running <file>..." banner
+        return status, lines[1:]
+
+    def test_run_program(self):
+        status, output = self.submit("int x = 6; int y = 7; println(x * y);")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["42"])
+
+    def test_stdin_forwarded(self):
+        status, output = self.submit("int n = parseInt(input()); println(n + 1);", "41\n")
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["42"])
+
+    def test_terminal_stdin_runs_locally(self):
+        # The server cannot read the terminal, so input() would see EOF there
+        terminal = mock.Mock(isatty=lambda: True)
+        with mock.patch.object(sys, "stdin", terminal):
+            status = client.run(os.path.join(self.tmp.name, "program.txt"), socket_path=self.socket_path,
+                                stdout=BytesIO(), stderr=BytesIO())
+        self.assertIsNone(status)
+        terminal.read.assert_not_called()
+
+    def test_relative_paths_use_client_directory(self):
+        data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(data_dir, exist_ok=True)
+        with open(os.path.join(data_dir, "numbers.txt"), "w") as f:
+            f.write("4 5 6\n")
+        status, output = self.submit('int[] xs = readInts("numbers.txt"); println(xs[2]);', cwd=data_dir)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["6"])
+
+    def test_requests_are_isolated(self):
+        # A failing program must not take the server down
+        status, _ = self.submit("println(undefined_variable);")
+        self.assertEqual(status, 1)
+        status, output = self.submit('println("still running");')
+        self.assertEqual(status, 0)
+        self.assertEqual(output, ["still running"])
+
+    def test_no_server(self):
+        path = os.path.join(self.tmp.name, "missing.sock")
+        with open(os.path.join(self.tmp.name, "p.txt"), "w") as f:
+            f.write("println(1);")
+        status = client.run(os.path.join(self.tmp.name, "p.txt"), socket_path=path,
+                            stdin_data="", stdout=BytesIO(), stderr=BytesIO())
+        self.assertIsNone(status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test suite for type-specialized opcodes emitted for statically checked code
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, TypeCheckError, TypeError, compile_with_static_type_check
+from main.compiler import BytecodeInstruction, INT_OPCODES
+from main.vm import DISPATCH, SPECIALIZATIONS, ADAPTIVE_OPCODES, LIMITED_OPCODES
+
+
+PROGRAM = """
+int[][] grid = new int[3][3];
+int i = 0;
+while (i < 3) {
+    grid[i][i] = i * 10 + 1;
+    i = i + 1;
+}
+string s = "sum: " ++ str(grid[0][0] + grid[1][1] + grid[2][2]);
+println(s);
+println(grid[2][2] / 7 - grid[2][2] % 7);
+"""
+
+
+class TestSpecializedOpcodes(unittest.TestCase):
+    """Test cases for opcodes chosen from static types"""
+
+    def compile_typed(self, code):
+        with redirect_stdout(StringIO()):
+            return compile_with_static_type_check(code)
+
+    def opcodes(self, bytecode):
+        return [instr.opcode for instr in bytecode['instructions']]
+
+    def run_bytecode(self, bytecode):
+        output = StringIO()
+        with redirect_stdout(output):
+            BytecodeVM(bytecode).run()
+        return output.getvalue()
+
+    def test_typed_compile_specializes(self):
+        opcodes = self.opcodes(self.compile_typed(PROGRAM))
+        for opcode in ["INT_ADD", "INT_LT", "INT_MUL", "STR_CONCAT", "ARRAY_LOAD_INT"]:
+            self.assertIn(opcode, opcodes)
+        self.assertNotIn("BINARY_ADD", opcodes)
+        self.assertNotIn("LOAD_ARRAY_ITEM", opcodes)
+
+    def test_unchecked_compile_is_generic(self):
+        opcodes = self.opcodes(BytecodeCompiler().compile(parse(PROGRAM)))
+        self.assertFalse([op for op in opcodes if op.startswith(("INT_", "STR_CONCAT", "ARRAY_LOAD_INT"))])
+
+    def test_same_output(self):
+        typed = self.run_bytecode(self.compile_typed(PROGRAM))
+        generic = self.run_bytecode(BytecodeCompiler().compile(parse(PROGRAM)))
+        self.assertEqual(typed, generic)
+        self.assertEqual(typed, "sum: 33\n3\n")
+
+    def test_dict_values_stay_generic(self):
+        # Dictionary values are only known at run time
+        opcodes = self.opcodes(self.compile_typed('dict d = {"a": 1}; println(d{"a"} < 2); println("a" ++ d{"a"});'))
+        self.assertIn("BINARY_LT", opcodes)
+        self.assertIn("BINARY_CONCAT", opcodes)
+        self.assertNotIn("INT_LT", opcodes)
+        self.assertNotIn("STR_CONCAT", opcodes)
+
+    def test_no_specialisation_through_any(self):
+        # Two strings read from a dict must never reach INT_ADD and be concatenated
+        with self.assertRaises(TypeCheckError):
+            self.compile_typed('dict d = {"a": "x", "b": "y"}; int x = d{"a"}; int y = d{"b"}; println(x + y);')
+        # After a checked conversion the value is a proven int
+        bytecode = self.compile_typed('dict d = {"a": "4"}; int x = parseInt(str(d{"a"})); println(x + 1);')
+        self.assertIn("INT_ADD", self.opcodes(bytecode))
+        self.assertEqual(self.run_bytecode(bytecode), "5\n")
+        compiler = BytecodeCompiler(typed=True)
+        for recorded, trusted in [("int", "int"), ("int[]", "int[]"), ("any", None), ("any[]", None), ("unknown[]", None)]:
+            node = parse("println(1);")
+            node.static_type = recorded
+            self.assertEqual(compiler.static_type(node), trusted)
+        # Indexing a dict value stays generic
+        opcodes = self.opcodes(self.compile_typed('dict d = {"a": [1]}; println(d{"a"}[0]); println(len([]));'))
+        self.assertIn("LOAD_ARRAY_ITEM", opcodes)
+        self.assertNotIn("ARRAY_LOAD_INT", opcodes)
+
+    def test_no_specialisation_from_other_scopes(self):
+        # b's v is the int global, not a's string local: the ++ stays checked
+        code = """
+        fun a(): int { string v = "s"; println(v); return 0; }
+        fun b(): string { return v ++ "!"; }
+        int v = 5;
+        println(b());
+        """
+        bytecode = self.compile_typed(code)
+        self.assertNotIn("STR_CONCAT", self.opcodes(bytecode))
+        for bytecode in (bytecode, BytecodeCompiler().compile(parse(code))):
+            with self.assertRaisesRegex(TypeError, "Cannot concatenate int with str"):
+                self.run_bytecode(bytecode)
+
+    def test_constant_folding(self):
+        opcodes = self.opcodes(self.compile_typed("println(3 * 4);"))
+        self.assertEqual(opcodes, ["LOAD_CONST", "PRINT"])
+
+    def test_every_opcode_has_a_handler(self):
+        opcodes = set(INT_OPCODES.values()) | {"STR_CONCAT", "ARRAY_LOAD_INT"} | set(SPECIALIZATIONS.values())
+        opcodes |= set(ADAPTIVE_OPCODES.values()) | set(LIMITED_OPCODES.values())
+        opcodes |= set(self.opcodes(self.compile_typed(PROGRAM)))
+        self.assertFalse(opcodes - set(DISPATCH))
+        vm = BytecodeVM({"instructions": [BytecodeInstruction("NO_SUCH_OP")], "constants": [],
+                         "variables": {}, "global_vars": set()}, stdout=StringIO())
+        with self.assertRaisesRegex(ValueError, "Unknown opcode: NO_SUCH_OP"):
+            vm.run()
+
+    def test_bounds_still_checked(self):
+        bytecode = self.compile_typed("int[] xs = [1, 2]; int i = 0 - 1; println(xs[i]);")
+        self.assertIn("ARRAY_LOAD_INT", self.opcodes(bytecode))
+        with self.assertRaises(IndexError):
+            self.run_bytecode(bytecode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test suite for fixed-layout struct instances and field inline caches in the VM
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, BytecodeCompiler, BytecodeVM, StructInstance, TypeError
+
+
+class TestStructs(unittest.TestCase):
+    """Test cases for user-defined type instances"""
+
+    def run_code(self, code):
+        """Helper returning (output lines, vm) after running code"""
+        bytecode = BytecodeCompiler().compile(parse(code))
+        vm = BytecodeVM(bytecode)
+        output = StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        return output.getvalue().strip().split("\n"), vm
+
+    def test_fields_in_any_order(self):
+        output, vm = self.run_code("""
+        type Point { "x": int, "y": int };
+        Point a = Point { "y": 2, "x": 1 };
+        Point b = Point { "x": 3, "y": 4 };
+        println(a{"x"} + b{"x"});
+        println(a{"y"} + b{"y"});
+        println(a);
+        """)
+        self.assertEqual(output, ["4", "6", "{'x': 1, 'y': 2}"])
+        self.assertTrue(any(isinstance(v, StructInstance) for v in vm.globals.values()))
+
+    def test_field_assignment_and_nesting(self):
+        output, _ = self.run_code("""
+        type Point { "x": int, "y": int };
+        type Circle { "center": Point, "radius": int };
+        Circle c = Circle { "center": Point { "x": 5, "y": 10 }, "radius": 15 };
+        c{"center"}{"x"} = c{"center"}{"x"} + 1;
+        c{"radius"} = 20;
+        println(c{"center"}{"x"});
+        println(c);
+        println(len(c));
+        """)
+        self.assertEqual(output, ["6", "{'center': {'x': 6, 'y': 10}, 'radius': 20}", "2"])
+
+    def test_inline_cache_filled(self):
+        code = """
+        type Counter { "value": int };
+        Counter c = Counter { "value": 0 };
+        int i = 0;
+        while (i < 5) { c{"value"} = c{"value"} + 1; i = i + 1; }
+        println(c{"value"});
+        """
+        output, vm = self.run_code(code)
+        self.assertEqual(output, ["5"])
+        cached = [(instr.opcode, cache) for instr, cache in zip(vm.instructions, vm.inline_caches)
+                  if instr.opcode in ("LOAD_FIELD", "STORE_FIELD", "CREATE_STRUCT")]
+        self.assertTrue(cached)
+        for opcode, cache in cached:
+            self.assertIsNotNone(cache, opcode)
+            self.assertEqual(cache[0].name, "Counter")
+
+    def test_same_site_different_types(self):
+        # A field-access site that sees several types keeps working
+        output, _ = self.run_code("""
+        type A { "v": int, "tag": string };
+        type B { "tag": string, "v": int };
+        fun getV(x: A): int { return x{"v"}; }
+        println(getV(A { "v": 1, "tag": "a" }));
+        println(getV(B { "tag": "b", "v": 2 }));
+        dict d = {"v": 3};
+        println(d{"v"});
+        """)
+        self.assertEqual(output, ["1", "2", "3"])
+
+    def test_missing_and_extra_fields(self):
+        for code in ['type P { "x": int, "y": int }; P p = P { "x": 1 };',
+                     'type P { "x": int }; P p = P { "x": 1, "z": 2 };',
+                     'type P { "x": int }; P p = P { "x": 1 }; p{"z"} = 2;']:
+            with self.subTest(code=code):
+                with self.assertRaises(TypeError):
+                    self.run_code(code)
+
+    def test_missing_field_read(self):
+        with self.assertRaises(KeyError):
+            self.run_code('type P { "x": int }; P p = P { "x": 1 }; println(p{"y"});')
+
+
+if __name__ == '__main__':
+    unittest.main()
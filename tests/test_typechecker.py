@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test suite for the static type checker and the types it records on the AST
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse, TypeChecker, TypeCheckError, BinOp, Call, PrintLn, Var
+from main.typechecker import static_type
+
+
+def walk(node):
+    """Yield every AST node reachable from node"""
+    if isinstance(node, list):
+        for item in node:
+            yield from walk(item)
+    elif isinstance(node, tuple):
+        for item in node:
+            yield from walk(item)
+    elif hasattr(node, "__dataclass_fields__"):
+        yield node
+        for field in node.__dataclass_fields__:
+            yield from walk(getattr(node, field))
+
+
+class TestTypeChecker(unittest.TestCase):
+    """Test cases for type checking and node type annotation"""
+
+    def check(self, code):
+        ast = parse(code)
+        TypeChecker().check(ast)
+        return ast
+
+    def printed_types(self, code):
+        """Static types of the expressions passed to println, in order"""
+        return [static_type(node.expr) for node in walk(self.check(code)) if isinstance(node, PrintLn)]
+
+    def test_every_node_annotated(self):
+        ast = self.check("""
+        fun add(a: int, b: int): int { return a + b; }
+        int[] xs = [1, 2, 3];
+        int i = 0;
+        while (i < len(xs)) { println(add(xs[i], i)); i = i + 1; }
+        """)
+        for node in walk(ast):
+            self.assertIsNotNone(static_type(node), node)
+
+    def test_expression_types(self):
+        types = self.printed_types("""
+        int[][] grid = new int[2][3];
+        string s = "abc";
+        println(grid[1][2]);
+        println(grid[1]);
+        println(s[0] ++ str(len(s)));
+        println(1 < 2);
+        """)
+        self.assertEqual(types, ["int", "int[]", "string", "bool"])
+
+    def test_binop_operand_types(self):
+        ast = self.check('int n = 2; string s = "a" ++ "b"; println(n * n);')
+        ops = {node.op: (static_type(node.left), static_type(node.right))
+               for node in walk(ast) if isinstance(node, BinOp)}
+        self.assertEqual(ops["*"], ("int", "int"))
+        self.assertEqual(ops["++"], ("string", "string"))
+
+    def test_mutual_recursion(self):
+        ast = self.check("""
+        fun isEven(n: int): int { if (n == 0) { return 1; } else { return isOdd(n - 1); } }
+        fun isOdd(n: int): int { if (n == 0) { return 0; } else { return isEven(n - 1); } }
+        println(isEven(4));
+        """)
+        calls = [static_type(node) for node in walk(ast) if isinstance(node, Call)]
+        self.assertEqual(set(calls), {"int"})
+
+    def test_array_return_type(self):
+        types = self.printed_types("""
+        fun pair(a: int): int[] { return [a, a]; }
+        println(pair(1));
+        """)
+        self.assertEqual(types, ["int[]"])
+
+    def test_user_type_fields(self):
+        types = self.printed_types("""
+        type Point { "x": int, "label": string };
+        Point p = Point { "x": 1, "label": "origin" };
+        println(p{"x"} + 1);
+        println(p{"label"});
+        """)
+        self.assertEqual(types, ["int", "string"])
+
+    def test_dict_values_are_any(self):
+        types = self.printed_types('dict d = {"a": 1}; println(d{"a"}); println(d{"a"} == 1);')
+        self.assertEqual(types, ["any", "bool"])
+
+    def test_any_needs_a_checked_conversion(self):
+        # A dict value could be anything, so it must not be trusted as an int or string
+        for code in ['dict d = {"a": "x"}; int x = d{"a"};',
+                     'dict d = {"a": "x"}; println(d{"a"} + 1);',
+                     'dict d = {"a": 1}; if (d{"a"}) { println(1); }',
+                     'dict d = {"a": 1}; int[] xs = [1]; println(xs[d{"a"}]);',
+                     'fun f(a: int): int { return a; } dict d = {"a": 1}; println(f(d{"a"}));',
+                     'type P { "x": int }; dict d = {"a": 1}; P p = P { "x": d{"a"} };']:
+            with self.subTest(code=code):
+                with self.assertRaisesRegex(TypeCheckError, "any"):
+                    self.check(code)
+        # str(), parseInt() and ++ check their operand when the program runs
+        types = self.printed_types("""
+        dict d = {"a": 1};
+        int x = parseInt(str(d{"a"}));
+        println(x + 1);
+        println("a" ++ d{"a"});
+        """)
+        self.assertEqual(types, ["int", "string"])
+
+    def test_empty_array_literal(self):
+        self.check('int[] xs = []; string[] names = []; int[][] grid = [];')
+        self.assertEqual(self.printed_types("println([]);"), ["any[]"])
+        with self.assertRaises(TypeCheckError):
+            self.check("int x = [];")
+
+    def test_if_is_a_statement(self):
+        # Branches of different types are not an error; the if just has no value
+        ast = self.check("""
+        int x = 0;
+        if (x < 1) { println(x); }
+        if (x < 1) { x = 3; } else { println(x); }
+        if (x < 1) { x = 3; } else { x = 4; }
+        """)
+        ifs = [static_type(node) for node in walk(ast) if type(node).__name__ == "If"]
+        self.assertEqual(ifs, ["void", "void", "int"])
+
+    def test_variables_resolve_lexically(self):
+        # b's v is the global declared after it, not a's local string
+        ast = self.check("""
+        fun a(): int { string v = "s"; println(v); return 0; }
+        fun b(): string { return v ++ "!"; }
+        int v = 5;
+        println(v);
+        """)
+        self.assertEqual([static_type(node) for node in walk(ast) if node == Var("v")], ["string", "unknown", "int"])
+        # A global assigned before its declaration, or declared with two
+        # types, has no proven type
+        self.assertEqual(self.printed_types("""
+        fun f(): int { v = "x"; return 0; }
+        int v = 5;
+        println(v);
+        """), ["unknown"])
+        self.assertEqual(self.printed_types("""
+        int v = 5;
+        fun f(): int { return v + 1; }
+        string v = "s";
+        println(v);
+        """), ["unknown"])
+        # A local of an earlier block is still reachable at run time
+        self.assertEqual(self.printed_types("""
+        int i = 0;
+        while (i < 2) { int x = i; i = i + 1; }
+        println(x);
+        println(i);
+        """), ["unknown", "int"])
+
+    def test_errors(self):
+        for code in ['int x = "a";',
+                     'println("a" ++ 1);',
+                     'fun f(a: int): int { return a; } println(f("x"));',
+                     'int[] xs = [1]; xs[0] = "a";',
+                     'type P { "x": int }; P p = P { "x": "a" };',
+                     'println(undefined_variable);',
+                     'fun f(): int { return x; } println(f());',
+                     'fun f(): int { int x = 1; return x; } fun g(): int { return x; }']:
+            with self.subTest(code=code):
+                with self.assertRaises(TypeCheckError):
+                    self.check(code)
+
+
+if __name__ == '__main__':
+    unittest.main()
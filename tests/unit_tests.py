@@ -1,8 +1,9 @@
 from tests.test_framework import TestCase, run_test_suite
 from main import TypeError, ParseError
 
-def run_tests():
-    test_cases = [
+def get_test_cases():
+    """Unit tests for e(), as TestCase objects"""
+    return [
         # Basic Operation Tests with environment
         TestCase(
             name="If with Environment Variables",
@@ -499,6 +500,9 @@ def run_tests():
         
     ]
 
+def run_tests():
+    test_cases = get_test_cases()
+
     # Run all tests and print summary
     results = run_test_suite(test_cases)
     results.print_summary()